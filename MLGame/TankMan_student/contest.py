@@ -1,9 +1,15 @@
+import random
+
 import pygame
 from mlgame.game.generic import quit_or_esc
 from src.Game import Game
+from src.game_module.FrameProfiler import FrameProfiler
 from tqdm import tqdm
 import argparse
 import importlib
+from functools import partial
+from ml.inference_broker import InferenceBroker
+from ml.model_registry import share_loaded_models
 
 
 
@@ -23,6 +29,12 @@ class Contest():
         The sound of the game.
     is_manual : bool
         The manual mode of the game.   
+    broker : InferenceBroker
+        Batch the players' model predictions of a frame, optional.
+    seed : int
+        Game i is played with seed + i, so a contest can be reproduced. Random by default.
+    profiler : FrameProfiler
+        Record the time of every game phase and player update, optional.
 
     Returns
     -------
@@ -30,7 +42,8 @@ class Contest():
         The result of the game.      
     """
     def __init__(self, player: list, total_game: int, frame: int, 
-                 sound: str, is_manual: bool):
+                 sound: str, is_manual: bool, broker: InferenceBroker = None, seed: int = None,
+                 profiler: FrameProfiler = None):
         # initialize player
         self.player1 = player[0]
         self.player2 = player[1]
@@ -44,6 +57,9 @@ class Contest():
         self.frame = frame
         self.sound = sound
         self.is_manual = is_manual
+        self.broker = broker
+        self.seed = random.getrandbits(32) if seed is None else seed
+        self.profiler = profiler
 
         self.user_num = 6
         self.green_team_num = 3
@@ -58,36 +74,15 @@ class Contest():
         with tqdm(total=self.total_game, unit="round") as pbar:
             pbar.set_description("Playing")
             print()
-            for _ in range(self.total_game):
-                # initialize game every round
-                game = Game(self.user_num, self.green_team_num, 
-                            self.blue_team_num, self.is_manual, self.frame, self.sound)
-                scene_init_info_dict = game.get_scene_init_data()
-                frame_count = 0
-
-                # update game
-                while game.is_running() and not quit_or_esc():
-                    game.update({
-                        "1P": self.player1.update(game.get_data_from_game_to_player()['1P'], []),
-                        "2P": self.player2.update(game.get_data_from_game_to_player()['2P'], []),
-                        "3P": self.player3.update(game.get_data_from_game_to_player()['3P'], []),
-                        "4P": self.player4.update(game.get_data_from_game_to_player()['4P'], []),
-                        "5P": self.player5.update(game.get_data_from_game_to_player()['5P'], []),
-                        "6P": self.player6.update(game.get_data_from_game_to_player()['6P'], [])                    
-                    })                
-                    frame_count += 1
-                
-                # reset player
-                self.player1.reset()
-                self.player2.reset()
-                self.player3.reset()
-                self.player4.reset()
-                self.player5.reset()
-                self.player6.reset()
+            for game_index in range(self.total_game):
+                # play one game and reset player
+                game_result = play_game([self.player1, self.player2, self.player3,
+                                         self.player4, self.player5, self.player6],
+                                        self.frame, self.sound, self.is_manual, broker=self.broker,
+                                        seed=self.seed + game_index, profiler=self.profiler)
                 self.game_times += 1
 
                 # get game result
-                game_result = game.get_game_result()                
                 if game_result['attachment'][0]["status"] == "GREEN_TEAM_WIN":
                     self.green_team_win += 1
                 else:
@@ -105,8 +100,69 @@ class Contest():
         pygame.quit()
         return {"green_team_win":self.green_team_win, "blue_team_win":self.blue_team_win}
 
-def import_player(group_number, player_number):
-    module_name = f"ml.Group_{group_number}.ml_play_{player_number}"
+def play_game(players: list, frame: int, sound: str, is_manual: bool, headless: bool = False,
+              broker: InferenceBroker = None, seed: int = None, record_path: str = None,
+              profiler: FrameProfiler = None) -> dict:
+    """
+    Play one 3 vs 3 game and reset the players afterwards.
+
+    Parameters
+    ----------
+    players : list
+        The six MLPlay instances, 1P to 6P.
+    headless : bool
+        Run the game without view and sound, used by the tournament workers.
+    broker : InferenceBroker
+        Run the players' updates through the broker so their predictions are batched.
+    seed : int
+        The seed of the game, the same seed and commands always give the same result.
+    record_path : str
+        Record the game to this file, replay it with src.Replay.Replay.
+    profiler : FrameProfiler
+        Time the game phases and every player's update. With a broker the
+        players share one "ml_play.update (batched)" phase, since their
+        updates interleave while waiting for the batched predictions.
+
+    Returns
+    -------
+    dict
+        The result of Game.get_game_result().
+    """
+    game = Game(len(players), 3, 3, is_manual, frame, sound, headless=headless, seed=seed,
+                record_path=record_path, profiler=profiler)
+    ai_names = [f"{no}P" for no in range(1, len(players) + 1)]
+    if profiler:
+        clock = profiler.clock
+        phases = [f"ml_play.update {ai_name}" for ai_name in ai_names]
+
+    # update game
+    while game.is_running() and (headless or not quit_or_esc()):
+        scene_info = game.get_data_from_game_to_player()
+        if profiler is None:
+            if broker is None:
+                commands = [player.update(scene_info[ai_name], []) for ai_name, player in zip(ai_names, players)]
+            else:
+                commands = broker.run_frame([partial(player.update, scene_info[ai_name], [])
+                                             for ai_name, player in zip(ai_names, players)])
+        elif broker is None:
+            commands = []
+            for ai_name, player, phase in zip(ai_names, players, phases):
+                start = clock()
+                commands.append(player.update(scene_info[ai_name], []))
+                profiler.add(phase, clock() - start)
+        else:
+            start = clock()
+            commands = broker.run_frame([partial(player.update, scene_info[ai_name], [])
+                                         for ai_name, player in zip(ai_names, players)])
+            profiler.add("ml_play.update (batched)", clock() - start)
+        game.update(dict(zip(ai_names, commands)))
+
+    for player in players:
+        player.reset()
+    return game.get_game_result()
+
+def import_player(group_number, player_number, module_name_format="ml.Group_{group}.ml_play_{player}"):
+    module_name = module_name_format.format(group=group_number, player=player_number)
     module = importlib.import_module(module_name)
     return getattr(module, f"MLPlay")
 
@@ -120,8 +176,17 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("--green_team", type=str, required=True, help="The folder of the green team")
     parser.add_argument("--blue_team", type=str, required=True, help="The folder of the blue team")
+    parser.add_argument("--batch_inference", action="store_true",
+                        help="Batch every player's model prediction per frame, faster but bots using the global "
+                             "random module may act differently from a serial game")
+    parser.add_argument("--seed", type=int, default=None, help="Replay the same games, random by default")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Save a histogram of every game phase and player update to this JSON file")
     args = parser.parse_args()
     print(args)
+    # bots loading the same model zip share one copy
+    broker = InferenceBroker() if args.batch_inference else None
+    share_loaded_models(broker=broker)
     # player1 = import_player(1, 1)
     
     
@@ -132,6 +197,10 @@ if __name__ == '__main__':
                 import_player(args.blue_team, 2)('5P', {'sound': sound}),
                 import_player(args.blue_team, 3)('6P', {'sound': sound})]
                   
-    contest = Contest(players, total_game , frame, sound, is_manual)
+    profiler = FrameProfiler() if args.profile else None
+    contest = Contest(players, total_game , frame, sound, is_manual, broker, args.seed, profiler)
+    print(f"seed: {contest.seed}")
     contest.run()
+    if profiler:
+        profiler.save(args.profile)
     
\ No newline at end of file
@@ -1,15 +1,5 @@
-import importlib
-from contest import Contest
-def import_player(group_number, player_number):
-    module_name = f"ml.Group_{group_number}.ml_play_{player_number}"
-    module = importlib.import_module(module_name)
-    return getattr(module, f"MLPlay")
-
-num_groups = 3
-players_per_group = 3
-
-players = {}
-
+import argparse
+from tournament import run_tournament
 
 Group_mapping = {
     "A" : "1",
@@ -23,54 +13,26 @@ Group_mapping = {
     "I" : "1",
     }
 
-
-for group in Group_mapping:    
-    for player in range(1, players_per_group + 1):
-        player_key = f"player{group}_{player}"        
-        players[player_key] = import_player(Group_mapping[group], player)
-
-record = {}
-for group in Group_mapping:
-    record[f"Group_{group}"] = 0
-
 if __name__ == '__main__':
     sound = "off"
     total_game = 5
     frame = 2500
-    is_manual = False
-        
-    
-    Games = []
-    for group_i in Group_mapping:
-        for group_j in Group_mapping:                  
-            if group_i != group_j:
-                game = { "players" : [
-                            players[f"player{group_i}_{k+1}"] for k in range(players_per_group)] 
-                            + [players[f"player{group_j}_{k+1}"] for k in range(players_per_group)],
-                         "home": group_i,
-                          "away": group_j
-                        }                                
-                Games.append(game)
-    
-    
-    for game in Games:            
-        
-        selected_players = [game["players"][0]('1P', {'sound': sound}),
-                            game["players"][1]('2P', {'sound': sound}),
-                            game["players"][2]('3P', {'sound': sound}),
-                            game["players"][3]('4P', {'sound': sound}),
-                            game["players"][4]('5P', {'sound': sound}),
-                            game["players"][5]('6P', {'sound': sound})]
-
-        contest_instance = Contest(selected_players, total_game, frame, sound, is_manual)
-        result = contest_instance.run()
-      
-        if result["green_team_win"] > result["blue_team_win"]:
-            record[f"Group_{game['home']}"] += 1
-        else:
-            record[f"Group_{game['away']}"] += 1
-        print("home:", "Group_"+str(game["home"]), result["green_team_win"], "VS", result["blue_team_win"] ,"away", "Group_"+str(game["away"]))
-        print(record)
-        input("Press Enter to continue...")
-
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to the number of CPUs")
+    parser.add_argument("--ledger", type=str, default="round_robin.jsonl",
+                        help="Finished games are appended here, rerun with the same file to resume")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch_inference", action="store_true",
+                        help="Batch every player's model prediction per frame, faster but bots using the global "
+                             "random module may act differently from a serial game")
+    args = parser.parse_args()
+
+    # every home/away pairing is played in parallel, see tournament.py
+    result = run_tournament(list(Group_mapping), total_game, frame, args.seed, args.workers, args.ledger,
+                            sound=sound, group_folders=Group_mapping, batch_inference=args.batch_inference)
+
+    record = {f"Group_{group}": wins for group, wins in result["record"].items()}
+    for game in result["series"]:
+        print("home:", "Group_"+str(game["home"]), game["green_team_win"], "VS", game["blue_team_win"] ,"away", "Group_"+str(game["away"]))
+    print(record)
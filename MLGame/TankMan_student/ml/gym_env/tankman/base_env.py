@@ -6,7 +6,6 @@ sys.path.append(
 )
 
 from abc import ABC, abstractmethod
-from copy import deepcopy
 from typing import Optional
 
 import gymnasium as gym
@@ -39,6 +38,8 @@ class TankManBaseEnv(gym.Env, ABC):
             is_manual="",
             frame_limit=frame_limit,
             sound=sound,
+            # Nothing is drawn without a render mode, so skip the view and sound work
+            headless=render_mode is None,
         )
         self._prev_scene_info = {}
         self._prev_action = None
@@ -46,6 +47,14 @@ class TankManBaseEnv(gym.Env, ABC):
         self.render_mode = render_mode
         self._game_view = None
 
+    @property
+    def navigation(self):
+        """
+        The NavigationGrid of the current game, kept in sync with destroyed walls.
+        Use it for shortest-path directions instead of scanning walls_info.
+        """
+        return self.game.game_mode.navigation
+
     def render(self) -> None:
         if self.render_mode is None:
             gym.logger.warn(
@@ -79,7 +88,9 @@ class TankManBaseEnv(gym.Env, ABC):
     ) -> tuple[np.ndarray, dict]:
         super().reset(seed=seed)
 
-        self.game.reset()
+        # The game has its own random generator, seeding it makes the spawn
+        # and station positions of the episode reproducible
+        self.game.reset(seed=seed)
         if self._game_view is not None:
             self._game_view.reset()
 
@@ -95,7 +106,9 @@ class TankManBaseEnv(gym.Env, ABC):
         commands = self._get_commands(action)
         
         self._action = action
-        self._prev_scene_info = deepcopy(self._scene_info)
+        # The game builds a new scene info every frame and never mutates one it
+        # has handed out, so the previous frame can be kept without a copy
+        self._prev_scene_info = self._scene_info
         self._scene_info = self.game.get_data_from_game_to_player()
 
         obs = self._get_obs()
@@ -103,7 +116,7 @@ class TankManBaseEnv(gym.Env, ABC):
         terminate = self._is_done()
 
         self._prev_action = action
-        self.game.update(deepcopy(commands))
+        self.game.update(commands)
         return obs, reward, terminate, False, {}
 
     @property
@@ -0,0 +1,206 @@
+import sys
+from os import path
+
+sys.path.append(
+    path.dirname(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+)
+
+from typing import Optional
+
+import gymnasium as gym
+import numpy as np
+import pygame
+from gymnasium.spaces import Box, Discrete
+from mlgame.utils.enum import get_ai_name
+from mlgame.view.view import PygameView
+from pettingzoo import ParallelEnv
+
+from src.action import (
+    ACTION_NONE,
+    AIM_LEFT_ACTION,
+    AIM_RIGHT_ACTION,
+    BACKWARD_ACTION,
+    FORWARD_ACTION,
+    SHOOT_ACTION,
+    TURN_LEFT_ACTION,
+    TURN_RIGHT_ACTION,
+)
+from src.env import FPS
+from src.Game import Game
+
+# Discrete action index -> action bitmask, in the same order as the string commands
+ACTIONS = np.array(
+    [
+        ACTION_NONE,
+        FORWARD_ACTION,
+        BACKWARD_ACTION,
+        TURN_LEFT_ACTION,
+        TURN_RIGHT_ACTION,
+        AIM_LEFT_ACTION,
+        AIM_RIGHT_ACTION,
+        SHOOT_ACTION,
+    ],
+    dtype=np.uint8,
+)
+
+
+class TankManParallelEnv(ParallelEnv):
+    """
+    Every tank of one TankMan game as an agent of a PettingZoo parallel env.
+
+    All tanks act in the same frame, so a parameter-shared policy collects one
+    trajectory per tank from each simulated frame. Agents are named "1P", "2P",
+    ... like the game; the first ``green_team_num`` are the green team.
+
+    Besides the PettingZoo dict API, ``reset_arrays`` and ``step_arrays`` take
+    and return arrays stacked in agent order, which skips building the dicts.
+    A tank's observation is its row of ``Game.get_observation()`` viewed as
+    float32 (see src.ObservationBuilder for the fields). Its reward is the
+    change of its score, plus ``win_reward`` for the winning team and minus it
+    for the losing team when the game ends.
+    """
+
+    metadata = {"name": "tankman_parallel_v0", "render_modes": ["human"], "render_fps": FPS}
+
+    def __init__(
+        self,
+        green_team_num: int = 3,
+        blue_team_num: int = 3,
+        frame_limit: int = 1000,
+        win_reward: float = 0.0,
+        sound: str = "off",
+        render_mode: Optional[str] = None,
+    ) -> None:
+        self.green_team_num = green_team_num
+        self.blue_team_num = blue_team_num
+        self.player_num = green_team_num + blue_team_num
+        self.win_reward = win_reward
+
+        self.game = Game(
+            user_num=self.player_num,
+            green_team_num=green_team_num,
+            blue_team_num=blue_team_num,
+            is_manual="",
+            frame_limit=frame_limit,
+            sound=sound,
+            headless=render_mode is None,
+        )
+        self.possible_agents = [get_ai_name(i) for i in range(self.player_num)]
+        self.agents = []
+        self.is_green = np.arange(self.player_num) < green_team_num
+
+        obs_size = self.game.get_observation().dtype.itemsize // np.dtype(np.float32).itemsize
+        self._observation_space = Box(low=-np.inf, high=np.inf, shape=(obs_size,), dtype=np.float32)
+        self._action_space = Discrete(len(ACTIONS))
+        self._obs = np.zeros((self.player_num, obs_size), dtype=np.float32)
+        self._scores = np.zeros(self.player_num, dtype=np.float32)
+        self._terminations = np.zeros(self.player_num, dtype=bool)
+        self._truncations = np.zeros(self.player_num, dtype=bool)
+        self._structured_obs = None
+
+        self.render_mode = render_mode
+        self._game_view = None
+
+    def observation_space(self, agent: str) -> Box:
+        return self._observation_space
+
+    def action_space(self, agent: str) -> Discrete:
+        return self._action_space
+
+    def reset_arrays(self, seed: Optional[int] = None) -> np.ndarray:
+        """
+        Start a new game.
+
+        :return: observations of shape (player_num, obs_size), in agent order
+        """
+        self.game.reset(seed=seed)
+        if self._game_view is not None:
+            self._game_view.reset()
+        self._update_obs()
+        self._scores[:] = self._obs_field("score")
+        self._terminations[:] = False
+        self._truncations[:] = False
+        return self._obs.copy()
+
+    def step_arrays(self, actions) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Advance the game one frame with an action for every tank.
+
+        :param actions: action indexes in agent order, ignored for finished tanks
+        :return: observations, rewards, terminations and truncations stacked in agent order.
+                 A tank terminates when it is destroyed or the game is won, and
+                 every tank is truncated when the frame limit ends the game.
+        """
+        self.game.update(ACTIONS[np.asarray(actions, dtype=np.intp)])
+        self._update_obs()
+
+        scores = self._obs_field("score")
+        rewards = scores - self._scores
+        self._scores[:] = scores
+
+        truncations = np.zeros(self.player_num, dtype=bool)
+        terminations = self._obs_field("is_alive") == 0
+        if not self.game.is_running():
+            if self.win_reward:
+                is_green_win = self.game.game_mode.status == "GREEN_TEAM_WIN"
+                rewards += np.where(self.is_green == is_green_win, self.win_reward, -self.win_reward)
+            if self.game.game_mode.used_frame >= self.game.frame_limit:
+                truncations[:] = ~terminations
+            else:
+                terminations[:] = True
+        # Tanks that finished earlier keep reporting how they finished, with zero reward
+        finished = self._terminations | self._truncations
+        terminations = np.where(finished, self._terminations, terminations)
+        truncations = np.where(finished, self._truncations, truncations)
+        rewards[finished] = 0
+        self._terminations[:] = terminations
+        self._truncations[:] = truncations
+        return self._obs.copy(), rewards, terminations, truncations
+
+    def reset(self, seed: Optional[int] = None, options: Optional[dict] = None) -> tuple[dict, dict]:
+        obs = self.reset_arrays(seed)
+        self.agents = list(self.possible_agents)
+        return {agent: obs[i] for i, agent in enumerate(self.agents)}, {agent: {} for agent in self.agents}
+
+    def step(self, actions: dict) -> tuple[dict, dict, dict, dict, dict]:
+        # Agents without an action do nothing this frame
+        action_array = np.array([actions.get(agent, 0) for agent in self.possible_agents], dtype=np.intp)
+        alive = [(i, agent) for i, agent in enumerate(self.possible_agents) if agent in self.agents]
+        obs, rewards, terminations, truncations = self.step_arrays(action_array)
+
+        result = (
+            {agent: obs[i] for i, agent in alive},
+            {agent: float(rewards[i]) for i, agent in alive},
+            {agent: bool(terminations[i]) for i, agent in alive},
+            {agent: bool(truncations[i]) for i, agent in alive},
+            {agent: {} for _, agent in alive},
+        )
+        self.agents = [agent for i, agent in alive if not (terminations[i] or truncations[i])]
+        return result
+
+    def render(self) -> None:
+        if self.render_mode is None:
+            gym.logger.warn(
+                "You are calling render method without specifying any render mode."
+            )
+            return
+
+        if self._game_view is None:
+            pygame.init()
+            self._game_view = PygameView(self.game.get_scene_init_data())
+
+        pygame.time.Clock().tick(self.metadata["render_fps"])
+        self._game_view.draw(self.game.get_scene_progress_data())
+
+    def close(self) -> None:
+        if self._game_view is not None:
+            pygame.quit()
+            self._game_view = None
+
+    def _update_obs(self) -> None:
+        # The observation of the frame is shared by the game, so copy it out
+        self._structured_obs = self.game.get_observation()
+        self._obs[:] = self._structured_obs.view(np.float32).reshape(self.player_num, -1)
+
+    def _obs_field(self, name: str) -> np.ndarray:
+        return self._structured_obs["self"][name].astype(np.float32)
@@ -0,0 +1,304 @@
+import sys
+from os import path
+
+sys.path.append(
+    path.dirname(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))))
+)
+
+from abc import abstractmethod
+from typing import Any, Optional, Sequence, Type
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.spaces import Box, Discrete
+from mlgame.utils.enum import get_ai_name
+from stable_baselines3.common.vec_env import VecEnv
+from stable_baselines3.common.vec_env.base_vec_env import VecEnvIndices, VecEnvObs, VecEnvStepReturn
+
+from src.Game import Game
+from src.ObservationBuilder import PLAYER_FIELDS, ObservationBuilder, angle_to_index
+from src.action import ACTION_NONE, BACKWARD_ACTION, FORWARD_ACTION, TURN_LEFT_ACTION, TURN_RIGHT_ACTION
+from .resupply_env import CELL_PIXEL_SIZE, COMMAND, HEIGHT, TANK_SPEED, WIDTH
+from .utils import normalize_obs
+
+X = PLAYER_FIELDS.index("x")
+Y = PLAYER_FIELDS.index("y")
+ANGLE = PLAYER_FIELDS.index("angle")
+OIL = PLAYER_FIELDS.index("oil")
+
+
+class TankManVecEnv(VecEnv):
+    """
+    Step N headless TankMan games in a single process.
+
+    A drop-in replacement for ``SubprocVecEnv`` / ``DummyVecEnv`` that owns the
+    ``Game`` instances directly instead of wrapping one gym env per game. Each
+    step the actions of all games are written into one (n_envs, player_num)
+    action bitmask array whose rows go straight into ``Game.update``, and the
+    controlled players of all games are read into one stacked table (see
+    src.ObservationBuilder), so the task computes observations, rewards and
+    dones for every game with a few NumPy operations.
+
+    Like a single-player TankManBaseEnv, each game has one controlled player
+    (``player_index``) and the other tanks send "NONE". Finished games are
+    reset automatically and the last observation is kept in
+    ``info["terminal_observation"]``, as stable-baselines3 expects.
+
+    Subclasses define the task with ``_reset_task``, ``_get_obs``,
+    ``_get_reward``, ``_is_done`` and ``_get_actions``, and list their per-env
+    state, indexed by env, in ``ENV_ATTRS``.
+    """
+
+    # Attributes holding one item per env, get_attr / set_attr apply them by index
+    ENV_ATTRS = ("games", "builders", "player_index", "players")
+
+    def __init__(
+        self,
+        n_envs: int,
+        green_team_num: int,
+        blue_team_num: int,
+        frame_limit: int,
+        observation_space: Box,
+        action_space: gym.Space,
+        normalize: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        :param n_envs: number of games stepped together
+        :param normalize: scale observations to [0, 1] with the observation space bounds
+        :param seed: seed of the task's random generator, e.g. the controlled player and targets
+        """
+        self.green_team_num = green_team_num
+        self.blue_team_num = blue_team_num
+        self.player_num = green_team_num + blue_team_num
+        self.frame_limit = frame_limit
+        self.normalize = normalize
+        self.np_random = np.random.default_rng(seed)
+        # Games in a vectorized env are never drawn, so they always run headless
+        self.render_mode = None
+        self.games = [
+            Game(self.player_num, green_team_num, blue_team_num, "", frame_limit, "off", headless=True)
+            for _ in range(n_envs)
+        ]
+        self.builders = [ObservationBuilder(game.game_mode) for game in self.games]
+        self.env_index = np.arange(n_envs)
+        self.player_index = np.zeros(n_envs, dtype=np.intp)
+        super().__init__(n_envs, observation_space, action_space)
+
+        self.buf_actions = np.full((n_envs, self.player_num), ACTION_NONE, dtype=np.uint8)
+        self.actions: Optional[np.ndarray] = None
+
+    @property
+    def players(self) -> list[str]:
+        """The controlled player of every game, e.g. "1P" """
+        return [get_ai_name(index) for index in self.player_index]
+
+    def _process_obs(self, obs: np.ndarray) -> np.ndarray:
+        if self.normalize:
+            return normalize_obs(obs, self.observation_space).astype(np.float32)
+        return obs
+
+    def _get_players(self, indices: np.ndarray) -> np.ndarray:
+        """The controlled player of each game in indices, one PLAYER_FIELDS row per game"""
+        return np.stack(
+            [self.builders[i].create_players_table()[self.player_index[i]] for i in indices]
+        )
+
+    def _reset_games(self, indices: np.ndarray, seeds: Sequence[Optional[int]]) -> np.ndarray:
+        """Reset the games in indices and return their first observations, processed"""
+        self._reset_task(indices)
+        for i, seed in zip(indices, seeds):
+            self.games[i].reset(seed=seed)
+            # The players are created again, so is the table built from them
+            self.builders[i] = ObservationBuilder(self.games[i].game_mode)
+        return self._process_obs(self._get_obs(indices, self._get_players(indices)))
+
+    def reset(self) -> VecEnvObs:
+        obs = self._reset_games(self.env_index, self._seeds)
+        self._reset_seeds()
+        self._reset_options()
+        return obs
+
+    def step_async(self, actions: np.ndarray) -> None:
+        self.actions = np.asarray(actions)
+
+    def step_wait(self) -> VecEnvStepReturn:
+        # Same order as TankManBaseEnv.step: observe the current frame, then play the actions
+        players = self._get_players(self.env_index)
+        obs = self._process_obs(self._get_obs(self.env_index, players))
+        rewards = self._get_reward(obs, self.actions).astype(np.float32)
+        dones = self._is_done(players)
+
+        self.buf_actions[:] = ACTION_NONE
+        self.buf_actions[self.env_index, self.player_index] = self._get_actions(self.actions)
+        for game, actions in zip(self.games, self.buf_actions):
+            game.update(actions)
+
+        infos: list[dict[str, Any]] = [{"TimeLimit.truncated": False} for _ in self.games]
+        done_index = np.flatnonzero(dones)
+        if len(done_index):
+            for i in done_index:
+                infos[i]["terminal_observation"] = obs[i]
+            obs = obs.copy()
+            obs[done_index] = self._reset_games(done_index, [None] * len(done_index))
+        return obs, rewards, dones, infos
+
+    def close(self) -> None:
+        self.games = []
+        self.builders = []
+
+    def get_images(self) -> Sequence[Optional[np.ndarray]]:
+        return [None for _ in self._get_indices(None)]
+
+    # The games have no env objects of their own. Per-env attributes (ENV_ATTRS) are
+    # read and written by index, the others are shared by every env.
+    def get_attr(self, attr_name: str, indices: VecEnvIndices = None) -> list[Any]:
+        value = getattr(self, attr_name)
+        if attr_name in self.ENV_ATTRS:
+            return [value[i] for i in self._get_indices(indices)]
+        return [value for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value: Any, indices: VecEnvIndices = None) -> None:
+        if attr_name in self.ENV_ATTRS:
+            if isinstance(getattr(type(self), attr_name, None), property):
+                raise AttributeError(f"{attr_name} is read-only")
+            items = getattr(self, attr_name)
+            for i in self._get_indices(indices):
+                items[i] = value
+        elif indices is None or sorted(self._get_indices(indices)) == list(range(self.num_envs)):
+            setattr(self, attr_name, value)
+        else:
+            raise AttributeError(f"{attr_name} is shared by every env and cannot be set for some of them")
+
+    def env_method(self, method_name: str, *method_args, indices: VecEnvIndices = None, **method_kwargs) -> list[Any]:
+        # Methods act on the whole vectorized env, calling them once per env would repeat them
+        raise AttributeError(f"{type(self).__name__} has no per-env methods, cannot call {method_name}")
+
+    def env_is_wrapped(self, wrapper_class: Type[gym.Wrapper], indices: VecEnvIndices = None) -> list[bool]:
+        # The games are owned directly, they are never wrapped
+        return [False for _ in self._get_indices(indices)]
+
+    @abstractmethod
+    def _reset_task(self, indices: np.ndarray) -> None:
+        """Pick the controlled player and task state of the games in indices before they are reset."""
+
+    @abstractmethod
+    def _get_obs(self, indices: np.ndarray, players: np.ndarray) -> np.ndarray:
+        """
+        Return the observations of the games in indices.
+        :param players: the controlled player of each game, see _get_players
+        """
+
+    @abstractmethod
+    def _get_reward(self, obs: np.ndarray, actions: np.ndarray) -> np.ndarray:
+        """Return the rewards of all games."""
+
+    @abstractmethod
+    def _is_done(self, players: np.ndarray) -> np.ndarray:
+        """Return the done states of all games."""
+
+    @abstractmethod
+    def _get_actions(self, actions: np.ndarray) -> np.ndarray:
+        """Return the action bitmask of the controlled player of every game, see src.action."""
+
+
+class ResupplyVecEnv(TankManVecEnv):
+    """
+    The task of ResupplyEnv on N games: the observation is
+    [tank_angle_index, angle_to_target_index] towards a randomly moving target
+    and the reward is the forward reward of ResupplyEnv.
+    """
+
+    ENV_ATTRS = TankManVecEnv.ENV_ATTRS + ("targets", "supply_types")
+
+    # Action bitmask of each COMMAND index
+    ACTIONS = np.array(
+        [ACTION_NONE, FORWARD_ACTION, BACKWARD_ACTION, TURN_LEFT_ACTION, TURN_RIGHT_ACTION],
+        dtype=np.uint8,
+    )
+
+    def __init__(
+        self,
+        n_envs: int,
+        green_team_num: int,
+        blue_team_num: int,
+        frame_limit: int,
+        player: Optional[str] = None,
+        supply_type: Optional[str] = None,
+        randomize: Optional[bool] = False,
+        normalize: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
+        player_num = green_team_num + blue_team_num
+        self.randomize = randomize
+        if not self.randomize:
+            assert player is not None and supply_type is not None
+            assert player in [
+                get_ai_name(i) for i in range(player_num)
+            ], f"{player} is not a valid player id"
+            assert supply_type in [
+                "oil_stations",
+                "bullet_stations",
+            ], f"{supply_type} is not a valid supply type"
+        self.player = player
+        self.supply_type = supply_type
+        self.targets = np.zeros((n_envs, 2), dtype=np.float64)
+        assert len(COMMAND) == len(self.ACTIONS)
+
+        super().__init__(
+            n_envs,
+            green_team_num,
+            blue_team_num,
+            frame_limit,
+            observation_space=Box(low=0, high=7, shape=(2,), dtype=np.float32),
+            action_space=Discrete(len(COMMAND)),
+            normalize=normalize,
+            seed=seed,
+        )
+        # An object array, so that a supply type set for one env is not cut to the width of the others
+        if self.randomize:
+            self.supply_types = self.np_random.choice(["oil_stations", "bullet_stations"], size=n_envs).astype(object)
+        else:
+            self.player_index[:] = int(player[:-1]) - 1
+            self.supply_types = np.full(n_envs, supply_type, dtype=object)
+
+    def _reset_task(self, indices: np.ndarray) -> None:
+        if self.randomize:
+            self.player_index[indices] = self.np_random.integers(self.player_num, size=len(indices))
+        self.targets[indices, 0] = self.np_random.integers(CELL_PIXEL_SIZE, WIDTH - 2 * CELL_PIXEL_SIZE + 1,
+                                                           size=len(indices))
+        self.targets[indices, 1] = self.np_random.integers(CELL_PIXEL_SIZE, HEIGHT - 2 * CELL_PIXEL_SIZE + 1,
+                                                           size=len(indices))
+
+    def _get_obs(self, indices: np.ndarray, players: np.ndarray) -> np.ndarray:
+        # The target moves every time it is observed, like ResupplyEnv.update_target_position
+        targets = self.targets[indices] + self.np_random.choice([-TANK_SPEED, 0, TANK_SPEED], size=(len(indices), 2))
+        targets[:, 0] = np.clip(targets[:, 0], CELL_PIXEL_SIZE, WIDTH - 2 * CELL_PIXEL_SIZE)
+        targets[:, 1] = np.clip(targets[:, 1], CELL_PIXEL_SIZE, HEIGHT - 2 * CELL_PIXEL_SIZE)
+        self.targets[indices] = targets
+
+        dx = targets[:, 0] - players[:, X]
+        dy = targets[:, 1] - players[:, Y]
+        angle_to_target = 180 - np.degrees(np.arctan2(dy, dx))
+        return np.stack(
+            [angle_to_index(players[:, ANGLE].astype(np.float64)), angle_to_index(angle_to_target)], axis=1
+        ).astype(np.float32)
+
+    def _get_reward(self, obs: np.ndarray, actions: np.ndarray) -> np.ndarray:
+        if self.normalize:
+            obs = np.rint(obs * 7)
+        # How far the tank has to turn left to face the target, see ResupplyEnv.cal_forward_reward
+        diff = (obs[:, 0] - obs[:, 1]) % 8
+        actions = np.asarray(actions).reshape(-1)
+        rewards = np.where(actions == 1, 1.0, -1.0)
+        rewards = np.where(diff == 4, np.where(actions == 2, 1.0, -1.0), rewards)
+        rewards = np.where(diff >= 5, np.where(actions == 3, 0.25, -0.25), rewards)
+        rewards = np.where((diff >= 1) & (diff <= 3), np.where(actions == 4, 0.25, -0.25), rewards)
+        return rewards
+
+    def _is_done(self, players: np.ndarray) -> np.ndarray:
+        is_running = np.array([game.is_running() for game in self.games])
+        return ~is_running | (players[:, OIL] == 0)
+
+    def _get_actions(self, actions: np.ndarray) -> np.ndarray:
+        return self.ACTIONS[np.asarray(actions, dtype=np.intp).reshape(-1)]
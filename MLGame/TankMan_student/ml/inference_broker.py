@@ -0,0 +1,166 @@
+"""
+Batch the ``model.predict`` calls of every bot in a frame into one forward pass.
+
+``InferenceBroker.run_frame`` runs each bot's ``update`` in its own thread,
+but only one thread runs at a time, in player order, so a frame is still
+played synchronously and reproducibly. When a bot calls ``predict`` on a
+model handed out by ``InferenceBroker.wrap``, it pauses there. After every bot
+has either paused or finished, the observations waiting on the same model
+are stacked and predicted together, and the bots resume in player order.
+Bots that do not use wrapped models run exactly as before.
+
+The code after ``predict`` of every bot runs only after the code before
+``predict`` of every bot, unlike a serial frame where each bot finishes
+before the next one starts. Bots that draw from the global ``random`` or
+``np.random`` generators, or have other side effects seen by other bots, are
+therefore not reproduced exactly and may act differently from a serial run.
+That is why contest.py and tournament.py only batch with ``--batch_inference``.
+"""
+import threading
+
+import numpy as np
+
+_current_slot = threading.local()
+
+
+class _BotSlot:
+    """A worker thread that runs one bot's update per frame and pauses at predict."""
+
+    def __init__(self):
+        self.resume = threading.Semaphore(0)
+        self.paused = threading.Semaphore(0)
+        self.job = None
+        self.result = None
+        self.error = None
+        self.is_done = True
+        # (model, observation, deterministic) while paused at predict
+        self.request = None
+        self.response = None
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def _loop(self):
+        _current_slot.slot = self
+        while True:
+            self.resume.acquire()
+            job = self.job
+            if job is None:
+                return
+            try:
+                self.result = job()
+            except BaseException as e:
+                self.error = e
+            self.is_done = True
+            self.paused.release()
+
+    def start(self, job):
+        self.job = job
+        self.result = None
+        self.error = None
+        self.is_done = False
+        self.step()
+
+    def step(self):
+        """Let the bot run until it pauses at predict or finishes."""
+        self.resume.release()
+        self.paused.acquire()
+
+    def wait_for_prediction(self, model, observation, deterministic: bool):
+        self.request = (model, observation, deterministic)
+        self.paused.release()
+        self.resume.acquire()
+        return self.response
+
+    def close(self):
+        self.job = None
+        self.resume.release()
+        self.thread.join()
+
+
+class BatchedModel:
+    """
+    A stable-baselines3 model whose ``predict`` is batched by an InferenceBroker.
+    Every other attribute is read from the wrapped model.
+    """
+
+    def __init__(self, model, broker: "InferenceBroker"):
+        self.model = model
+        self.broker = broker
+
+    def predict(self, observation, state=None, episode_start=None, deterministic: bool = False):
+        if state is not None or episode_start is not None:
+            return self.model.predict(observation, state, episode_start, deterministic)
+        return self.broker.predict(self.model, observation, deterministic)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+class InferenceBroker:
+    def __init__(self):
+        self.slots = []
+        # model -> BatchedModel
+        self.wrapped_models = {}
+
+    def wrap(self, model) -> BatchedModel:
+        if isinstance(model, BatchedModel):
+            return model
+        wrapped = self.wrapped_models.get(model)
+        if wrapped is None:
+            wrapped = BatchedModel(model, self)
+            self.wrapped_models[model] = wrapped
+        return wrapped
+
+    def predict(self, model, observation, deterministic: bool = False):
+        slot = getattr(_current_slot, "slot", None)
+        if slot is None or slot not in self.slots or not deterministic \
+                or np.shape(observation) != model.observation_space.shape:
+            # not called from run_frame, sampled actions or an already batched observation
+            return model.predict(observation, deterministic=deterministic)
+        return slot.wait_for_prediction(model, observation, deterministic)
+
+    def run_frame(self, jobs: list) -> list:
+        """
+        :param jobs: zero-argument callables, usually one bot's update each
+        :return: the results of the jobs in the same order
+        """
+        while len(self.slots) < len(jobs):
+            self.slots.append(_BotSlot())
+        slots = self.slots[:len(jobs)]
+        for slot, job in zip(slots, jobs):
+            slot.start(job)
+        while True:
+            paused_slots = [slot for slot in slots if not slot.is_done]
+            if not paused_slots:
+                break
+            self._predict_batches(paused_slots)
+            for slot in paused_slots:
+                slot.step()
+        for slot in slots:
+            if slot.error is not None:
+                raise slot.error
+        return [slot.result for slot in slots]
+
+    def _predict_batches(self, slots: list):
+        # (model, deterministic) -> [slot, ...], in player order
+        batches = {}
+        for slot in slots:
+            model, _, deterministic = slot.request
+            batches.setdefault((model, deterministic), []).append(slot)
+        for (model, deterministic), batch_slots in batches.items():
+            if len(batch_slots) == 1:
+                slot = batch_slots[0]
+                slot.response = model.predict(slot.request[1], deterministic=deterministic)
+            else:
+                observations = np.stack([np.asarray(slot.request[1]) for slot in batch_slots])
+                actions, _ = model.predict(observations, deterministic=deterministic)
+                for i, slot in enumerate(batch_slots):
+                    # same shape as predicting a single observation
+                    slot.response = (actions[i:i + 1].squeeze(axis=0), None)
+            for slot in batch_slots:
+                slot.request = None
+
+    def close(self):
+        for slot in self.slots:
+            slot.close()
+        self.slots = []
@@ -0,0 +1,145 @@
+"""
+Load every stable-baselines3 model zip once per process and share it.
+
+Student bots call ``PPO.load(path)`` in ``MLPlay.__init__``. In a contest the
+same aim/chase zips are loaded again for every bot and every pairing. After
+``share_loaded_models()`` is called, ``PPO.load`` returns a shared model for
+a (path, content hash, load options) key, so the bots themselves do not need
+to change. Shared models are only used for ``predict`` and must not be
+trained or modified.
+"""
+import hashlib
+import inspect
+import os
+
+# (model class, absolute path, content hash, load options) -> model
+_model_cache = {}
+# absolute path -> (mtime_ns, size, content hash), so a file is only hashed again after it changes
+_file_hash_cache = {}
+# patched model class -> the original load function (not bound to a class)
+_original_loads = {}
+# InferenceBroker that wraps the models handed out by the patched load, if any
+_broker = None
+
+
+def get_file_hash(path: str) -> str:
+    stat = os.stat(path)
+    cached = _file_hash_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    sha1 = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha1.update(chunk)
+    _file_hash_cache[path] = (stat.st_mtime_ns, stat.st_size, sha1.hexdigest())
+    return sha1.hexdigest()
+
+
+def _get_zip_path(path) -> str:
+    # stable-baselines3 accepts the path without the .zip suffix
+    path = os.fspath(path)
+    if not os.path.exists(path) and os.path.exists(path + ".zip"):
+        path += ".zip"
+    return os.path.abspath(path)
+
+
+def _get_original_load(model_cls):
+    for cls in model_cls.__mro__:
+        if cls in _original_loads:
+            return _original_loads[cls].__get__(model_cls)
+    return model_cls.load
+
+
+def load_model(path, model_cls=None, **kwargs):
+    """
+    Load a model once per process.
+
+    :param path: the model zip, with or without the .zip suffix
+    :param model_cls: the algorithm class, PPO by default
+    :param kwargs: passed to ``model_cls.load``, e.g. device="cpu"
+    :return: a model shared with every other caller using the same file and options
+    """
+    if model_cls is None:
+        from stable_baselines3 import PPO
+        model_cls = PPO
+    original_load = _get_original_load(model_cls)
+    zip_path = _get_zip_path(path)
+    options = _bind_load_arguments(original_load, zip_path, (), kwargs)
+    key = (model_cls, zip_path, get_file_hash(zip_path), repr(sorted(options.items())))
+    model = _model_cache.get(key)
+    if model is None:
+        model = original_load(zip_path, **kwargs)
+        model.policy.set_training_mode(False)
+        _model_cache[key] = model
+    return model
+
+
+def clear_model_cache() -> None:
+    _model_cache.clear()
+    _file_hash_cache.clear()
+
+
+def _bind_load_arguments(load, path, args: tuple, kwargs: dict):
+    """
+    Name every argument of a load call except the path, including positional ones such as
+    ``PPO.load(path, None, "cpu")`` and the defaults, so equal calls get the same cache key.
+    Raises TypeError for arguments ``load`` does not accept, like the original call would.
+
+    :return: None if there are extra positional arguments without a name
+    """
+    signature = inspect.signature(load)
+    bound = signature.bind(path, *args, **kwargs)
+    bound.apply_defaults()
+    named = {}
+    # The first parameter is the path
+    for name, value in list(bound.arguments.items())[1:]:
+        kind = signature.parameters[name].kind
+        if kind is inspect.Parameter.VAR_KEYWORD:
+            named.update(value)
+        elif kind is inspect.Parameter.VAR_POSITIONAL:
+            if value:
+                return None
+        else:
+            named[name] = value
+    return named
+
+
+def _shared_load(cls, path, *args, **kwargs):
+    original_load = _get_original_load(cls)
+    named = _bind_load_arguments(original_load, path, args, kwargs)
+    # Unnamed extra positional arguments or a bound env are not shared
+    if named is None or named.get("env") is not None:
+        return original_load(path, *args, **kwargs)
+    named.pop("env", None)
+    model = load_model(path, cls, **named)
+    if _broker is not None:
+        return _broker.wrap(model)
+    return model
+
+
+def share_loaded_models(*model_classes, broker=None) -> bool:
+    """
+    Make ``model_cls.load(path, ...)`` go through ``load_model`` for the given classes.
+
+    Loads that bind an environment (``env=...``) are not shared and use the
+    original loader.
+
+    :param model_classes: defaults to (PPO,)
+    :param broker: an InferenceBroker; loaded models are then wrapped so their predict calls are batched
+    :return: False if stable-baselines3 is not installed, nothing is patched then
+    """
+    global _broker
+    _broker = broker
+    if not model_classes:
+        try:
+            from stable_baselines3 import PPO
+        except ImportError:
+            return False
+        model_classes = (PPO,)
+
+    for model_cls in model_classes:
+        if model_cls in _original_loads:
+            continue
+        _original_loads[model_cls] = model_cls.load.__func__
+        model_cls.load = classmethod(_shared_load)
+    return True
@@ -1,9 +1,10 @@
-from stable_baselines3.common.vec_env import SubprocVecEnv
+from stable_baselines3.common.vec_env import SubprocVecEnv, VecFrameStack
 import os
 import time
 from argparse import ArgumentParser, Namespace
 
 import gym_env.tankman
+from gym_env.tankman.vec_env import ResupplyVecEnv
 from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import (CallbackList,
                                                 CheckpointCallback,
@@ -26,6 +27,13 @@ def parser_arg() -> Namespace:
     # Training Hyperparameters
     parser.add_argument("--total-time-steps", type=int, default=10000000)
     parser.add_argument("--n-envs", type=int, default=4)
+    parser.add_argument(
+        "--vec-env",
+        type=str,
+        default="subproc",
+        choices=["subproc", "batch"],
+        help="subproc: one process per env, batch: step all envs in this process",
+    )
 
     # PPO Hyperparameters
     parser.add_argument("--hidden-sizes", type=int, nargs="*", default=[64, 64])
@@ -45,9 +53,19 @@ def parser_arg() -> Namespace:
     return parser.parse_args()
 
 
-def train(opts: Namespace) -> None:
-    # Environment
-    vec_env = make_vec_env(
+def make_train_env(opts: Namespace):
+    if opts.vec_env == "batch":
+        vec_env = ResupplyVecEnv(
+            n_envs=opts.n_envs,
+            green_team_num=opts.green_team_num,
+            blue_team_num=opts.blue_team_num,
+            frame_limit=opts.frame_limit,
+            randomize=True,
+            normalize=True,
+        )
+        return VecFrameStack(vec_env, opts.stack_num)
+
+    return make_vec_env(
         get_env,
         env_kwargs={  # This one is for the envwrapper
             "env_id": "TankManResupply-v0",
@@ -64,6 +82,11 @@ def train(opts: Namespace) -> None:
         vec_env_cls=SubprocVecEnv
     )
 
+
+def train(opts: Namespace) -> None:
+    # Environment
+    vec_env = make_train_env(opts)
+
     # Policy
     model = PPO(
         policy="MlpPolicy",
@@ -0,0 +1,57 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import random
+import time
+from argparse import ArgumentParser, Namespace
+
+from mlgame.utils.enum import get_ai_name
+
+from src.Game import Game
+from src.env import TURN_LEFT_CMD, TURN_RIGHT_CMD, FORWARD_CMD, BACKWARD_CMD, AIM_LEFT_CMD, AIM_RIGHT_CMD, SHOOT
+
+COMMANDS = [["NONE"], [TURN_LEFT_CMD], [TURN_RIGHT_CMD], [FORWARD_CMD], [BACKWARD_CMD],
+            [AIM_LEFT_CMD], [AIM_RIGHT_CMD], [SHOOT]]
+
+
+def parser_arg() -> Namespace:
+    parser = ArgumentParser(description="Compare TankMan steps/sec with and without headless mode")
+    parser.add_argument("--maps", type=str, nargs="*", default=["1v1", "3v3"], help="team sizes, e.g. 1v1 3v3")
+    parser.add_argument("--frame-limit", type=int, default=1000)
+    parser.add_argument("--episodes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def run_steps(green_team_num: int, blue_team_num: int, frame_limit: int, episodes: int, seed: int,
+              headless: bool) -> float:
+    """Play random commands for a few episodes and return env steps per second"""
+    random.seed(seed)
+    rng = random.Random(seed)
+    user_num = green_team_num + blue_team_num
+    game = Game(user_num, green_team_num, blue_team_num, "", frame_limit, "off", headless=headless)
+    steps = 0
+    start = time.perf_counter()
+    for episode in range(episodes):
+        if episode:
+            game.reset()
+        while game.is_running():
+            game.get_data_from_game_to_player()
+            game.update({get_ai_name(i): list(rng.choice(COMMANDS)) for i in range(user_num)})
+            steps += 1
+    return steps / (time.perf_counter() - start)
+
+
+def main(opts: Namespace) -> None:
+    print(f"{'map':<6}{'default':>14}{'headless':>14}{'speedup':>10}")
+    for map_name in opts.maps:
+        green_team_num, blue_team_num = (int(num) for num in map_name.split("v"))
+        default = run_steps(green_team_num, blue_team_num, opts.frame_limit, opts.episodes, opts.seed, False)
+        headless = run_steps(green_team_num, blue_team_num, opts.frame_limit, opts.episodes, opts.seed, True)
+        print(f"{map_name:<6}{default:>14.1f}{headless:>14.1f}{headless / default:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main(parser_arg())
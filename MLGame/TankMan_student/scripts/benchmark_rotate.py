@@ -0,0 +1,58 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import timeit
+
+import pygame
+from mlgame.utils.enum import get_ai_name
+
+from src.Game import Game
+from src.game_module.geometry import get_rotated_rect
+
+SIZE = (50, 50)
+ROT_LIST = [rot for rot in range(0, 360, 45)]
+
+
+def rotate_with_surface(surface: pygame.Surface, center: tuple) -> list:
+    """Player.rotate / Gun.rotate 原本的做法"""
+    rect_list = []
+    for rot in ROT_LIST:
+        rect = pygame.transform.rotate(surface, rot).get_rect()
+        rect.center = center
+        rect_list.append(rect)
+    return rect_list
+
+
+def rotate_with_table(center: tuple) -> list:
+    return [get_rotated_rect(SIZE, rot, center) for rot in ROT_LIST]
+
+
+def count_surface_rotations(frame_limit: int) -> int:
+    """在 headless 3v3 遊戲中計算 pygame.transform.rotate 被呼叫的次數"""
+    calls = []
+    rotate = pygame.transform.rotate
+    pygame.transform.rotate = lambda *args: calls.append(args) or rotate(*args)
+    try:
+        game = Game(6, 3, 3, "", frame_limit, "off", headless=True)
+        while game.is_running():
+            game.update({get_ai_name(i): ["TURN_LEFT"] if i % 2 else ["AIM_RIGHT"] for i in range(6)})
+    finally:
+        pygame.transform.rotate = rotate
+    return len(calls)
+
+
+if __name__ == "__main__":
+    surface = pygame.Surface(SIZE)
+    center = (125, 75)
+    assert [rect.size for rect in rotate_with_surface(surface, center)] == \
+           [rect.size for rect in rotate_with_table(center)]
+    number = 20000
+    surface_time = timeit.timeit(lambda: rotate_with_surface(surface, center), number=number)
+    table_time = timeit.timeit(lambda: rotate_with_table(center), number=number)
+    per_call = number * len(ROT_LIST)
+    print(f"pygame.transform.rotate + get_rect: {surface_time / per_call * 1e6:.3f} us/rotate")
+    print(f"rotated size table:                 {table_time / per_call * 1e6:.3f} us/rotate")
+    # 只有第一次用到某個 size 時建表會呼叫 8 次
+    print(f"pygame.transform.rotate calls in a 1000-frame 3v3 game: {count_surface_rotations(1000)}")
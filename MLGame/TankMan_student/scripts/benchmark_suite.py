@@ -0,0 +1,195 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import glob
+import json
+import platform
+import random
+import re
+import time
+import tracemalloc
+from argparse import ArgumentParser, Namespace
+
+import pygame
+from mlgame.game.paia_game import GameStatus
+from mlgame.utils.enum import get_ai_name
+
+from src.TeamBattleMode import TeamBattleMode
+from src.game_module.FrameProfiler import FrameProfiler
+from src.env import MAP_DIR, TURN_LEFT_CMD, TURN_RIGHT_CMD, FORWARD_CMD, BACKWARD_CMD, AIM_LEFT_CMD, \
+    AIM_RIGHT_CMD, SHOOT
+
+BASELINE_PATH = path.join(path.dirname(path.abspath(__file__)), "benchmark_baseline.json")
+PLAY_RECT_AREA = (0, 0, 1000, 600)
+COMMANDS = ["NONE", TURN_LEFT_CMD, TURN_RIGHT_CMD, FORWARD_CMD, BACKWARD_CMD, AIM_LEFT_CMD, AIM_RIGHT_CMD, SHOOT]
+
+
+def random_bot(rng: random.Random, ai_name: str) -> list:
+    return [rng.choice(COMMANDS)]
+
+
+def idle_bot(rng: random.Random, ai_name: str) -> list:
+    return ["NONE"]
+
+
+def shoot_bot(rng: random.Random, ai_name: str) -> list:
+    return [SHOOT]
+
+
+BOTS = {"random": random_bot, "idle": idle_bot, "shoot": shoot_bot}
+
+
+def get_shipped_maps() -> list:
+    """(green_team_num, blue_team_num) of every map_<green>_v_<blue>.tmx in the asset folder"""
+    maps = []
+    for map_path in glob.glob(path.join(MAP_DIR, "map_*_v_*.tmx")):
+        match = re.fullmatch(r"map_(\d+)_v_(\d+)\.tmx", path.basename(map_path))
+        if match:
+            maps.append((int(match.group(1)), int(match.group(2))))
+    return sorted(maps)
+
+
+def parser_arg() -> Namespace:
+    parser = ArgumentParser(description="Run fixed TankMan scenarios and compare them against a stored baseline")
+    parser.add_argument("--maps", type=str, nargs="*", default=None,
+                        help="team sizes, e.g. 1v1 3v3, defaults to every shipped map")
+    parser.add_argument("--bots", type=str, nargs="*", default=list(BOTS), choices=list(BOTS))
+    parser.add_argument("--frames", type=int, default=2000, help="frames played per scenario")
+    parser.add_argument("--frame-limit", type=int, default=1000, help="frame limit of one game")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed relative slowdown or memory growth before a scenario is a regression")
+    parser.add_argument("--output", type=str, default=None, help="also write the results to this JSON file")
+    return parser.parse_args()
+
+
+def create_game_mode(green_team_num: int, blue_team_num: int, frame_limit: int, seed: int,
+                     profiler: FrameProfiler = None) -> TeamBattleMode:
+    return TeamBattleMode(green_team_num, blue_team_num, False, frame_limit, "", pygame.Rect(PLAY_RECT_AREA),
+                          headless=True, seed=seed, profiler=profiler)
+
+
+def play_frames(green_team_num: int, blue_team_num: int, bot, frames: int, frame_limit: int, seed: int,
+                profiler: FrameProfiler = None) -> None:
+    """
+    Play ``frames`` frames like Game does, starting a new game whenever one ends.
+
+    :param profiler: records the phases of every frame, and the whole update as "game_mode.update" like Game,
+                     nothing is timed if None
+    """
+    rng = random.Random(seed)
+    game_mode = create_game_mode(green_team_num, blue_team_num, frame_limit, seed, profiler)
+    ai_names = [get_ai_name(i) for i in range(green_team_num + blue_team_num)]
+    for _ in range(frames):
+        if game_mode.status != GameStatus.GAME_ALIVE:
+            game_mode.reset()
+        game_mode.get_ai_data_to_player()
+        commands = {ai_name: bot(rng, ai_name) for ai_name in ai_names}
+        if profiler:
+            start = profiler.clock()
+            game_mode.update(commands)
+            profiler.add("game_mode.update", profiler.clock() - start)
+        else:
+            game_mode.update(commands)
+
+
+def run_scenario(green_team_num: int, blue_team_num: int, bot_name: str, frames: int, frame_limit: int,
+                 seed: int) -> dict:
+    """
+    Time a scenario, then play it again under tracemalloc for the peak memory.
+
+    :return: frames per second, milliseconds per frame of each phase and the peak memory in KiB,
+             "update" does not include the phases timed inside it
+    """
+    bot = BOTS[bot_name]
+    profiler = FrameProfiler()
+    start = time.perf_counter()
+    play_frames(green_team_num, blue_team_num, bot, frames, frame_limit, seed, profiler)
+    total = time.perf_counter() - start
+    phases = profiler.export()
+    collision_ms = phases["check_collisions"]["total_ms"]
+    phase_ms = {"scene_info": phases["get_ai_data_to_player"]["total_ms"],
+                "update": phases["game_mode.update"]["total_ms"] - collision_ms,
+                "collision": collision_ms}
+
+    # tracemalloc slows every allocation down, so memory is measured in its own run
+    tracemalloc.start()
+    try:
+        play_frames(green_team_num, blue_team_num, bot, min(frames, frame_limit), frame_limit, seed)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result = {"fps": round(frames / total, 1)}
+    for phase, milliseconds in phase_ms.items():
+        result[f"{phase}_ms"] = round(milliseconds / frames, 4)
+    result["peak_kib"] = round(peak / 1024, 1)
+    return result
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    :return: a message for every scenario that is slower or uses more memory than the baseline allows
+    """
+    regressions = []
+    for scenario, result in results.items():
+        base = baseline.get(scenario)
+        if base is None:
+            continue
+        if result["fps"] < base["fps"] * (1 - tolerance):
+            regressions.append(f"{scenario}: {result['fps']:.1f} fps, baseline {base['fps']:.1f} fps")
+        if result["peak_kib"] > base["peak_kib"] * (1 + tolerance):
+            regressions.append(f"{scenario}: peak {result['peak_kib']:.0f} KiB, baseline {base['peak_kib']:.0f} KiB")
+    return regressions
+
+
+def main(opts: Namespace) -> int:
+    if opts.maps:
+        maps = [tuple(int(num) for num in map_name.split("v")) for map_name in opts.maps]
+    else:
+        maps = get_shipped_maps()
+    settings = {"frames": opts.frames, "frame_limit": opts.frame_limit, "seed": opts.seed}
+    baseline = {}
+    if path.exists(opts.baseline) and not opts.save_baseline:
+        with open(opts.baseline) as f:
+            stored = json.load(f)
+        if all(stored["settings"].get(key) == value for key, value in settings.items()):
+            baseline = stored["results"]
+        else:
+            print(f"{opts.baseline} was run with other settings, not comparing")
+
+    results = {}
+    print(f"{'scenario':<14}{'fps':>10}{'baseline':>10}{'scene_info':>12}{'collision':>11}{'update':>9}"
+          f"{'peak KiB':>10}")
+    for green_team_num, blue_team_num in maps:
+        for bot_name in opts.bots:
+            scenario = f"{green_team_num}v{blue_team_num}-{bot_name}"
+            result = run_scenario(green_team_num, blue_team_num, bot_name, opts.frames, opts.frame_limit, opts.seed)
+            results[scenario] = result
+            base_fps = baseline.get(scenario, {}).get("fps")
+            print(f"{scenario:<14}{result['fps']:>10.1f}{base_fps if base_fps else '-':>10}"
+                  f"{result['scene_info_ms']:>12.3f}{result['collision_ms']:>11.3f}{result['update_ms']:>9.3f}"
+                  f"{result['peak_kib']:>10.0f}")
+
+    report = {"settings": {**settings, "python": platform.python_version(), "machine": platform.machine()},
+              "results": results}
+    if opts.output:
+        with open(opts.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if opts.save_baseline:
+        with open(opts.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"baseline saved to {opts.baseline}")
+        return 0
+
+    regressions = compare_with_baseline(results, baseline, opts.tolerance)
+    for message in regressions:
+        print("REGRESSION", message)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parser_arg()))
@@ -0,0 +1,67 @@
+import sys
+from os import path
+
+sys.path.append(path.dirname(path.dirname(path.abspath(__file__))))
+
+import time
+from argparse import ArgumentParser, Namespace
+
+import numpy as np
+
+from ml.gym_env.tankman.resupply_env import ResupplyEnv
+from ml.gym_env.tankman.vec_env import ResupplyVecEnv
+
+
+def parser_arg() -> Namespace:
+    parser = ArgumentParser(description="Compare env steps/sec of ResupplyVecEnv and a loop over ResupplyEnv "
+                                        "for different numbers of envs in one process")
+    parser.add_argument("--n-envs", type=int, nargs="*", default=[1, 4, 16, 64, 128])
+    parser.add_argument("--map", type=str, default="3v3", help="team sizes, e.g. 1v1 3v3")
+    parser.add_argument("--frame-limit", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=200, help="vectorized steps per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+def run_vec_env(n_envs: int, green_team_num: int, blue_team_num: int, frame_limit: int, steps: int,
+                seed: int) -> float:
+    """Step ResupplyVecEnv with random actions and return env steps per second"""
+    env = ResupplyVecEnv(n_envs, green_team_num, blue_team_num, frame_limit, randomize=True, seed=seed)
+    env.seed(seed)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(env.action_space.n, size=(steps, n_envs))
+    start = time.perf_counter()
+    for step_actions in actions:
+        env.step(step_actions)
+    return n_envs * steps / (time.perf_counter() - start)
+
+
+def run_env_loop(n_envs: int, green_team_num: int, blue_team_num: int, frame_limit: int, steps: int,
+                 seed: int) -> float:
+    """Step n_envs ResupplyEnv one after another, like DummyVecEnv, and return env steps per second"""
+    envs = [ResupplyEnv(green_team_num, blue_team_num, frame_limit, randomize=True) for _ in range(n_envs)]
+    for env_idx, env in enumerate(envs):
+        env.reset(seed=seed + env_idx)
+    rng = np.random.default_rng(seed)
+    actions = rng.integers(envs[0].action_space.n, size=(steps, n_envs))
+    start = time.perf_counter()
+    for step_actions in actions:
+        for env, action in zip(envs, step_actions):
+            _, _, terminate, _, _ = env.step(action)
+            if terminate:
+                env.reset()
+    return n_envs * steps / (time.perf_counter() - start)
+
+
+def main(opts: Namespace) -> None:
+    green_team_num, blue_team_num = (int(num) for num in opts.map.split("v"))
+    print(f"{'n_envs':<8}{'env loop':>14}{'vec env':>14}{'speedup':>10}")
+    for n_envs in opts.n_envs:
+        loop = run_env_loop(n_envs, green_team_num, blue_team_num, opts.frame_limit, opts.steps, opts.seed)
+        vec = run_vec_env(n_envs, green_team_num, blue_team_num, opts.frame_limit, opts.steps, opts.seed)
+        print(f"{n_envs:<8}{loop:>14.1f}{vec:>14.1f}{vec / loop:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main(parser_arg())
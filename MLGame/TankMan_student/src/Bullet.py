@@ -4,6 +4,7 @@ import pygame
 from mlgame.view.view_model import create_asset_init_data, create_image_view_data
 
 from .env import WINDOW_HEIGHT, WINDOW_WIDTH, IMAGE_DIR
+from .game_module.geometry import create_bullet_move_dict, get_direction
 
 Vec = pygame.math.Vector2
 
@@ -24,14 +25,8 @@ class Bullet(pygame.sprite.Sprite):
         # Refactor
         if 7 > self.angle > 6:
             self.angle = 0
-        self.sqrt2 = 1.414
-        self.move = {"left_up": Vec(-self.speed/self.sqrt2, -self.speed/self.sqrt2),
-                     "right_up": Vec(self.speed/self.sqrt2, -self.speed/self.sqrt2),
-                     "left_down": Vec(-self.speed/self.sqrt2, self.speed/self.sqrt2), 
-                     "right_down": Vec(self.speed/self.sqrt2, self.speed)/self.sqrt2,
-                     "left": Vec(-self.speed, 0), "right": Vec(self.speed, 0), "up": Vec(0, -self.speed),
-                     "down": Vec(0, self.speed)}
-                
+        self.move = create_bullet_move_dict(self.speed)
+
         self.max_travel_distance = (kwargs["bullet_travel_distance"] // self.speed + 1) * self.speed
         
         self.travel_distance = 0
@@ -48,22 +43,7 @@ class Bullet(pygame.sprite.Sprite):
         if is_out or self.travel_distance >= self.max_travel_distance:
             self.kill()
 
-        if self.rot == 0 or self.rot == 360:
-            self.rect.center += self.move["left"]
-        elif self.rot == 315 or self.rot == -45:
-            self.rect.center += self.move["left_up"]
-        elif self.rot == 270 or self.rot == -90:
-            self.rect.center += self.move["up"]
-        elif self.rot == 225 or self.rot == -135:
-            self.rect.center += self.move["right_up"]
-        elif self.rot == 180 or self.rot == -180:
-            self.rect.center += self.move["right"]
-        elif self.rot == 135 or self.rot == -225:
-            self.rect.center += self.move["right_down"]
-        elif self.rot == 90 or self.rot == -270:
-            self.rect.center += self.move["down"]
-        elif self.rot == 45 or self.rot == -315:
-            self.rect.center += self.move["left_down"]
+        self.rect.center += self.move[get_direction(self.rot)]
 
     def get_obj_progress_data(self):
         img_id = "team_a_bullet" if self.id == 1 else "team_b_bullet"
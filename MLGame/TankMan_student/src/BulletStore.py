@@ -0,0 +1,224 @@
+import numpy as np
+import pygame
+from mlgame.view.view_model import create_image_view_data
+
+from .env import BULLET_SIZE, BULLET_SPEED, BULLET_TRAVEL_DISTANCE
+from .game_module.fuctions import scaled_rect
+from .game_module.geometry import DIRECTIONS, create_bullet_move_dict
+
+
+class BulletView:
+    """
+    BulletStore 中單一子彈的輕量代理，提供與 Bullet sprite 相同的讀取介面
+    只在同一個 frame 內有效，BulletStore.update 之後 index 就會改變
+    """
+
+    def __init__(self, store, index: int):
+        self.store = store
+        self.index = index
+        self.id = int(store.id[index])
+        self.no = int(store.no[index])
+        self.rot = int(store.rot[index])
+        self.uid = int(store.uid[index])
+        self.speed = store.speed
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return pygame.Rect(self.store.get_topleft(self.index), self.store.size)
+
+    @property
+    def angle(self) -> float:
+        return self.store.get_angle(self.rot)
+
+    def kill(self):
+        self.store.kill(self.index)
+
+    def alive(self) -> bool:
+        return bool(self.store.alive[self.index])
+
+    def get_obj_progress_data(self):
+        return self.store.get_obj_progress_data(self.index)
+
+    def get_data_from_obj_to_game(self) -> dict:
+        return self.store.get_data_from_obj_to_game(self.index)
+
+
+class BulletStore:
+    """
+    以 NumPy 陣列(struct-of-arrays)保存所有子彈，取代一顆子彈一個 Bullet sprite
+    移動、超出距離與出界的判斷都在 update 中一次向量化處理，行為與 Bullet 相同
+    """
+
+    def __init__(self, play_rect_area: pygame.Rect, bullet_size: tuple = BULLET_SIZE, bullet_speed: int = BULLET_SPEED,
+                 bullet_travel_distance: int = BULLET_TRAVEL_DISTANCE, capacity: int = 64):
+        self.play_rect_area = play_rect_area
+        self.size = bullet_size
+        self.speed = bullet_speed
+        self.max_travel_distance = (bullet_travel_distance // self.speed + 1) * self.speed
+        # rect.center 與 rect.topleft 的轉換量
+        self.half_size = (bullet_size[0] // 2, bullet_size[1] // 2)
+        hit_rect = scaled_rect(pygame.Rect((0, 0), bullet_size))
+        self.hit_offset = (hit_rect.x, hit_rect.y)
+        self.hit_size = (hit_rect.width, hit_rect.height)
+        # 依 (rot % 360) // 45 取得每 frame 的位移，與 Bullet.move 相同
+        move_dict = create_bullet_move_dict(self.speed)
+        self.move_table = np.array([tuple(move_dict[direction]) for direction in DIRECTIONS], dtype=np.float64)
+        self.count = 0
+        self._next_uid = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        def grow(old, dtype):
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[:self.count] = old[:self.count]
+            return new
+
+        self.center_x = grow(getattr(self, "center_x", None), np.int64)
+        self.center_y = grow(getattr(self, "center_y", None), np.int64)
+        self.rot = grow(getattr(self, "rot", None), np.int64)
+        self.direction = grow(getattr(self, "direction", None), np.int64)
+        self.id = grow(getattr(self, "id", None), np.int64)
+        self.no = grow(getattr(self, "no", None), np.int64)
+        self.uid = grow(getattr(self, "uid", None), np.int64)
+        self.travel_distance = grow(getattr(self, "travel_distance", None), np.int64)
+        self.alive = grow(getattr(self, "alive", None), np.bool_)
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.alive[:self.count]))
+
+    def __iter__(self):
+        for index in range(self.count):
+            if self.alive[index]:
+                yield BulletView(self, index)
+
+    def add(self, id: int, no: int, center: tuple, rot: int):
+        if self.count == self.capacity:
+            self._allocate(self.capacity * 2)
+        index = self.count
+        self.center_x[index] = center[0]
+        self.center_y[index] = center[1]
+        self.rot[index] = rot
+        self.direction[index] = (rot % 360) // 45
+        self.id[index] = id
+        self.no[index] = no
+        self.uid[index] = self._next_uid
+        self.travel_distance[index] = 0
+        self.alive[index] = True
+        self._next_uid += 1
+        self.count += 1
+
+    def kill(self, index: int):
+        self.alive[index] = False
+
+    def update(self):
+        """前進一個 frame，並移除超出射程、出界或在碰撞中被消滅的子彈"""
+        n = self.count
+        if not n:
+            return
+        area = self.play_rect_area
+        center_x = self.center_x[:n]
+        center_y = self.center_y[:n]
+        self.travel_distance[:n] += self.speed
+        is_in = (area.top < center_y) & (center_y < area.bottom) & (area.left < center_x) & (center_x < area.right)
+        keep = self.alive[:n] & is_in & (self.travel_distance[:n] < self.max_travel_distance)
+        move = self.move_table[self.direction[:n]]
+        # pygame.Rect 指定 center 時會四捨五入
+        center_x[:] = np.floor(center_x + move[:, 0] + 0.5)
+        center_y[:] = np.floor(center_y + move[:, 1] + 0.5)
+        self._compact(keep)
+
+    def _compact(self, keep: np.ndarray):
+        count = int(np.count_nonzero(keep))
+        if count == self.count:
+            return
+        for array in (self.center_x, self.center_y, self.rot, self.direction, self.id, self.no, self.uid,
+                      self.travel_distance, self.alive):
+            array[:count] = array[:self.count][keep]
+        self.count = count
+
+    def get_topleft(self, index: int) -> tuple:
+        return (int(self.center_x[index]) - self.half_size[0], int(self.center_y[index]) - self.half_size[1])
+
+    def get_hit_rects(self) -> tuple:
+        """回傳所有子彈碰撞用(縮放後)矩形的 left, top, right, bottom 陣列"""
+        n = self.count
+        left = self.center_x[:n] - self.half_size[0] + self.hit_offset[0]
+        top = self.center_y[:n] - self.half_size[1] + self.hit_offset[1]
+        return left, top, left + self.hit_size[0], top + self.hit_size[1]
+
+    def collide_matrix(self, sprites) -> tuple:
+        """
+        一次計算所有 sprite 與所有存活子彈的碰撞
+        :return: (sprite list, shape 為 (sprite 數, 子彈數) 的 bool 陣列)
+        """
+        sprite_list = list(sprites)
+        sprite_rects = []
+        for sprite in sprite_list:
+            hit_rect = scaled_rect(sprite.rect)
+            if hit_rect.width <= 0 or hit_rect.height <= 0:
+                # 與 colliderect 相同，大小為 0 的矩形不會碰撞
+                sprite_rects.append((0, 0, 0, 0))
+            else:
+                sprite_rects.append((hit_rect.left, hit_rect.top, hit_rect.right, hit_rect.bottom))
+        sprite_rects = np.array(sprite_rects, dtype=np.int64).reshape(-1, 4)
+        left, top, right, bottom = self.get_hit_rects()
+        is_hit = (sprite_rects[:, 0:1] < right) & (sprite_rects[:, 1:2] < bottom) \
+            & (sprite_rects[:, 2:3] > left) & (sprite_rects[:, 3:4] > top) & self.alive[:self.count]
+        return sprite_list, is_hit
+
+    def collide_sprites(self, sprites) -> dict:
+        """
+        與 pygame.sprite.groupcollide(sprites, bullets, False, False, collide_rect_ratio(0.8)) 相同的結果
+        key 為 sprite，value 為碰撞到的 BulletView list
+        """
+        hits = {}
+        if not self.count:
+            return hits
+        sprite_list, is_hit = self.collide_matrix(sprites)
+        for sprite_index, bullet_index in zip(*np.nonzero(is_hit)):
+            hits.setdefault(sprite_list[sprite_index], []).append(BulletView(self, int(bullet_index)))
+        return hits
+
+    def collide_group(self, sprites) -> dict:
+        """
+        與 pygame.sprite.groupcollide(bullets, sprites, False, False, collide_rect_ratio(0.8)) 相同的結果
+        key 為 BulletView，value 為碰撞到的 sprite list
+        """
+        hits = {}
+        if not self.count:
+            return hits
+        sprite_list, is_hit = self.collide_matrix(sprites)
+        bullet = None
+        for bullet_index, sprite_index in zip(*np.nonzero(is_hit.T)):
+            if bullet is None or bullet.index != bullet_index:
+                bullet = BulletView(self, int(bullet_index))
+                hits[bullet] = []
+            hits[bullet].append(sprite_list[sprite_index])
+        return hits
+
+    @staticmethod
+    def get_angle(rot: int) -> float:
+        angle = 3.14 / 180 * (rot + 90)
+        # Refactor
+        if 7 > angle > 6:
+            angle = 0
+        return angle
+
+    def get_obj_progress_data(self, index: int):
+        img_id = "team_a_bullet" if self.id[index] == 1 else "team_b_bullet"
+        return create_image_view_data(img_id, *self.get_topleft(index), *self.size, self.get_angle(int(self.rot[index])))
+
+    def get_data_from_obj_to_game(self, index: int = None):
+        """不指定 index 時，直接由陣列產生所有存活子彈的資訊"""
+        if index is not None:
+            x, y = self.get_topleft(index)
+            return {"id": f"{self.no[index]}P_bullet", "x": x, "y": y, "speed": self.speed, "rot": int(self.rot[index])}
+        alive = self.alive[:self.count]
+        x_list = (self.center_x[:self.count][alive] - self.half_size[0]).tolist()
+        y_list = (self.center_y[:self.count][alive] - self.half_size[1]).tolist()
+        no_list = self.no[:self.count][alive].tolist()
+        rot_list = self.rot[:self.count][alive].tolist()
+        return [{"id": f"{no}P_bullet", "x": x, "y": y, "speed": self.speed, "rot": rot}
+                for no, x, y, rot in zip(no_list, x_list, y_list, rot_list)]
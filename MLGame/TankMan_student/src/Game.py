@@ -4,7 +4,11 @@ import pygame
 from mlgame.game.paia_game import PaiaGame, GameStatus
 from mlgame.view.view_model import Scene
 
+from .BulletStore import BulletView
+from .ProgressDelta import ProgressDeltaEncoder
 from .TeamBattleMode import TeamBattleMode
+from .game_module.FrameProfiler import FrameProfiler
+from .game_module.TiledMap import CompiledMap
 from .game_module.fuctions import get_sprites_progress_data
 
 MAP_WIDTH = 1000
@@ -16,49 +20,95 @@ IMAGE_DIR = path.join(GAME_DIR, "..", "asset", "image")
 
 
 class Game(PaiaGame):
-    def __init__(self, user_num: int, green_team_num: int, blue_team_num: int, is_manual: str, frame_limit: int, sound: str):
+    def __init__(self, user_num: int, green_team_num: int, blue_team_num: int, is_manual: str, frame_limit: int, sound: str,
+                 headless: bool = False, vectorized_bullets: bool = False, firing_lanes: bool = False,
+                 seed: int = None, record_path: str = None, profiler: FrameProfiler = None,
+                 compiled_map: CompiledMap = None):
+        """
+        :param headless: 給訓練與比賽使用，不播放音效、不產生畫面與除錯資料，只跑遊戲模擬
+        :param vectorized_bullets: 子彈改用 NumPy 陣列批次更新，適合子彈數量多的場景
+        :param firing_lanes: 給 AI 的資料加入 firing_lanes，8 個砲管角度射擊時最先打到的東西
+        :param seed: 第一場遊戲的亂數種子，之後每場的 seed 由前一場產生
+        :param record_path: 將第一場遊戲錄影到此檔案，可用 src.Replay.Replay 重播
+        :param profiler: 記錄每個 frame 各階段的時間，None 時不記錄
+        :param compiled_map: 不讀取 .tmx，直接使用此地圖，例如 MapGenerator 產生的地圖
+        """
         super().__init__(user_num)
         # init game
+        self.headless = headless
+        self.vectorized_bullets = vectorized_bullets
+        self.firing_lanes = firing_lanes
+        self.seed = seed
+        self.record_path = record_path
+        self.profiler = profiler
+        self.compiled_map = compiled_map
         self.green_team_num = green_team_num
         self.blue_team_num = blue_team_num
         self.is_paused = False
         self.is_debug = False
         self.is_sound = False
         self.is_manual = False
-        if sound == "on":
+        if sound == "on" and not self.headless:
             self.is_sound = True
         if is_manual:
             self.is_manual = True
         self.attachements = []
         self.frame_limit = frame_limit
         self.game_mode = self.set_game_mode()
+        # get_scene_progress_delta() 第一次被呼叫時才建立
+        self.progress_encoder = None
         self.scene = Scene(width=self.game_mode.scene_width, height=self.game_mode.scene_height, color="#ffffff",
                            bias_y=50)
 
     def get_data_from_game_to_player(self) -> dict:
+        """
+        每個 frame 都會產生新的資料，已經回傳過的資料之後不會再被修改
+        沒有變動的牆壁與補給站 list 會在不同 frame 之間共用，使用時請勿修改
+        """
         to_players_data = self.game_mode.get_ai_data_to_player()
         return to_players_data
 
-    def update(self, commands: dict):
+    def get_observation(self):
+        """
+        給訓練使用，get_data_from_game_to_player() 中除了牆壁以外的資訊，但不產生 dict
+        :return: NumPy 結構化陣列，第 i 筆為 get_ai_name(i) 的玩家，格式見 src.ObservationBuilder
+        """
+        return self.game_mode.get_observation()
+
+    def update(self, commands):
+        """
+        :param commands: ai 名稱 -> 字串指令 list，
+                         訓練時也可以傳入依玩家編號排列的 action bitmask 序列(見 src.action)，省去轉換
+        """
         self.handle_event(commands)
-        self.game_mode.debugging(self.is_debug)
+        if not self.headless:
+            self.game_mode.debugging(self.is_debug)
         if not self.is_paused:
             self.frame_count += 1
-            self.game_mode.update(commands)
+            if self.profiler:
+                start = self.profiler.clock()
+                self.game_mode.update(commands)
+                self.profiler.add("game_mode.update", self.profiler.clock() - start)
+            else:
+                self.game_mode.update(commands)
             if not self.is_running():
                 return "RESET"
 
-    def reset(self):
+    def reset(self, seed: int = None, compiled_map: CompiledMap = None):
         self.frame_count = 0
-        self.game_mode.reset()
+        self.game_mode.reset(seed, compiled_map)
+        if self.progress_encoder:
+            self.progress_encoder.request_keyframe()
         # self.rank()
 
     def get_scene_init_data(self) -> dict:
         """
         Get the scene and object information for drawing on the web
+        地板與邊框不會變動，放在 background 中只傳送一次，畫面每個 frame 都會先畫出 background
         """
         game_info = {'scene': self.scene.__dict__,
-                     'assets': self.game_mode.get_init_image_data()}
+                     'assets': self.game_mode.get_init_image_data(),
+                     'background': self.game_mode.background}
 
         return game_info
 
@@ -67,7 +117,7 @@ class Game(PaiaGame):
         Get the position of src objects for drawing on the web
         """
         scene_progress = {'background': [],
-                          'object_list': [*self.game_mode.background, *self.get_obj_progress_data()],
+                          'object_list': self.get_obj_progress_data(),
                           'toggle_with_bias': [*self.game_mode.get_toggle_with_bias_data()],
                           'toggle': self.game_mode.get_toggle_progress_data(),
                           'foreground': [],
@@ -76,6 +126,33 @@ class Game(PaiaGame):
 
         return scene_progress
 
+    def get_scene_progress_delta(self) -> dict:
+        """
+        與 get_scene_progress_data() 相同的畫面，但只帶有與上一次呼叫相比有變動的物件，並定期送出完整的資料
+        每個 frame 都要呼叫一次，用 src.ProgressDelta.ProgressDeltaDecoder 還原成完整的資料
+        """
+        if self.progress_encoder is None:
+            self.progress_encoder = ProgressDeltaEncoder()
+        encoder = self.progress_encoder
+        object_list = []
+        for section, sprites in enumerate(self.game_mode.obj_list):
+            sprites = list(sprites)
+            # BulletView 每個 frame 都是新的物件，以子彈的 uid 辨識
+            keys = encoder.get_keys(section, [sprite.uid if isinstance(sprite, BulletView) else sprite
+                                              for sprite in sprites])
+            for key, sprite in zip(keys, sprites):
+                data = sprite.get_obj_progress_data()
+                if data:
+                    object_list.append([key, data])
+        object_list.extend(encoder.get_index_keys(len(self.game_mode.obj_list), self.game_mode.obj_rect_list))
+        layers = {'background': [],
+                  'object_list': object_list,
+                  'toggle_with_bias': encoder.get_index_keys(0, self.game_mode.get_toggle_with_bias_data()),
+                  'toggle': encoder.get_index_keys(0, self.game_mode.get_toggle_progress_data()),
+                  'foreground': [],
+                  'user_info': []}
+        return encoder.encode(layers, {})
+
     def get_obj_progress_data(self):
         obj_list = []
         for sprites in self.game_mode.obj_list:
@@ -102,6 +179,9 @@ class Game(PaiaGame):
         return self.attachements
 
     def handle_event(self, commands):
+        # 已經轉成 action 的指令沒有 DEBUG 與 PAUSED
+        if not isinstance(commands, dict):
+            return
         if ["DEBUG"] in commands.values():
             self.is_debug = not self.is_debug
         if ["PAUSED"] in commands.values():
@@ -112,5 +192,8 @@ class Game(PaiaGame):
         if self.is_sound:
             sound_path = SOUND_DIR
         play_rect_area = pygame.Rect(0, 0, MAP_WIDTH, MAP_HEIGHT)
-        game_mode = TeamBattleMode(self.green_team_num, self.blue_team_num, self.is_manual, self.frame_limit, sound_path, play_rect_area)
+        game_mode = TeamBattleMode(self.green_team_num, self.blue_team_num, self.is_manual, self.frame_limit, sound_path,
+                                   play_rect_area, self.compiled_map, headless=self.headless,
+                                   vectorized_bullets=self.vectorized_bullets, firing_lanes=self.firing_lanes,
+                                   seed=self.seed, record_path=self.record_path, profiler=self.profiler)
         return game_mode
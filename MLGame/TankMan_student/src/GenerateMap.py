@@ -2,10 +2,21 @@ from os import path
 import random
 import math
 
+import numpy as np
+
+from .game_module.TiledMap import CompiledMap
+
 
 PLAYER_NUM = 1
 OIL_NUM = 2
 BULLET_NUM = 2
+# 與 src.env 的 img_id 相同
+EMPTY_NO = 0
+PLAYER_1_NO = 1
+PLAYER_2_NO = 2
+WALL_NO = 3
+BULLET_STATION_NO = 4
+OIL_STATION_NO = 5
 MAP_DIR = path.join(path.dirname(__file__), "..", "asset", 'maps')
 MAP_VERSION = "1.9"
 TILED_VERSION = "1.9.2"
@@ -42,88 +53,102 @@ class MapGenerator:
     def mirrored_pos(self, x : int, y : int) -> tuple:
         return self.width - x - 1, self.height - y - 1
 
-    def random_pos(self, map_arr) -> tuple:
-        random_x, random_y = random.randint(1, self.width-2), random.randint(1, self.height-2)
-        mir_x, mir_y = self.mirrored_pos(random_x, random_y)
-        while map_arr[random_y][random_x] != 0 or map_arr[mir_y][mir_x] != 0:
-            random_x, random_y = random.randint(1, self.width-2), random.randint(1, self.height-2)
-            mir_x, mir_y = self.mirrored_pos(random_x, random_y)
-
-        return random_x, random_y
-
-    def generate_map_str(self) -> str:
-
-        # generate default map[y][x]
-        map_arr = [[0 for _ in range(self.width)] for _ in range(self.height)]
-        
-        for x in range(self.width):
-            map_arr[0][x] = 3
-            map_arr[self.height-1][x] = 3
-        
-        for y in range(self.height):
-            map_arr[y][0] = 3
-            map_arr[y][self.width-1] = 3
-
+    def random_pos(self, map_arr, rng=random) -> tuple:
+        """
+        隨機選一個自己與對稱位置都是空格的內部格子，只在可用的格子中選，不會一直重抽
+        :return: (x, y)，沒有可用的格子時 raise ValueError
+        """
+        grid = np.asarray(map_arr)
+        valid = self._get_valid_mask(grid[None])[0]
+        cells = np.flatnonzero(valid)
+        if not len(cells):
+            raise ValueError("no empty symmetric cell left on the map")
+        index = int(cells[rng.randrange(len(cells))])
+        return index % self.width, index // self.width
+
+    def create_base_grid(self) -> np.ndarray:
+        """外圍與中線為牆壁的空地圖，shape 為 (height, width)"""
+        grid = np.zeros((self.height, self.width), dtype=np.int8)
+        grid[[0, -1], :] = WALL_NO
+        grid[:, [0, -1]] = WALL_NO
         if self.width % 2 == 1:
-            for y in range(1, self.height-1):
-                map_arr[y][self.width//2] = 3
+            grid[1:-1, self.width // 2] = WALL_NO
         else:
-            for y in range(1, self.height):
-                if y < math.ceil(self.height/2):
-                    map_arr[y][self.width//2-1] = 3
-                else:
-                    map_arr[y][self.width//2] = 3
-
-        # add player
+            half = math.ceil(self.height / 2)
+            grid[1:half, self.width // 2 - 1] = WALL_NO
+            grid[half:, self.width // 2] = WALL_NO
+        return grid
+
+    def _get_valid_mask(self, grids: np.ndarray) -> np.ndarray:
+        # 內部、自己與對稱位置都是空格
+        is_empty = grids == EMPTY_NO
+        valid = is_empty & is_empty[:, ::-1, ::-1]
+        valid[:, [0, -1], :] = False
+        valid[:, :, [0, -1]] = False
+        return valid
+
+    def _place(self, grids: np.ndarray, np_rng: np.random.Generator, img_no: int, mirror_img_no: int = None,
+               x_range: tuple = None):
+        """
+        每張地圖各選一個可用的格子放上 img_no，mirror_img_no 不是 None 時對稱位置也放上
+        :param x_range: 限制 x 的範圍 (start, stop)
+        """
+        map_num = len(grids)
+        valid = self._get_valid_mask(grids)
+        if x_range is not None:
+            valid[:, :, :x_range[0]] = False
+            valid[:, :, x_range[1]:] = False
+        # 可用格子中分數最高的即為均勻隨機選到的格子
+        scores = np.where(valid, np_rng.random(grids.shape), -1.0).reshape(map_num, -1)
+        cells = scores.argmax(axis=1)
+        if (scores[np.arange(map_num), cells] < 0).any():
+            raise ValueError("no empty symmetric cell left on the map")
+        ys, xs = np.divmod(cells, self.width)
+        map_index = np.arange(map_num)
+        if mirror_img_no is not None:
+            grids[map_index, self.height - ys - 1, self.width - xs - 1] = mirror_img_no
+        grids[map_index, ys, xs] = img_no
+
+    def generate_map_grids(self, map_num: int, seed: int = None) -> np.ndarray:
+        """
+        一次產生多張地圖，每一步都對所有地圖一起以 NumPy 處理
+        :param seed: None 時由全域的 random 產生
+        :return: shape 為 (map_num, height, width) 的 img_id
+        """
+        if seed is None:
+            seed = random.getrandbits(63)
+        np_rng = np.random.default_rng(seed)
+        grids = np.repeat(self.create_base_grid()[None], map_num, axis=0)
+        right_side = (self.width // 2, self.width)
+        left_side = (0, self.width // 2)
+        # 綠隊在右半邊，藍隊在左半邊，人數相同的部分對稱放置
         for _ in range(min(self.green_team_num, self.blue_team_num)):
-            rand_x, rand_y = self.random_pos(map_arr)
-            while rand_x < self.width // 2:
-                rand_x, rand_y = self.random_pos(map_arr)
-            mir_x, mir_y = self.mirrored_pos(rand_x, rand_y)
-
-            map_arr[rand_y][rand_x] = 1
-            map_arr[mir_y][mir_x] = 2
-
-        # add remaining green team
+            self._place(grids, np_rng, PLAYER_1_NO, PLAYER_2_NO, right_side)
         for _ in range(self.green_team_num - self.blue_team_num):
-            rand_x, rand_y = self.random_pos(map_arr)
-            while rand_x < self.width // 2:
-                rand_x, rand_y = self.random_pos(map_arr)
+            self._place(grids, np_rng, PLAYER_1_NO, x_range=right_side)
+        for _ in range(self.blue_team_num - self.green_team_num):
+            self._place(grids, np_rng, PLAYER_2_NO, x_range=left_side)
+        for _ in range(BULLET_NUM):
+            self._place(grids, np_rng, BULLET_STATION_NO, BULLET_STATION_NO)
+        for _ in range(OIL_NUM):
+            self._place(grids, np_rng, OIL_STATION_NO, OIL_STATION_NO)
+        return grids
 
-            map_arr[rand_y][rand_x] = 1
+    def generate_map_grid(self, seed: int = None) -> np.ndarray:
+        return self.generate_map_grids(1, seed)[0]
 
-        # add remaining blue team
-        for _ in range(self.blue_team_num - self.green_team_num):
-            rand_x, rand_y = self.random_pos(map_arr)
-            while rand_x >= self.width // 2:
-                rand_x, rand_y = self.random_pos(map_arr)
+    def to_compiled_map(self, grid: np.ndarray) -> CompiledMap:
+        """不經過 .tmx 檔，直接給 TeamBattleMode(compiled_map=...) 或 reset(compiled_map=...) 使用"""
+        return CompiledMap.from_grid(grid, self.width_per_tile, self.height_per_tile)
 
-            map_arr[rand_y][rand_x] = 2
-        
-        # add bullet station
-        for _ in range(BULLET_NUM):
-            rand_x, rand_y = self.random_pos(map_arr)
-            mir_x, mir_y = self.mirrored_pos(rand_x, rand_y)
-            map_arr[rand_y][rand_x] = 4
-            map_arr[mir_y][mir_x] = 4
+    def generate_compiled_maps(self, map_num: int, seed: int = None) -> list:
+        return [self.to_compiled_map(grid) for grid in self.generate_map_grids(map_num, seed)]
+
+    def generate_map_str(self, grid: np.ndarray = None) -> str:
+        if grid is None:
+            grid = self.generate_map_grid()
+        return ",\n".join(",".join(map(str, row)) for row in grid.tolist())
 
-        # add oil station
-        for _ in range(OIL_NUM):
-            rand_x, rand_y = self.random_pos(map_arr)
-            mir_x, mir_y = self.mirrored_pos(rand_x, rand_y)
-            map_arr[rand_y][rand_x] = 5
-            map_arr[mir_y][mir_x] = 5
-
-        map_str = ""
-        
-        for row in map_arr:
-            for id in row:
-                map_str += str(id) + ","
-            map_str += "\n"
-        map_str = map_str[:-2]
-
-        return map_str
-    
     def generate_map(self):
         map_name = f"map_{self.green_team_num}_v_{self.blue_team_num}.tmx"
         map_path = path.join(MAP_DIR, map_name)
@@ -147,7 +172,7 @@ class MapGenerator:
 
 
 if __name__ == "__main__":
-    map_generator = MapGenerator(1, 1)
+    map_generator = MapGenerator(1, 1, 20, 12)
     map_generator.generate_map()
     
 
@@ -5,6 +5,7 @@ from mlgame.view.view_model import (create_asset_init_data,
                                     create_image_view_data)
 
 from .env import IMAGE_DIR
+from .game_module.geometry import get_rotated_rect
 
 
 class Gun(pygame.sprite.Sprite):
@@ -14,7 +15,6 @@ class Gun(pygame.sprite.Sprite):
         self.rect = pygame.Rect(pos, size)
         self.origin_size = (self.rect.width, self.rect.height)
         self.draw_pos = self.rect.topleft
-        self.surface = pygame.Surface(self.origin_size)
         self.rot = 0
         self.rot_speed = 45
 
@@ -48,10 +48,7 @@ class Gun(pygame.sprite.Sprite):
     def rotate(self):
         self.rot = self.rot % 360
         self.angle = 3.14 / 180 * self.rot
-        new_sur = pygame.transform.rotate(self.surface, self.rot)
-        origin_center = self.rect.center
-        self.rect = new_sur.get_rect()
-        self.rect.center = origin_center
+        self.rect = get_rotated_rect(self.origin_size, self.rot, self.rect.center)
         self.draw_pos = self.rect.topleft
 
     def turn_left(self):
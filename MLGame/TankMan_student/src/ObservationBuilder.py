@@ -0,0 +1,155 @@
+from itertools import islice
+
+import numpy as np
+
+from .Player import Player
+from .env import SHOOT_COOLDOWN
+
+# 所有欄位都是 float32，整筆資料可以直接 view 成 float32 陣列給模型使用
+# 前 5 個欄位固定為 valid, x, y, dx, dy
+# valid 為 0 時是補齊長度用的空位，其他欄位都是 0；dx, dy 為相對於觀察的玩家(self)的位置
+PLAYER_FIELDS = ("valid", "x", "y", "dx", "dy", "is_alive", "no", "team", "angle", "gun_angle", "angle_index",
+                 "gun_angle_index", "speed", "score", "power", "oil", "lives", "cooldown")
+BULLET_FIELDS = ("valid", "x", "y", "dx", "dy", "is_competitor", "no", "team", "rot")
+STATION_FIELDS = ("valid", "x", "y", "dx", "dy", "is_alive", "power")
+PLAYER_OBS_DTYPE = np.dtype([(name, np.float32) for name in PLAYER_FIELDS])
+BULLET_OBS_DTYPE = np.dtype([(name, np.float32) for name in BULLET_FIELDS])
+STATION_OBS_DTYPE = np.dtype([(name, np.float32) for name in STATION_FIELDS])
+VALID, X, Y, DX, DY = range(5)
+BULLET_IS_COMPETITOR = BULLET_FIELDS.index("is_competitor")
+BULLET_NO = BULLET_FIELDS.index("no")
+BULLET_TEAM = BULLET_FIELDS.index("team")
+BULLET_ROT = BULLET_FIELDS.index("rot")
+PLAYER_TEAM = PLAYER_FIELDS.index("team")
+# 給玩家的子彈數量上限，子彈約 11 個 frame 就飛出射程，射擊冷卻為 15 個 frame，每位玩家同時最多約 2 顆
+MAX_OBS_BULLETS = 16
+
+
+def angle_to_index(angle):
+    """把角度轉成 8 個 45 度方向的 index，與 ml 中各個 _angle_to_index 相同，可傳入 NumPy 陣列"""
+    return ((angle + 360 + 22.5) // 45) % 8
+
+
+class ObservationBuilder:
+    """
+    不經過 dict，直接由 sprite 的狀態產生每位玩家一筆固定格式的 NumPy 結構化資料
+    第 i 筆為 get_ai_name(i) 的玩家，欄位如下，陣列欄位的長度在同一場遊戲中固定：
+        used_frame
+        self             PLAYER_OBS_DTYPE，玩家自己
+        teammates        PLAYER_OBS_DTYPE (隊伍人數上限 - 1,)，不含自己，依編號排列
+        competitors      PLAYER_OBS_DTYPE (隊伍人數上限,)
+        bullets          BULLET_OBS_DTYPE (max_bullets,)，超過的子彈不放入
+        bullet_stations  STATION_OBS_DTYPE (子彈補給站數量,)
+        oil_stations     STATION_OBS_DTYPE (油料補給站數量,)
+    每個陣列的 valid 欄位就是該玩家的觀察遮罩，例如 obs["competitors"]["valid"] 的 shape 為 (玩家數, 隊伍人數上限)
+    """
+
+    def __init__(self, game_mode, max_bullets: int = MAX_OBS_BULLETS):
+        """
+        :param game_mode: TeamBattleMode，玩家與補給站的 sprite 在整場遊戲中不會增減
+        :param max_bullets: bullets 陣列的長度
+        """
+        self.game_mode = game_mode
+        self.max_bullets = max_bullets
+        self.players = [player for group in (game_mode.players_a, game_mode.players_b) for player in group
+                        if isinstance(player, Player)]
+        self.bullet_stations = list(game_mode.bullet_stations)
+        self.oil_stations = list(game_mode.oil_stations)
+        team_players = {}
+        for index, player in enumerate(self.players):
+            team_players.setdefault(player.id, []).append(index)
+        team_size = max(len(indexes) for indexes in team_players.values())
+        # 隊友與對手在玩家表中的 index，-1 為補齊的空位，對應到玩家表最後多出來的一列空資料
+        self.teammate_index = np.full((len(self.players), team_size - 1), -1, dtype=np.intp)
+        self.competitor_index = np.full((len(self.players), team_size), -1, dtype=np.intp)
+        for index, player in enumerate(self.players):
+            teammates = [other for other in team_players[player.id] if other != index]
+            competitors = [other for team, indexes in team_players.items() if team != player.id for other in indexes]
+            self.teammate_index[index, :len(teammates)] = teammates
+            self.competitor_index[index, :len(competitors)] = competitors
+        self.dtype = np.dtype([("used_frame", np.float32),
+                               ("self", PLAYER_OBS_DTYPE),
+                               ("teammates", PLAYER_OBS_DTYPE, (team_size - 1,)),
+                               ("competitors", PLAYER_OBS_DTYPE, (team_size,)),
+                               ("bullets", BULLET_OBS_DTYPE, (max_bullets,)),
+                               ("bullet_stations", STATION_OBS_DTYPE, (len(self.bullet_stations),)),
+                               ("oil_stations", STATION_OBS_DTYPE, (len(self.oil_stations),))])
+        # 欄位名稱 -> 在一筆 float32 資料中的範圍
+        self.slices = {}
+        for name in self.dtype.names:
+            field_dtype, offset = self.dtype.fields[name][:2]
+            self.slices[name] = slice(offset // 4, (offset + field_dtype.itemsize) // 4)
+        # 所有隊友、對手、子彈與補給站的 valid 欄位在一筆資料中的位置，x, y, dx, dy 依序在後面
+        valid_columns = []
+        for name in ("teammates", "competitors", "bullets", "bullet_stations", "oil_stations"):
+            field_dtype = self.dtype.fields[name][0]
+            item_size = field_dtype.base.itemsize // 4
+            valid_columns.extend(range(self.slices[name].start, self.slices[name].stop, item_size))
+        self.valid_columns = np.array(valid_columns, dtype=np.intp)
+        bullets = self.slices["bullets"]
+        self.bullet_columns = np.arange(bullets.start, bullets.stop, len(BULLET_FIELDS), dtype=np.intp)
+        self.self_column = self.slices["self"].start
+
+    def create_players_table(self) -> np.ndarray:
+        """所有玩家依 get_ai_name 的順序排列，最後多一列空資料"""
+        rows = []
+        for player in self.players:
+            angle = player.get_rot()
+            gun_angle = player.gun.get_rot()
+            if player.last_shoot_frame == 0 or player.used_frame - player.last_shoot_frame > SHOOT_COOLDOWN:
+                cooldown = 0
+            else:
+                cooldown = SHOOT_COOLDOWN - player.used_frame + player.last_shoot_frame
+            rows.append((1, player.rect.x, player.rect.y, 0, 0, player.is_alive, player.no, player.id,
+                         angle, gun_angle, angle_to_index(angle), angle_to_index(gun_angle),
+                         player.speed, player.score, player.power, player.oil, player.lives, cooldown))
+        rows.append((0,) * len(PLAYER_FIELDS))
+        return np.array(rows, dtype=np.float32)
+
+    def create_bullets_table(self) -> np.ndarray:
+        table = np.zeros((self.max_bullets, len(BULLET_FIELDS)), dtype=np.float32)
+        bullets = self.game_mode.bullets
+        if self.game_mode.vectorized_bullets:
+            alive = np.flatnonzero(bullets.alive[:bullets.count])[:self.max_bullets]
+            num = len(alive)
+            table[:num, X] = bullets.center_x[alive] - bullets.half_size[0]
+            table[:num, Y] = bullets.center_y[alive] - bullets.half_size[1]
+            table[:num, BULLET_NO] = bullets.no[alive]
+            table[:num, BULLET_TEAM] = bullets.id[alive]
+            table[:num, BULLET_ROT] = bullets.rot[alive]
+        else:
+            rows = [(1, bullet.rect.x, bullet.rect.y, 0, 0, 0, bullet.no, bullet.id, bullet.rot)
+                    for bullet in islice(bullets, self.max_bullets)]
+            num = len(rows)
+            if num:
+                table[:num] = rows
+        table[:num, VALID] = 1
+        return table
+
+    @staticmethod
+    def create_stations_table(stations: list) -> np.ndarray:
+        return np.array([(1, station.rect.x, station.rect.y, 0, 0, station.is_alive,
+                          station.power if station.is_alive else 0) for station in stations],
+                        dtype=np.float32).reshape(len(stations), len(STATION_FIELDS))
+
+    def create_observation(self) -> np.ndarray:
+        num = len(self.players)
+        players = self.create_players_table()
+        obs = np.empty((num, self.dtype.itemsize // 4), dtype=np.float32)
+        obs[:, self.slices["used_frame"]] = self.game_mode.used_frame
+        obs[:, self.slices["self"]] = players[:-1]
+        obs[:, self.slices["teammates"]] = players[self.teammate_index].reshape(num, -1)
+        obs[:, self.slices["competitors"]] = players[self.competitor_index].reshape(num, -1)
+        # 子彈與補給站對每位玩家都一樣，只有相對位置不同
+        obs[:, self.slices["bullets"]] = self.create_bullets_table().reshape(-1)
+        obs[:, self.slices["bullet_stations"]] = self.create_stations_table(self.bullet_stations).reshape(-1)
+        obs[:, self.slices["oil_stations"]] = self.create_stations_table(self.oil_stations).reshape(-1)
+        # 一次算出所有物件相對於自己的位置，空位的 valid 為 0，dx, dy 也是 0
+        columns = self.valid_columns
+        valid = obs[:, columns]
+        obs[:, columns + DX] = (obs[:, columns + X] - obs[:, self.self_column + X, None]) * valid
+        obs[:, columns + DY] = (obs[:, columns + Y] - obs[:, self.self_column + Y, None]) * valid
+        columns = self.bullet_columns
+        obs[:, columns + BULLET_IS_COMPETITOR] = obs[:, columns + VALID] * (
+            obs[:, columns + BULLET_TEAM] != obs[:, self.self_column + PLAYER_TEAM, None])
+        return obs.view(self.dtype).reshape(num)
@@ -1,11 +1,13 @@
 from os import path
 import random
 import pygame.draw
-from mlgame.utils.enum import get_ai_name
 from mlgame.view.view_model import create_asset_init_data, create_image_view_data, create_rect_view_data
-from .env import TURN_LEFT_CMD, TURN_RIGHT_CMD, FORWARD_CMD, BACKWARD_CMD, \
-    AIM_LEFT_CMD, AIM_RIGHT_CMD, SHOOT, SHOOT_COOLDOWN, IMAGE_DIR, ORANGE, BLUE, IS_DEBUG
+from .action import FORWARD_ACTION, BACKWARD_ACTION, TURN_LEFT_ACTION, TURN_RIGHT_ACTION, AIM_LEFT_ACTION, \
+    AIM_RIGHT_ACTION, SHOOT_ACTION, NO_COMMAND, encode_commands
+from .env import TURN_LEFT_CMD, TURN_RIGHT_CMD, FORWARD_CMD, BACKWARD_CMD, SHOOT_COOLDOWN, IMAGE_DIR, ORANGE, BLUE, \
+    IS_DEBUG
 from .Gun import Gun
+from .game_module.geometry import create_move_dict, get_direction, get_opposite_direction, get_rotated_rect
 
 Vec = pygame.math.Vector2
 
@@ -28,7 +30,6 @@ class Player(pygame.sprite.Sprite):
         self.origin_size = (self.rect.width, self.rect.height)
         self.original_rect = self.rect.copy()
         self.draw_pos = self.rect.topleft
-        self.surface = pygame.Surface(self.origin_size)
         self.angle = 0
         self.score = 0
         self.used_frame = 0
@@ -38,14 +39,8 @@ class Player(pygame.sprite.Sprite):
         self.vel = Vec(0, 0)
 
         self.speed = 8
-        self.sqrt2 = 1.414
         # TODO refactor use vel
-        self.move_dict = {"left_up": Vec(-self.speed/self.sqrt2, -self.speed/self.sqrt2),
-                        "right_up": Vec(self.speed/self.sqrt2, -self.speed/self.sqrt2),
-                        "left_down": Vec(-self.speed/self.sqrt2, self.speed/self.sqrt2),
-                        "right_down": Vec(self.speed/self.sqrt2, self.speed/self.sqrt2),
-                        "left": Vec(-self.speed, 0), "right": Vec(self.speed, 0), "up": Vec(0, -self.speed),
-                        "down": Vec(0, self.speed)}
+        self.move_dict = create_move_dict(self.speed)
         self.rot = 0
         self.last_shoot_frame = self.used_frame
         self.last_turn_frame = self.used_frame
@@ -77,7 +72,10 @@ class Player(pygame.sprite.Sprite):
             4
         )
 
-    def update(self, command: dict):
+    def update(self, actions):
+        """
+        :param actions: 依玩家編號排列的 action bitmask，見 src.action
+        """
         self.pre_rect = self.rect   
         self.used_frame += 1
         if self.lives <= 0:
@@ -100,7 +98,7 @@ class Player(pygame.sprite.Sprite):
             self.is_turn_right = False
             self.is_turn_left = False
 
-        self.act(command[get_ai_name(self.no - 1)])
+        self.act_action(actions[self.no - 1])
         # check tank if out of playground
         self.check_if_outofplayground()
 
@@ -110,84 +108,70 @@ class Player(pygame.sprite.Sprite):
     def rotate(self):
         self.rot = self.rot % 360
         self.angle = 3.14 / 180 * self.rot
-        new_sur = pygame.transform.rotate(self.surface, self.rot)
-        origin_center = self.rect.center
-        self.rect = new_sur.get_rect()
-        self.rect.center = origin_center
+        # 建立新的 rect，pre_rect 仍指向上一個 frame 的位置
+        self.rect = get_rotated_rect(self.origin_size, self.rot, self.rect.center)
         self.draw_pos = self.rect.topleft
 
     def act(self, commands: list):
-        if not commands or self.collided:
+        """字串指令的相容介面，只有最後一個指令有效"""
+        self.act_action(encode_commands(commands))
+
+    def act_action(self, action: int):
+        if action & NO_COMMAND or self.collided:
+            return None
+
+        # 射擊、瞄準與移動各自只看 action 中對應的 bit
+        # Shoot
+        if self.power and action & SHOOT_ACTION:
+            self.shoot()
+
+        # Aiming
+        # TODO: Maybe the oil should be consumed when aiming
+        if action & AIM_LEFT_ACTION:
+            self.gun.turn_left()
+        elif action & AIM_RIGHT_ACTION:
+            self.gun.turn_right()
+
+        if self.oil <= 0:
+            self.oil = 0
+            self.lives = 0
             return None
 
-        # Only one action from the three categories can be executed in one frame
-        move_flag = False
-        shoot_flag = False
-        aim_flag = False
-
-        while commands:
-            command = commands.pop()
-
-            # Shoot
-            if not shoot_flag:
-                if self.power and SHOOT == command:
-                    self.shoot()
-
-                shoot_flag = True
-
-            # Aiming
-            # TODO: Maybe the oil should be consumed when aiming
-            if not aim_flag:
-                if command == AIM_LEFT_CMD:
-                    self.gun.turn_left()
-                elif command == AIM_RIGHT_CMD:
-                    self.gun.turn_right()
-
-                aim_flag = True
-
-            if self.oil <= 0:
-                self.oil = 0
-                self.lives = 0 
-                continue
-
-            # Movement
-            if not move_flag:
-                if TURN_LEFT_CMD == command and not self.is_turn_left and TURN_RIGHT_CMD != command:
-                    self.oil -= 0.1
-                    self.turn_left()
-                    self.is_turn_left = True
-                    self.is_forward = False
-                    self.is_backward = False
-                    self.is_turn_right = False
-                    self.action_history.append(TURN_LEFT_CMD)
-                elif TURN_RIGHT_CMD == command and not self.is_turn_right and TURN_LEFT_CMD != command:
-                    self.oil -= 0.1
-                    self.turn_right()
-                    self.is_turn_right = True
-                    self.is_forward = False
-                    self.is_backward = False
-                    self.is_turn_left = False
-                    self.action_history.append(TURN_RIGHT_CMD)
-                elif FORWARD_CMD == command and BACKWARD_CMD != command:
-                    self.oil -= 0.1
-                    self.forward()
-                    self.is_forward = True
-                    self.is_backward = False
-                    self.is_turn_right = False
-                    self.is_turn_left = False
-                    self.action_history.append(FORWARD_CMD)
-                elif BACKWARD_CMD == command and FORWARD_CMD != command:
-                    self.oil -= 0.1
-                    self.backward()
-                    self.is_backward = True
-                    self.is_forward = False
-                    self.is_turn_right = False
-                    self.is_turn_left = False
-                    self.action_history.append(BACKWARD_CMD)
-
-                move_flag = True
-
-            self.action_history = self.action_history[-1:]
+        # Movement
+        if action & TURN_LEFT_ACTION and not self.is_turn_left:
+            self.oil -= 0.1
+            self.turn_left()
+            self.is_turn_left = True
+            self.is_forward = False
+            self.is_backward = False
+            self.is_turn_right = False
+            self.action_history.append(TURN_LEFT_CMD)
+        elif action & TURN_RIGHT_ACTION and not self.is_turn_right:
+            self.oil -= 0.1
+            self.turn_right()
+            self.is_turn_right = True
+            self.is_forward = False
+            self.is_backward = False
+            self.is_turn_left = False
+            self.action_history.append(TURN_RIGHT_CMD)
+        elif action & FORWARD_ACTION:
+            self.oil -= 0.1
+            self.forward()
+            self.is_forward = True
+            self.is_backward = False
+            self.is_turn_right = False
+            self.is_turn_left = False
+            self.action_history.append(FORWARD_CMD)
+        elif action & BACKWARD_ACTION:
+            self.oil -= 0.1
+            self.backward()
+            self.is_backward = True
+            self.is_forward = False
+            self.is_turn_right = False
+            self.is_turn_left = False
+            self.action_history.append(BACKWARD_CMD)
+
+        self.action_history = self.action_history[-1:]
 
     def shoot(self):
         if self.last_shoot_frame == 0 or self.used_frame - self.last_shoot_frame > SHOOT_COOLDOWN:
@@ -196,52 +180,12 @@ class Player(pygame.sprite.Sprite):
             self.is_shoot = True
 
     def forward(self):
-        if self.id != 1:
-            rot = self.rot + 180
-            if rot >= 360:
-                rot -= 360
-        else:
-            rot = self.rot
-        if rot == 0:
-            self.rect.center += self.move_dict["left"]
-        elif rot == 315:
-            self.rect.center += self.move_dict["left_up"]
-        elif rot == 270:
-            self.rect.center += self.move_dict["up"]
-        elif rot == 225:
-            self.rect.center += self.move_dict["right_up"]
-        elif rot == 180:
-            self.rect.center += self.move_dict["right"]
-        elif rot == 135:
-            self.rect.center += self.move_dict["right_down"]
-        elif rot == 90:
-            self.rect.center += self.move_dict["down"]
-        elif rot == 45:
-            self.rect.center += self.move_dict["left_down"]
+        rot = self.rot if self.id == 1 else self.rot + 180
+        self.rect.center += self.move_dict[get_direction(rot)]
 
     def backward(self):
-        if self.id != 1:
-            rot = self.rot + 180
-            if rot >= 360:
-                rot -= 360
-        else:
-            rot = self.rot
-        if rot == 0:
-            self.rect.center += self.move_dict["right"]
-        elif rot == 315:
-            self.rect.center += self.move_dict["right_down"]
-        elif rot == 270:
-            self.rect.center += self.move_dict["down"]
-        elif rot == 225:
-            self.rect.center += self.move_dict["left_down"]
-        elif rot == 180:
-            self.rect.center += self.move_dict["left"]
-        elif rot == 135:
-            self.rect.center += self.move_dict["left_up"]
-        elif rot == 90:
-            self.rect.center += self.move_dict["up"]
-        elif rot == 45:
-            self.rect.center += self.move_dict["right_up"]
+        rot = self.rot if self.id == 1 else self.rot + 180
+        self.rect.center += self.move_dict[get_opposite_direction(rot)]
 
     def turn_left(self):
         self.last_turn_frame = self.used_frame
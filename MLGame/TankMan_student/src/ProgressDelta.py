@@ -0,0 +1,141 @@
+"""
+Game.get_scene_progress_data() 的差異編碼，給觀戰與錄影使用
+
+每個 frame 產生一則訊息，只帶有與上一則相比新增、移動、改變或消失的畫面物件：
+    {"frame": 第幾則訊息,
+     "keyframe": True 時先清空所有資料，
+     "layers": {layer: {"set": [[key, item], ...], "remove": [key, ...], "order": [key, ...]}},
+     "game_sys_info": 只在改變時出現}
+layer 為 object_list、toggle 等畫面資料的 list，沒有變動的 layer 不會出現
+同一個 layer 中的物件依 key 由小到大排列，只有不是這個順序時才帶有 order
+"""
+
+# key 的高位元為 section，低位元為 section 中的編號，同一個 layer 依 section 的順序排列
+SECTION_BITS = 24
+
+
+class ProgressDeltaEncoder:
+    def __init__(self, keyframe_interval: int = 300):
+        """
+        :param keyframe_interval: 每幾則訊息送一次完整的資料，讓中途加入的觀眾可以開始解碼
+        """
+        self.keyframe_interval = keyframe_interval
+        self.frame = 0
+        self.is_keyframe_requested = True
+        # section -> {物件: key}，只保留上一次出現的物件
+        self.section_keys = {}
+        self.next_numbers = {}
+        # layer -> {key: item}，上一則訊息之後的畫面
+        self.layers = {}
+        # 上一則訊息中不是依 key 排列、帶有 order 的 layer
+        self.ordered_layers = set()
+        self.game_sys_info = None
+
+    def request_keyframe(self):
+        """下一則訊息送完整的資料，例如換了一場遊戲時"""
+        self.is_keyframe_requested = True
+
+    def get_keys(self, section: int, objs: list) -> list:
+        """
+        同一個物件在連續出現的 frame 中拿到相同的 key，新物件的 key 比舊物件大
+        :param objs: section 中依畫面順序排列的物件，要能當作 dict 的 key
+        """
+        old_keys = self.section_keys.get(section, {})
+        number = self.next_numbers.get(section, 0)
+        keys = {}
+        for obj in objs:
+            key = old_keys.get(obj)
+            if key is None:
+                key = (section << SECTION_BITS) | number
+                number += 1
+            keys[obj] = key
+        self.section_keys[section] = keys
+        self.next_numbers[section] = number
+        return list(keys.values())
+
+    @staticmethod
+    def get_index_keys(section: int, items: list) -> list:
+        """沒有固定身分的物件(例如 HUD)以在 list 中的位置為 key"""
+        return [[(section << SECTION_BITS) | index, item] for index, item in enumerate(items)]
+
+    def encode(self, layers: dict, game_sys_info: dict) -> dict:
+        """
+        :param layers: layer -> [[key, item], ...]，依畫面順序排列
+        """
+        is_keyframe = self.is_keyframe_requested or self.frame % self.keyframe_interval == 0
+        if is_keyframe:
+            self.layers = {}
+            self.ordered_layers = set()
+            self.game_sys_info = None
+        message_layers = {}
+        for layer, pairs in layers.items():
+            old_items = self.layers.get(layer, {})
+            items = {}
+            changes = []
+            for key, item in pairs:
+                items[key] = item
+                if old_items.get(key) != item:
+                    changes.append([key, item])
+            removed = [key for key in old_items if key not in items]
+            keys = list(items)
+            is_sorted = all(keys[i] < keys[i + 1] for i in range(len(keys) - 1))
+            # 上一則帶有 order 時，即使恢復成依 key 排列也要再送一次 order
+            is_ordered = not is_sorted or layer in self.ordered_layers
+            if changes or removed or is_ordered or is_keyframe:
+                delta = {"set": changes, "remove": removed}
+                if is_ordered:
+                    delta["order"] = keys
+                message_layers[layer] = delta
+            if is_sorted:
+                self.ordered_layers.discard(layer)
+            else:
+                self.ordered_layers.add(layer)
+            self.layers[layer] = items
+        message = {"frame": self.frame, "keyframe": is_keyframe, "layers": message_layers}
+        if game_sys_info != self.game_sys_info:
+            message["game_sys_info"] = game_sys_info
+            self.game_sys_info = game_sys_info
+        self.frame += 1
+        self.is_keyframe_requested = False
+        return message
+
+
+class ProgressDeltaDecoder:
+    """由 ProgressDeltaEncoder 的訊息還原出與 Game.get_scene_progress_data() 相同的完整資料"""
+
+    def __init__(self):
+        self.layers = None
+        # layer -> 依畫面順序排列的 key，key 沒有增減時沿用
+        self.orders = {}
+        self.game_sys_info = {}
+
+    def decode(self, message: dict) -> dict:
+        """
+        :return: 完整的畫面資料，回傳的 list 之後不會被修改，其中的 item 會在不同 frame 間共用
+        """
+        if message["keyframe"]:
+            self.layers = {}
+            self.orders = {}
+            self.game_sys_info = {}
+        elif self.layers is None:
+            raise ValueError(f"frame {message['frame']} is not a keyframe, decoding must start from a keyframe")
+        for layer, delta in message["layers"].items():
+            items = self.layers.setdefault(layer, {})
+            is_key_changed = bool(delta["remove"])
+            for key in delta["remove"]:
+                del items[key]
+            for key, item in delta["set"]:
+                if key not in items:
+                    is_key_changed = True
+                items[key] = item
+            if "order" in delta:
+                self.orders[layer] = delta["order"]
+            elif is_key_changed or layer not in self.orders:
+                self.orders[layer] = sorted(items)
+        if "game_sys_info" in message:
+            self.game_sys_info = message["game_sys_info"]
+        progress = {}
+        for layer, items in self.layers.items():
+            progress[layer] = [items[key] for key in self.orders[layer]]
+        progress["game_sys_info"] = self.game_sys_info
+        return progress
@@ -0,0 +1,58 @@
+import pygame
+
+from .ReplayLog import ReplayLog, dump_keyframe, load_keyframe
+from .TeamBattleMode import TeamBattleMode
+
+
+class Replay:
+    """
+    以錄影檔重新模擬一場遊戲，可跳到任意 frame
+    由不超過目標的最近 keyframe 開始，用錄下的指令往後模擬
+    重播過程中每 keyframe_interval 個 frame 另外在記憶體中存一份狀態，之後往回跳也很快
+    預設不讀取檔案中的 keyframe，一律由第 0 個 frame 開始模擬，別人給的錄影也可以安全地開啟
+    """
+
+    def __init__(self, path: str, keyframe_interval: int = 100, load_keyframes: bool = False):
+        """
+        :param load_keyframes: 使用 "<錄影檔>.keys" 中的 keyframe，跳到後面的 frame 比較快。
+                               keyframe 是 pickle，讀取時可能執行任意程式碼，
+                               只能用在自己錄的或信任的錄影，例如本機比賽剛錄下的檔案
+        """
+        self.log = ReplayLog(path, load_keyframes)
+        self.keyframe_interval = keyframe_interval
+        self.frame_num = self.log.frame_num
+        self.game_mode = TeamBattleMode(self.log.green_team_num, self.log.blue_team_num, self.log.is_manual,
+                                        self.log.frame_limit, "", pygame.Rect(self.log.play_rect_area),
+                                        self.log.compiled_map, headless=True,
+                                        vectorized_bullets=self.log.vectorized_bullets,
+                                        firing_lanes=self.log.firing_lanes, seed=self.log.seed)
+        # 不存進 keyframe 的共用物件，由第 0 個 frame 的遊戲取得
+        self.static_objects = self.game_mode.get_replay_static_objects()
+        # frame -> 壓縮過的遊戲狀態，包含第 0 個 frame、檔案中的 keyframe(load_keyframes 時)與重播時存下的狀態
+        self.keyframes = {0: dump_keyframe(self.game_mode, self.static_objects)}
+        for frame in self.log.keyframe_index:
+            self.keyframes[frame] = self.log.get_keyframe(frame)
+
+    def seek(self, frame: int) -> TeamBattleMode:
+        """
+        :param frame: 0 ~ frame_num，第 frame 次 update() 之後的狀態
+        :return: 重播用的遊戲，下一次 seek() 時可能會被繼續模擬，請勿修改
+        """
+        if not 0 <= frame <= self.frame_num:
+            raise IndexError(f"frame {frame} is not in the replay")
+        start = max(keyframe for keyframe in self.keyframes if keyframe <= frame)
+        # 目前的遊戲比 keyframe 更接近目標時直接往後模擬
+        if not start <= self.game_mode.used_frame <= frame:
+            self.game_mode = load_keyframe(self.keyframes[start], self.static_objects)
+        while self.game_mode.used_frame < frame:
+            self.game_mode.update(self.log.get_actions(self.game_mode.used_frame + 1))
+            used_frame = self.game_mode.used_frame
+            if self.keyframe_interval and used_frame % self.keyframe_interval == 0 and used_frame not in self.keyframes:
+                self.keyframes[used_frame] = dump_keyframe(self.game_mode, self.static_objects)
+        return self.game_mode
+
+    def get_ai_data_to_player(self, frame: int) -> dict:
+        return self.seek(frame).get_ai_data_to_player()
+
+    def close(self):
+        self.log.close()
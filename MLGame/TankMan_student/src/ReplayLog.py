@@ -0,0 +1,189 @@
+import io
+import json
+import mmap
+import pickle
+import struct
+import zlib
+
+from mlgame.game.paia_game import GameStatus
+
+from .action import decode_action
+from .game_module.TiledMap import CompiledMap
+
+# 錄影檔格式
+# 檔頭: HEADER_STRUCT + zlib 壓縮的 CompiledMap JSON
+# 之後每個 frame 一筆固定長度的紀錄，每位玩家 1 byte 的 action bitmask，第 n 個 frame 的位置可直接算出
+# keyframe 另存於 "<錄影檔>.keys"，每筆為 KEYFRAME_STRUCT + zlib 壓縮的遊戲狀態(pickle)
+# 錄影檔本身不含 pickle，可以開啟別人的錄影；.keys 讀取時會執行 pickle，只能讀取自己信任的檔案
+REPLAY_MAGIC = b"TMRP"
+REPLAY_VERSION = 1
+# magic, version, green_team_num, blue_team_num, flags, frame_limit, seed, play_rect_area, map 長度
+HEADER_STRUCT = struct.Struct("<4sHBBBxIq4iI")
+# frame, 資料長度
+KEYFRAME_STRUCT = struct.Struct("<II")
+KEYFRAME_INTERVAL = 500
+KEYFRAME_SUFFIX = ".keys"
+
+FLAG_IS_MANUAL = 1
+FLAG_VECTORIZED_BULLETS = 2
+FLAG_FIRING_LANES = 4
+
+
+class _KeyframePickler(pickle.Pickler):
+    """地圖等不會變動的物件不存進 keyframe，讀取時換成重播端自己的同一份物件"""
+
+    def __init__(self, file, static_objects: list):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self.static_ids = {id(obj): index for index, obj in enumerate(static_objects)}
+
+    def persistent_id(self, obj):
+        return self.static_ids.get(id(obj))
+
+
+class _KeyframeUnpickler(pickle.Unpickler):
+    def __init__(self, file, static_objects: list):
+        super().__init__(file)
+        self.static_objects = static_objects
+
+    def persistent_load(self, pid):
+        return self.static_objects[pid]
+
+
+def dump_map(compiled_map: CompiledMap) -> bytes:
+    return zlib.compress(json.dumps([compiled_map.tile_width, compiled_map.tile_height, compiled_map.width,
+                                     compiled_map.height, compiled_map.tile_list]).encode())
+
+
+def load_map(data: bytes) -> CompiledMap:
+    tile_width, tile_height, width, height, tile_list = json.loads(zlib.decompress(data))
+    return CompiledMap(tile_width, tile_height, width, height,
+                       tuple((tuple(pos), img_id) for pos, img_id in tile_list))
+
+
+def dump_keyframe(obj, static_objects: list) -> bytes:
+    file = io.BytesIO()
+    _KeyframePickler(file, static_objects).dump(obj)
+    return zlib.compress(file.getvalue())
+
+
+def load_keyframe(data: bytes, static_objects: list):
+    return _KeyframeUnpickler(io.BytesIO(zlib.decompress(data)), static_objects).load()
+
+
+class ReplayRecorder:
+    """
+    一場遊戲的錄影，只往檔案後面附加資料
+    每個 frame 記錄所有玩家的指令，每 keyframe_interval 個 frame 另存一份遊戲狀態
+    """
+
+    def __init__(self, path: str, game_mode, keyframe_interval: int = KEYFRAME_INTERVAL):
+        """
+        :param game_mode: 剛建立好的 TeamBattleMode
+        :param keyframe_interval: 0 代表不存 keyframe，重播時一律由第 0 個 frame 開始模擬
+        """
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.player_names = [f"{no}P" for no in range(1, game_mode.green_team_num + game_mode.blue_team_num + 1)]
+        flags = (FLAG_IS_MANUAL if game_mode.is_manual else 0) \
+            | (FLAG_VECTORIZED_BULLETS if game_mode.vectorized_bullets else 0) \
+            | (FLAG_FIRING_LANES if game_mode.firing_lanes else 0)
+        map_data = dump_map(game_mode.map.compiled_map)
+        self.file = open(path, "wb")
+        self.file.write(HEADER_STRUCT.pack(REPLAY_MAGIC, REPLAY_VERSION, game_mode.green_team_num,
+                                           game_mode.blue_team_num, flags, game_mode.frame_limit, game_mode.seed,
+                                           *game_mode.play_rect_area, len(map_data)))
+        self.file.write(map_data)
+        self.keyframe_file = open(path + KEYFRAME_SUFFIX, "wb") if keyframe_interval else None
+
+    def record_actions(self, actions):
+        """
+        :param actions: 依玩家編號排列的 action bitmask
+        """
+        self.file.write(bytes(list(actions)))
+
+    def record_frame_end(self, game_mode):
+        """update() 結束時呼叫，到了 keyframe 的 frame 就存下遊戲狀態，遊戲結束時關閉檔案"""
+        if self.keyframe_file and game_mode.used_frame % self.keyframe_interval == 0 \
+                and game_mode.status == GameStatus.GAME_ALIVE:
+            data = dump_keyframe(game_mode, game_mode.get_replay_static_objects())
+            self.keyframe_file.write(KEYFRAME_STRUCT.pack(game_mode.used_frame, len(data)))
+            self.keyframe_file.write(data)
+            self.keyframe_file.flush()
+            self.file.flush()
+        if game_mode.status != GameStatus.GAME_ALIVE:
+            self.close()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+        if self.keyframe_file and not self.keyframe_file.closed:
+            self.keyframe_file.close()
+
+
+class ReplayLog:
+    """以 mmap 讀取錄影檔，第 n 個 frame 的指令直接由位置取得"""
+
+    def __init__(self, path: str, load_keyframes: bool = False):
+        """
+        :param load_keyframes: 讀取 "<錄影檔>.keys" 中的 keyframe。keyframe 是 pickle，
+                               讀取別人給的檔案可能執行任意程式碼，只有自己錄的或信任的錄影才可以開啟
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.green_team_num, self.blue_team_num, flags, self.frame_limit, self.seed, \
+            *play_rect_area, map_len = HEADER_STRUCT.unpack_from(self.mmap)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"{path} is not a TankMan replay")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        self.play_rect_area = tuple(play_rect_area)
+        self.is_manual = bool(flags & FLAG_IS_MANUAL)
+        self.vectorized_bullets = bool(flags & FLAG_VECTORIZED_BULLETS)
+        self.firing_lanes = bool(flags & FLAG_FIRING_LANES)
+        map_start = HEADER_STRUCT.size
+        self.compiled_map = load_map(self.mmap[map_start:map_start + map_len])
+        self.player_names = [f"{no}P" for no in range(1, self.green_team_num + self.blue_team_num + 1)]
+        self.record_start = map_start + map_len
+        self.record_size = len(self.player_names)
+        # 沒寫完的最後一筆不算
+        self.frame_num = (len(self.mmap) - self.record_start) // self.record_size
+        # frame -> (offset, 長度)
+        self.keyframe_index = {}
+        self.keyframe_data = b""
+        if load_keyframes:
+            try:
+                with open(path + KEYFRAME_SUFFIX, "rb") as f:
+                    self.keyframe_data = f.read()
+            except FileNotFoundError:
+                pass
+        offset = 0
+        while offset + KEYFRAME_STRUCT.size <= len(self.keyframe_data):
+            frame, length = KEYFRAME_STRUCT.unpack_from(self.keyframe_data, offset)
+            offset += KEYFRAME_STRUCT.size
+            if offset + length > len(self.keyframe_data) or frame > self.frame_num:
+                break
+            self.keyframe_index[frame] = (offset, length)
+            offset += length
+
+    def get_actions(self, frame: int) -> bytes:
+        """
+        :param frame: 1 ~ frame_num，第 frame 次 update() 收到的指令
+        :return: 依玩家編號排列的 action bitmask，可直接傳給 TeamBattleMode.update()
+        """
+        if not 1 <= frame <= self.frame_num:
+            raise IndexError(f"frame {frame} is not in the replay")
+        start = self.record_start + (frame - 1) * self.record_size
+        return self.mmap[start:start + self.record_size]
+
+    def get_commands(self, frame: int) -> dict:
+        """與 get_actions() 相同，但轉成 ai 名稱 -> 字串指令 list"""
+        return {name: decode_action(action) for name, action in zip(self.player_names, self.get_actions(frame))}
+
+    def get_keyframe(self, frame: int) -> bytes:
+        """只有 load_keyframes 時才有 keyframe，回傳的資料要用 load_keyframe() 還原，請勿讀取不信任的檔案"""
+        offset, length = self.keyframe_index[frame]
+        return self.keyframe_data[offset:offset + length]
+
+    def close(self):
+        self.mmap.close()
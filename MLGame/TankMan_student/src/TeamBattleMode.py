@@ -1,9 +1,10 @@
+import math
 import random
-import time
+import numpy as np
 import pygame.event
 import pygame.event
 from src.game_module.SoundController import create_sounds_data, create_bgm_data, SoundController
-from src.game_module.TiledMap import create_construction, TiledMap
+from src.game_module.TiledMap import create_construction, TiledMap, CompiledMap
 
 from mlgame.game.paia_game import GameResultState, GameStatus
 from mlgame.utils.enum import get_ai_name
@@ -11,36 +12,69 @@ from mlgame.view.view_model import create_asset_init_data, create_text_view_data
     create_rect_view_data, create_line_view_data
 from mlgame.view.view_model import create_image_view_data
 from .Bullet import Bullet
+from .BulletStore import BulletStore
 from .Gun import Gun
+from .ObservationBuilder import ObservationBuilder
 from .Player import Player
 from .Station import Station
 from .Wall import Wall
+from .action import encode_command_dict
 from .collide_hit_rect import *
 from .env import *
-from .game_module.fuctions import set_topleft, add_score, set_shoot
+from .game_module.FrameProfiler import FrameProfiler
+from .game_module.InfoListCache import InfoListCache
+from .game_module.NavigationGrid import NavigationGrid
+from .game_module.WallGrid import WallGrid
+from .game_module.fuctions import set_topleft, add_score, set_shoot, create_bar_data
+from .ReplayLog import ReplayRecorder
+from .raycast import NO_HIT, WALL_HIT, cast_firing_lanes, get_hit_rect_array
 
 
 class TeamBattleMode:
     def __init__(self, green_team_num: int, blue_team_num: int, is_manual: bool, frame_limit: int, sound_path: str,
-                 play_rect_area: pygame.Rect):
+                 play_rect_area: pygame.Rect, compiled_map: CompiledMap = None, headless: bool = False,
+                 vectorized_bullets: bool = False, firing_lanes: bool = False, seed: int = None,
+                 record_path: str = None, profiler: FrameProfiler = None):
+        """
+        :param headless: 訓練或比賽用，只保留模擬狀態，不初始化 pygame、不建立音效與畫面資料
+        :param vectorized_bullets: 以 BulletStore 的 NumPy 陣列取代一顆子彈一個 Bullet sprite
+        :param firing_lanes: 給玩家的資料中加入 firing_lanes，為 8 個砲管角度射擊時最先打到的東西
+        :param seed: 出生點、補給站位置、平手與背景的亂數種子，None 時由全域的 random 產生
+                     相同的 seed 與指令一定得到相同的結果
+        :param record_path: 將這場遊戲錄影到此檔案，reset 後不再錄影
+        :param profiler: 記錄 update() 各階段與產生玩家資料的時間，reset 後繼續使用
+        """
         # init game
-        pygame.init()
+        self.headless = headless
+        self.vectorized_bullets = vectorized_bullets
+        self.firing_lanes = firing_lanes
+        self.profiler = profiler
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        if not self.headless:
+            pygame.init()
         self.sound_path = sound_path
         self.green_team_num = green_team_num
         self.blue_team_num = blue_team_num if (6 - (green_team_num + blue_team_num)) >= 0 else (6 - green_team_num)
         self.map_name = f"map_{green_team_num}_v_{self.blue_team_num}.tmx" if not IS_DEBUG else f"test_map_{green_team_num}_v_{self.blue_team_num}.tmx"
         self.map_path = path.join(MAP_DIR, self.map_name)
-        self.map = TiledMap(self.map_path)
+        self.map = TiledMap(self.map_path, compiled_map)
         self.scene_width = self.map.map_width
         self.scene_height = self.map.map_height + 100
         self.width_center = self.scene_width // 2
+        # 分數條從 x = 24 開始每分 1.5 px，超過畫面中間就換列
+        self.score_bar_row_units = int((self.width_center - 24) // 1.5) + 1
         self.height_center = self.scene_height // 2
         self.play_rect_area = play_rect_area
         self.used_frame = 0
         self.state = GameResultState.FAIL
         self.status = GameStatus.GAME_ALIVE
-        self.sound_controller = SoundController(sound_path, self.get_sound_data())
-        self.sound_controller.play_music(self.get_bgm_data())
+        self.sound_controller = None
+        if not self.headless:
+            self.sound_controller = SoundController(sound_path, self.get_sound_data())
+            self.sound_controller.play_music(self.get_bgm_data())
         self.frame_limit = frame_limit
         self.is_manual = is_manual
         self.obj_rect_list = []
@@ -56,8 +90,11 @@ class TeamBattleMode:
         self.players_b = pygame.sprite.Group()
         self.all_players = pygame.sprite.Group()
         self.guns = pygame.sprite.Group()
-        self.walls = pygame.sprite.Group()
-        self.bullets = pygame.sprite.Group()
+        self.walls = WallGrid(self.map.tile_width, self.map.tile_height)
+        if self.vectorized_bullets:
+            self.bullets = BulletStore(self.play_rect_area)
+        else:
+            self.bullets = pygame.sprite.Group()
         self.bullet_stations = pygame.sprite.Group()
         self.oil_stations = pygame.sprite.Group()
         # init players
@@ -91,6 +128,10 @@ class TeamBattleMode:
         # init walls
         self.walls.add(all_obj[WALL_IMG_NO])
         self.all_sprites.add(*self.walls)
+        # shortest paths between tiles, shared by every game on the same map until a wall is destroyed
+        self.navigation = NavigationGrid.from_compiled_map(self.map.compiled_map, (WALL_IMG_NO,))
+        # tile with a wall, for raycast
+        self.wall_mask = np.array(self.map.tile_grid) == WALL_IMG_NO
         # init bullet stations
         self.bullet_stations.add(all_obj[BULLET_STATION_IMG_NO])
         self.all_sprites.add(*self.bullet_stations)
@@ -101,31 +142,93 @@ class TeamBattleMode:
         self.all_pos_list = self.map.all_pos_list
         self.empty_quadrant_pos_dict = self.map.empty_quadrant_pos_dict
         self.background = []
-        for pos in self.all_pos_list:
-            no = random.randrange(3)
-            self.background.append(
-                create_image_view_data(f"floor_{no}", pos[0], pos[1], 50, 50, 0))
+        if not self.headless:
+            # 背景另外使用一個亂數，有沒有畫面都不影響遊戲的結果
+            background_rng = random.Random(seed)
+            for pos in self.all_pos_list:
+                no = background_rng.randrange(3)
+                self.background.append(
+                    create_image_view_data(f"floor_{no}", pos[0], pos[1], 50, 50, 0))
+            self.background.append(create_image_view_data("border", 0, -50, self.scene_width, WINDOW_HEIGHT, 0))
         self.obj_list = [self.oil_stations, self.bullet_stations, self.bullets, self.all_players, self.guns, self.walls]
-        self.background.append(create_image_view_data("border", 0, -50, self.scene_width, WINDOW_HEIGHT, 0))
-        # init play get new score time
-        self.team_green_maxScoreTime = time.time()
-        self.team_blue_maxScoreTime = time.time()
+        # init play get new score time, in frames so the result can be reproduced
+        self.team_green_maxScoreTime = 0
+        self.team_blue_maxScoreTime = 0
         self.team_green_maxScore = 0
         self.team_blue_maxScore = 0
+        # scene info for ai, built at most once per frame
+        self.ai_data_to_player = None
+        # NumPy observation, built only when get_observation() is called
+        self.observation_builder = None
+        self.observation = None
+        self.create_info_caches()
         self.change_player_pos()
-
-    def update(self, command: dict):
+        self.recorder = ReplayRecorder(record_path, self) if record_path else None
+
+    def create_info_caches(self):
+        self.is_walls_changed = True
+        self.walls_info_cache = InfoListCache(lambda wall: wall.lives)
+        self.stations_info_cache = {
+            BULLET_STATION_IMG_NO: InfoListCache(lambda station: (station.rect.topleft, station.is_alive)),
+            OIL_STATION_IMG_NO: InfoListCache(lambda station: (station.rect.topleft, station.is_alive))}
+
+    def __getstate__(self):
+        """錄影的 keyframe 使用，音效、快取與錄影本身不保存"""
+        state = self.__dict__.copy()
+        for key in ("sound_controller", "recorder", "profiler", "ai_data_to_player", "walls_info_cache",
+                    "stations_info_cache", "observation_builder", "observation"):
+            state[key] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.create_info_caches()
+
+    def get_replay_static_objects(self) -> list:
+        """同一張地圖不會變動的物件，keyframe 中不保存，重播時換成重播端的同一份"""
+        return [self.map.compiled_map, self.map.tile_grid, self.map.all_pos_list, self.map.empty_pos_list,
+                self.navigation.neighbors, self.play_rect_area]
+
+    def update(self, command):
+        """
+        :param command: ai 名稱 -> 字串指令 list，
+                        或已經轉好、依玩家編號排列的 action bitmask 序列(見 src.action)，不需要再轉換
+        """
+        self.ai_data_to_player = None
+        self.observation = None
+        if isinstance(command, dict):
+            actions = encode_command_dict(command, self.green_team_num + self.blue_team_num)
+        else:
+            actions = command
+        if self.recorder:
+            self.recorder.record_actions(actions)
         # refactor
         self.team_green_score = sum([player.score for player in self.players_a if isinstance(player, Player)])
         self.team_blue_score = sum([player.score for player in self.players_b if isinstance(player, Player)])
         self.used_frame += 1
+        profiler = self.profiler
+        if profiler:
+            profiler.start_lap()
         self.check_collisions()
+        if profiler:
+            profiler.lap("check_collisions")
         self.walls.update()
+        self.remove_destroyed_walls()
+        if profiler:
+            profiler.lap("walls.update")
         self.create_bullet(self.all_players)
+        if profiler:
+            profiler.lap("create_bullet")
         self.bullets.update()
+        if profiler:
+            profiler.lap("bullets.update")
         self.bullet_stations.update()
         self.oil_stations.update()
-        self.all_players.update(command)
+        if profiler:
+            profiler.lap("stations.update")
+        self.all_players.update(actions)
+        if profiler:
+            profiler.lap("all_players.update")
         self.get_player_end()
         if self.used_frame >= self.frame_limit:
             self.get_game_end()
@@ -134,18 +237,31 @@ class TeamBattleMode:
         # check if getting new score
         if self.team_green_score > self.team_green_maxScore:
             self.team_green_maxScore = self.team_green_score
-            self.team_green_maxScoreTime = time.time()
+            self.team_green_maxScoreTime = self.used_frame
 
         if self.team_blue_score > self.team_blue_maxScore:
             self.team_blue_maxScore = self.team_blue_score
-            self.team_blue_maxScoreTime = time.time()            
-
-    def reset(self):
-        # reset init game
+            self.team_blue_maxScoreTime = self.used_frame
+
+        if self.recorder:
+            self.recorder.record_frame_end(self)
+
+    def reset(self, seed: int = None, compiled_map: CompiledMap = None):
+        """
+        :param seed: 下一場的亂數種子，None 時由這一場的亂數產生，連續多場仍可重現
+        :param compiled_map: 下一場改用的地圖，例如 MapGenerator 產生的地圖，None 時沿用目前的地圖
+        出生點已在 __init__ 中隨機決定，與用同一個 seed 建立的新遊戲完全相同
+        """
+        if self.recorder:
+            self.recorder.close()
+        if seed is None:
+            seed = self.rng.getrandbits(63)
+        if compiled_map is None:
+            compiled_map = self.map.compiled_map
+        # reset init game, reuse the parsed map instead of reading the tmx again
         self.__init__(self.green_team_num, self.blue_team_num, self.is_manual, self.frame_limit, self.sound_path,
-                      self.play_rect_area)
-        # reset player pos
-        self.change_player_pos()
+                      self.play_rect_area, compiled_map, self.headless, self.vectorized_bullets,
+                      self.firing_lanes, seed, profiler=self.profiler)
 
     def get_player_end(self):
         is_alive_team_green = False
@@ -171,7 +287,7 @@ class TeamBattleMode:
             # if both the teams have a score of 0
             if self.team_green_maxScore == 0 and self.team_blue_maxScore == 0:
                 conditions = ["GREEN_TEAM_WIN","BLUE_TEAM_WIN"]
-                chosen_condition = random.choice(conditions)
+                chosen_condition = self.rng.choice(conditions)
                 self.set_result(GameResultState.FINISH, chosen_condition)                
             else:                
             # if both teams have scored and their scores are equal
@@ -202,10 +318,11 @@ class TeamBattleMode:
                 get_res["status"] = self.status
                 get_res["used_frame"] = self.used_frame
                 if team_id == "green":
-                    timestamp = self.team_green_maxScoreTime
+                    score_frame = self.team_green_maxScoreTime
                 else:
-                    timestamp = self.team_blue_maxScoreTime
-                get_res["latestScoreTime"] = "{:.3f}".format(timestamp)
+                    score_frame = self.team_blue_maxScoreTime
+                # 最後一次得分的 frame
+                get_res["latestScoreTime"] = str(score_frame)
                 res.append(get_res)
 
         for player in res:            
@@ -243,44 +360,54 @@ class TeamBattleMode:
             self.change_obj_pos(supply_stations)
 
         player_score_data = collide_with_bullets(self.walls, self.bullets)
+        # every bullet that hits a wall leaves its owner in player_score_data, even with 0 score
+        if player_score_data:
+            self.is_walls_changed = True
         for player, score in player_score_data.items():
             self.add_player_score(player, score)
 
     def change_player_pos(self):
         for player in self.all_players:
             quadrant = player.quadrant
-            self.empty_quadrant_pos_dict[quadrant].append(player.rect.topleft)
+            self.empty_quadrant_pos_dict[quadrant].add(player.rect.topleft)
             if quadrant == 2 or quadrant == 3:
-                player.quadrant = random.choice([2, 3])
+                player.quadrant = self.rng.choice([2, 3])
             else:
-                player.quadrant = random.choice([1, 4])
+                player.quadrant = self.rng.choice([1, 4])
             quadrant = player.quadrant
-            new_pos = self.empty_quadrant_pos_dict[quadrant].pop(
-                random.randrange(len(self.empty_quadrant_pos_dict[quadrant])))
+            new_pos = self.empty_quadrant_pos_dict[quadrant].pop_random(self.rng)
             set_topleft(player, new_pos)
             set_topleft(player.gun, new_pos)
 
     # TODO move method to Station
     def change_obj_pos(self, objs=None):
-        if objs is None:
+        if not objs:
             return
+        # 坦克會移動，不在空位置的集合中，移動補給站時另外避開
+        player_rects = [player.rect for player in self.all_players if isinstance(player, Player) and player.is_alive]
         for obj in objs:
             quadrant = obj.quadrant
-            self.empty_quadrant_pos_dict[quadrant].append(obj.rect.topleft)
+            self.empty_quadrant_pos_dict[quadrant].add(obj.rect.topleft)
             if quadrant == 2 or quadrant == 3:
-                obj.quadrant = random.choice([2, 3])
+                obj.quadrant = self.rng.choice([2, 3])
             else:
-                obj.quadrant = random.choice([1, 4])
+                obj.quadrant = self.rng.choice([1, 4])
             quadrant = obj.quadrant
-            new_pos = self.empty_quadrant_pos_dict[quadrant].pop(
-                random.randrange(len(self.empty_quadrant_pos_dict[quadrant])))
+            size = obj.rect.size
+            new_pos = self.empty_quadrant_pos_dict[quadrant].pop_random(
+                self.rng, lambda pos: pygame.Rect(pos, size).collidelist(player_rects) != -1)
             set_topleft(obj, new_pos)
 
     def create_bullet(self, sprites: pygame.sprite.Group):
         for sprite in sprites:
             if not sprite.is_shoot:
                 continue
-            self.sound_controller.play_sound("shoot", 0.03, -1)
+            if self.sound_controller:
+                self.sound_controller.play_sound("shoot", 0.03, -1)
+            if self.vectorized_bullets:
+                self.bullets.add(sprite.id, sprite.no, sprite.rect.center, sprite.gun.get_rot())
+                set_shoot(sprite, False)
+                continue
             init_data = create_construction(sprite.id, sprite.no, sprite.rect.center, (BULLET_SIZE[0], BULLET_SIZE[1]))
             bullet = Bullet(init_data, rot=sprite.gun.get_rot(), margin=2, spacing=2, bullet_speed=BULLET_SPEED,
                             bullet_travel_distance=BULLET_TRAVEL_DISTANCE
@@ -346,42 +473,25 @@ class TeamBattleMode:
 
     def get_toggle_progress_data(self):
         toggle_data = []
+        if self.headless:
+            return toggle_data
         hourglass_index = 0
         if self.is_manual:
             hourglass_index = self.used_frame // 10 % 15
         toggle_data.append(
             create_image_view_data(image_id=f"hourglass_{hourglass_index}", x=0, y=2, width=20, height=20, angle=0))
-        x = 23
-        y = 8
-        for frame in range((self.frame_limit - self.used_frame) // int((30 * 2))):
-            toggle_data.append(create_rect_view_data("frame", x, y, 3, 10, RED))
-            x += 3.5
+        # 剩下的時間每 60 frame 一格，合併成一個矩形
+        frame_units = (self.frame_limit - self.used_frame) // int((30 * 2))
+        toggle_data.extend(create_bar_data("frame", [(frame_units, RED)], 23, (8,), max(frame_units, 1), 3, 3.5, 10))
         toggle_data.append(create_text_view_data(f"Frame: {self.frame_limit - self.used_frame}",
                                                  self.width_center + self.width_center // 2 + 85, 8, RED,
                                                  "24px Arial BOLD"))
-        x = 24
-        y = 20
-        for score in range(min(self.team_green_score, self.team_blue_score)):
-            toggle_data.append(create_rect_view_data(name="score", x=x, y=y, width=1, height=10, color=ORANGE))
-            x += 1.5
-            if x > self.width_center:
-                if y == 32:
-                    y = 44
-                else:
-                    y = 32
-                x = 24
-        for score in range(abs(self.team_green_score - self.team_blue_score)):
-            if self.team_green_score > self.team_blue_score:
-                toggle_data.append(create_rect_view_data("score", x, y, 1, 10, DARKGREEN))
-            else:
-                toggle_data.append(create_rect_view_data("score", x, y, 1, 10, BLUE))
-            x += 1.5
-            if x > self.width_center:
-                if y == 32:
-                    y = 44
-                else:
-                    y = 32
-                x = 24
+        # 分數每分一格，雙方相同的分數為橘色，領先的部分為領先隊伍的顏色，最多畫 3 列
+        lead_color = DARKGREEN if self.team_green_score > self.team_blue_score else BLUE
+        toggle_data.extend(create_bar_data(
+            "score", [(min(self.team_green_score, self.team_blue_score), ORANGE),
+                      (abs(self.team_green_score - self.team_blue_score), lead_color)],
+            24, (20, 32, 44), self.score_bar_row_units, 1, 1.5, 10))
         # 1P
         x = WINDOW_WIDTH - 125
         y = WINDOW_HEIGHT - 40
@@ -408,6 +518,8 @@ class TeamBattleMode:
 
     def get_toggle_with_bias_data(self):
         toggle_with_bias_data = []
+        if self.headless:
+            return toggle_with_bias_data
         color = WHITE
         for player in self.all_players:
             if isinstance(player, Player) and player.is_alive:
@@ -426,26 +538,103 @@ class TeamBattleMode:
                     create_rect_view_data(f"{team_id}_oil", x, y, int(player.oil * 0.5), 8, ORANGE))
                 # power
                 y = player.rect.bottom + 10
-                for power in range(player.power):
-                    toggle_with_bias_data.append(create_rect_view_data(f"{team_id}_power", x + 1, y, 3, 8, BLUE))
-                    x += 5
+                toggle_with_bias_data.extend(
+                    create_bar_data(f"{team_id}_power", [(player.power, BLUE)], x + 1, (y,), 10, 3, 5, 8))
 
         return toggle_with_bias_data
 
+    def remove_destroyed_walls(self):
+        for wall in self.walls.removed_walls:
+            cell_x, cell_y = self.navigation.get_cell(wall.rect.center)
+            self.navigation.set_free((cell_x, cell_y))
+            self.wall_mask[cell_y, cell_x] = False
+        self.walls.removed_walls.clear()
+
+    def get_firing_lanes(self) -> dict:
+        """
+        每個存活玩家往 8 個砲管角度射擊時，子彈最先打到的東西
+        :return: player -> 依角度 0, 45, ..., 315 排列的 list，hit 為 "wall"、"1P" 等玩家、
+                 "bullet_station"、"oil_station" 或 None，frame 為子彈飛行幾個 frame 後打到
+        """
+        players = [player for player in self.all_players if isinstance(player, Player) and player.lives > 0]
+        if not players:
+            return {}
+        stations = [*self.bullet_stations, *self.oil_stations]
+        targets = players + stations
+        target_names = [f"{player.no}P" for player in players] \
+            + ["bullet_station" if station.id == BULLET_STATION_IMG_NO else "oil_station" for station in stations]
+        hit_index, hit_frame, hit_position = cast_firing_lanes(
+            [player.rect.center for player in players], [player.no for player in players], self.wall_mask,
+            (self.map.tile_width, self.map.tile_height), get_hit_rect_array([target.rect for target in targets]),
+            [player.no for player in players] + [0] * len(stations), self.play_rect_area)
+        firing_lanes = {}
+        for player_index, player in enumerate(players):
+            lanes = []
+            for direction_index in range(len(hit_index[player_index])):
+                index = int(hit_index[player_index, direction_index])
+                if index == NO_HIT:
+                    lanes.append({"angle": direction_index * 45, "hit": None, "frame": None, "distance": None})
+                    continue
+                x, y = hit_position[player_index, direction_index]
+                lanes.append({"angle": direction_index * 45,
+                              "hit": "wall" if index == WALL_HIT else target_names[index],
+                              "frame": int(hit_frame[player_index, direction_index]),
+                              "distance": round(math.hypot(x - player.rect.centerx, y - player.rect.centery))})
+            firing_lanes[player] = lanes
+        return firing_lanes
+
     def get_ai_data_to_player(self):
+        """
+        同一個 frame 內重複呼叫會拿到同一份資料，update() 之後才會重新產生
+        牆壁與補給站只在有變動時更新，所有玩家共用同一份 list，請勿修改
+        """
+        if self.ai_data_to_player is None:
+            if self.profiler:
+                self.profiler.start_lap()
+                self.ai_data_to_player = self.create_ai_data_to_player()
+                self.profiler.lap("get_ai_data_to_player")
+            else:
+                self.ai_data_to_player = self.create_ai_data_to_player()
+        return self.ai_data_to_player
+
+    def get_observation(self):
+        """
+        get_ai_data_to_player() 中玩家、子彈與補給站的資訊，改為每位玩家一筆固定格式的 NumPy 結構化資料
+        格式見 ObservationBuilder，牆壁請使用 wall_mask 或 navigation
+        同一個 frame 內重複呼叫會拿到同一份陣列，請勿修改
+        """
+        if self.observation is None:
+            if self.observation_builder is None:
+                self.observation_builder = ObservationBuilder(self)
+            if self.profiler:
+                self.profiler.start_lap()
+                self.observation = self.observation_builder.create_observation()
+                self.profiler.lap("get_observation")
+            else:
+                self.observation = self.observation_builder.create_observation()
+        return self.observation
+
+    def create_ai_data_to_player(self):
         to_player_data = {}
         num = 0
         competitor_info = {
             1: [player.get_data_from_obj_to_game() for player in self.players_a if isinstance(player, Player)]
             , 2: [player.get_data_from_obj_to_game() for player in self.players_b if isinstance(player, Player)]
             }
-        walls_info = [wall.get_data_from_obj_to_game() for wall in self.walls if isinstance(wall, Wall)]
-        bullet_stations_info = [bullst_station.get_data_from_obj_to_game() for bullst_station in self.bullet_stations if
-                                isinstance(bullst_station, Station)]
-        oil_stations_info = [oil_station.get_data_from_obj_to_game() for oil_station in self.oil_stations if
-                             isinstance(oil_station, Station)]
-        bullets_info = [bullet.get_data_from_obj_to_game() for bullet in self.bullets if
-                        isinstance(bullet, Bullet)]
+        if self.is_walls_changed:
+            self.walls_info_cache.get(wall for wall in self.walls if isinstance(wall, Wall))
+            self.is_walls_changed = False
+        walls_info = self.walls_info_cache.info_list
+        bullet_stations_info = self.stations_info_cache[BULLET_STATION_IMG_NO].get(
+            bullst_station for bullst_station in self.bullet_stations if isinstance(bullst_station, Station))
+        oil_stations_info = self.stations_info_cache[OIL_STATION_IMG_NO].get(
+            oil_station for oil_station in self.oil_stations if isinstance(oil_station, Station))
+        if self.vectorized_bullets:
+            bullets_info = self.bullets.get_data_from_obj_to_game()
+        else:
+            bullets_info = [bullet.get_data_from_obj_to_game() for bullet in self.bullets if
+                            isinstance(bullet, Bullet)]
+        firing_lanes = self.get_firing_lanes() if self.firing_lanes else {}
         for player in self.players_a:
             if isinstance(player, Player):
                 to_game_data = player.get_data_from_obj_to_game()
@@ -457,6 +646,8 @@ class TeamBattleMode:
                 to_game_data["bullets_info"] = bullets_info
                 to_game_data["bullet_stations_info"] = bullet_stations_info
                 to_game_data["oil_stations_info"] = oil_stations_info
+                if self.firing_lanes:
+                    to_game_data["firing_lanes"] = firing_lanes.get(player, [])
                 to_player_data[get_ai_name(num)] = to_game_data
                 num += 1
         for player in self.players_b:
@@ -470,6 +661,8 @@ class TeamBattleMode:
                 to_game_data["bullets_info"] = bullets_info
                 to_game_data["bullet_stations_info"] = bullet_stations_info
                 to_game_data["oil_stations_info"] = oil_stations_info
+                if self.firing_lanes:
+                    to_game_data["firing_lanes"] = firing_lanes.get(player, [])
                 to_player_data[get_ai_name(num)] = to_game_data
                 num += 1
 
@@ -491,14 +684,15 @@ class TeamBattleMode:
 
     def debugging(self, is_debug: bool):
         self.obj_rect_list = []
-        if not is_debug:
+        if not is_debug or self.headless:
             return
         play_rect_area_points = [self.play_rect_area.topleft, self.play_rect_area.topright
             , self.play_rect_area.bottomright, self.play_rect_area.bottomleft
             , self.play_rect_area.topleft]
 
-        for sprite in self.all_sprites:
-            if isinstance(sprite, pygame.sprite.Sprite):
+        sprites = [*self.all_sprites, *self.bullets] if self.vectorized_bullets else self.all_sprites
+        for sprite in sprites:
+            if hasattr(sprite, "rect"):
                 top_left = sprite.rect.topleft
                 points = [top_left, sprite.rect.topright, sprite.rect.bottomright
                     , sprite.rect.bottomleft, top_left]
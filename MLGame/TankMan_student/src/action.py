@@ -0,0 +1,61 @@
+from mlgame.utils.enum import get_ai_name
+
+from .env import TURN_LEFT_CMD, TURN_RIGHT_CMD, FORWARD_CMD, BACKWARD_CMD, AIM_LEFT_CMD, AIM_RIGHT_CMD, SHOOT
+
+# 玩家一個 frame 的動作，以 1 byte 的 bitmask 表示，移動、瞄準與射擊各佔一段
+# 由字串指令轉換時只會有一個 bit，與 Player 只執行最後一個指令相同
+ACTION_NONE = 0
+FORWARD_ACTION = 1
+BACKWARD_ACTION = 2
+TURN_LEFT_ACTION = 4
+TURN_RIGHT_ACTION = 8
+AIM_LEFT_ACTION = 16
+AIM_RIGHT_ACTION = 32
+SHOOT_ACTION = 64
+# 沒有收到任何指令([] 或 None)，與 NONE 不同，玩家不會檢查油量
+NO_COMMAND = 128
+MOVE_MASK = FORWARD_ACTION | BACKWARD_ACTION | TURN_LEFT_ACTION | TURN_RIGHT_ACTION
+AIM_MASK = AIM_LEFT_ACTION | AIM_RIGHT_ACTION
+
+COMMAND_ACTIONS = {"NONE": ACTION_NONE,
+                   FORWARD_CMD: FORWARD_ACTION,
+                   BACKWARD_CMD: BACKWARD_ACTION,
+                   TURN_LEFT_CMD: TURN_LEFT_ACTION,
+                   TURN_RIGHT_CMD: TURN_RIGHT_ACTION,
+                   AIM_LEFT_CMD: AIM_LEFT_ACTION,
+                   AIM_RIGHT_CMD: AIM_RIGHT_ACTION,
+                   SHOOT: SHOOT_ACTION}
+# 依 bit 由低到高
+_ACTION_COMMANDS = [(action, command) for command, action in COMMAND_ACTIONS.items() if action]
+
+
+def encode_commands(commands) -> int:
+    """
+    :param commands: 一位玩家的字串指令 list，只有最後一個指令有效，不認得的指令與 NONE 相同
+    """
+    if not commands:
+        return NO_COMMAND
+    try:
+        return COMMAND_ACTIONS.get(commands[-1], ACTION_NONE)
+    except TypeError:
+        # 不能當作 dict key 的指令(例如 list)
+        return ACTION_NONE
+
+
+def encode_command_dict(commands: dict, player_num: int) -> list:
+    """
+    :param commands: ai 名稱 -> 字串指令 list，沒有的玩家視為沒有指令
+    :return: 依玩家編號排列的 action，第 i 個為 get_ai_name(i)
+    """
+    return [encode_commands(commands.get(get_ai_name(i))) for i in range(player_num)]
+
+
+def decode_action(action: int) -> list:
+    """
+    轉回字串指令 list，只有一個 bit 的 action 可以完全還原
+    :return: 依移動、瞄準、射擊的順序排列
+    """
+    if action & NO_COMMAND:
+        return []
+    commands = [command for bit, command in _ACTION_COMMANDS if action & bit]
+    return commands or ["NONE"]
@@ -3,17 +3,28 @@ import pygame.sprite
 
 from src.Player import Player
 from src.Bullet import Bullet
+from src.BulletStore import BulletStore, BulletView
 from src.Wall import Wall
+from src.game_module.WallGrid import WallGrid
 
 
-def collide_with_walls(group1: pygame.sprite.Group, group2: pygame.sprite.Group):
-    hits = pygame.sprite.groupcollide(group1, group2, False, False, pygame.sprite.collide_rect_ratio(0.8))
+def collide_with_walls(group1: pygame.sprite.Group, group2: pygame.sprite.Group or WallGrid):
+    if isinstance(group2, WallGrid):
+        hits = group2.collide_sprites(group1)
+    else:
+        hits = pygame.sprite.groupcollide(group1, group2, False, False, pygame.sprite.collide_rect_ratio(0.8))
     for sprite, walls in hits.items():
         sprite.collide_with_walls()
 
 
-def collide_with_bullets(group1: pygame.sprite.Group, group2: pygame.sprite.Group, green_team_num: Optional[int] = None):
-    hits = pygame.sprite.groupcollide(group1, group2, False, False, pygame.sprite.collide_rect_ratio(0.8))
+def collide_with_bullets(group1: pygame.sprite.Group or WallGrid, group2: pygame.sprite.Group or BulletStore,
+                         green_team_num: Optional[int] = None):
+    if isinstance(group1, WallGrid):
+        hits = group1.collide_walls(group2)
+    elif isinstance(group2, BulletStore):
+        hits = group2.collide_sprites(group1)
+    else:
+        hits = pygame.sprite.groupcollide(group1, group2, False, False, pygame.sprite.collide_rect_ratio(0.8))
     player_score_data = {}
     for sprite, bullets in hits.items():
         for bullet in bullets:
@@ -42,15 +53,18 @@ def collide_with_bullets(group1: pygame.sprite.Group, group2: pygame.sprite.Grou
     return player_score_data
 
 
-def collide_with_supply_stations(sprites: pygame.sprite.Group, supply_stations: pygame.sprite.Group):
-    hits = pygame.sprite.groupcollide(sprites, supply_stations, False, False, pygame.sprite.collide_rect_ratio(0.8))
+def collide_with_supply_stations(sprites: pygame.sprite.Group or BulletStore, supply_stations: pygame.sprite.Group):
+    if isinstance(sprites, BulletStore):
+        hits = sprites.collide_group(supply_stations)
+    else:
+        hits = pygame.sprite.groupcollide(sprites, supply_stations, False, False, pygame.sprite.collide_rect_ratio(0.8))
     for sprite, supply_station in hits.items():
         if isinstance(sprite, Player):
             if supply_station[0].id == 5:
                 sprite.get_oil(supply_station[0].power)
             else:
                 sprite.get_power(supply_station[0].power)
-        elif isinstance(sprite, Bullet):
+        elif isinstance(sprite, (Bullet, BulletView)):
             sprite.kill()
 
         supply_station[0].collect()
@@ -0,0 +1,74 @@
+import json
+import time
+from bisect import bisect_right
+from collections import deque
+
+# 直方圖的邊界（毫秒），最後一格為超過 100 ms
+HISTOGRAM_EDGES_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100)
+
+
+class FrameProfiler:
+    """
+    記錄每個 frame 中各階段花費的時間，只保留最近 window 筆，可匯出成每個階段的直方圖
+    不使用時 TeamBattleMode 等物件的 profiler 為 None，只多一次判斷
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        :param window: 每個階段保留最近幾筆時間
+        """
+        self.window = window
+        self.clock = time.perf_counter
+        # phase -> 最近的時間（秒）
+        self.samples = {}
+        # phase -> [總筆數, 總時間（秒）]
+        self.totals = {}
+        self.lap_start = 0.0
+
+    def add(self, phase: str, seconds: float):
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque(maxlen=self.window)
+            self.totals[phase] = [0, 0.0]
+        samples.append(seconds)
+        total = self.totals[phase]
+        total[0] += 1
+        total[1] += seconds
+
+    def start_lap(self):
+        self.lap_start = self.clock()
+
+    def lap(self, phase: str):
+        """記錄從上一次 start_lap() 或 lap() 到現在的時間"""
+        now = self.clock()
+        self.add(phase, now - self.lap_start)
+        self.lap_start = now
+
+    def get_histogram(self, phase: str) -> dict:
+        samples = sorted(self.samples[phase])
+        counts = [0] * (len(HISTOGRAM_EDGES_MS) + 1)
+        for seconds in samples:
+            counts[bisect_right(HISTOGRAM_EDGES_MS, seconds * 1000)] += 1
+        count, total_seconds = self.totals[phase]
+        return {"count": count,
+                "total_ms": total_seconds * 1000,
+                "window": len(samples),
+                "mean_ms": sum(samples) * 1000 / len(samples),
+                "p50_ms": samples[len(samples) // 2] * 1000,
+                "p95_ms": samples[min(len(samples) - 1, len(samples) * 95 // 100)] * 1000,
+                "max_ms": samples[-1] * 1000,
+                "edges_ms": list(HISTOGRAM_EDGES_MS),
+                "counts": counts}
+
+    def export(self) -> dict:
+        """phase -> get_histogram(phase)，依最近的平均時間由大到小排列"""
+        histograms = {phase: self.get_histogram(phase) for phase in self.samples if self.samples[phase]}
+        return dict(sorted(histograms.items(), key=lambda item: -item[1]["mean_ms"]))
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.export(), f, indent=2)
+
+    def clear(self):
+        self.samples = {}
+        self.totals = {}
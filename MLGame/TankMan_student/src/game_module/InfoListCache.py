@@ -0,0 +1,31 @@
+class InfoListCache:
+    """
+    快取一組 sprite 的 get_data_from_obj_to_game() 結果
+    狀態沒變的 sprite 沿用上次的 dict，全部都沒變時沿用整個 list
+    有變動時一律產生新的 list，不會修改已經交給玩家的舊資料
+    """
+
+    def __init__(self, get_state):
+        """
+        :param get_state: sprite -> 可比較的狀態，狀態改變時才重新產生該 sprite 的 dict
+        """
+        self.get_state = get_state
+        # sprite -> (state, info)
+        self.info_dict = {}
+        self.info_list = None
+
+    def get(self, sprites) -> list:
+        is_changed = self.info_list is None
+        info_dict = {}
+        for sprite in sprites:
+            state = self.get_state(sprite)
+            cached = self.info_dict.get(sprite)
+            if cached is None or cached[0] != state:
+                cached = (state, sprite.get_data_from_obj_to_game())
+                is_changed = True
+            info_dict[sprite] = cached
+        if not is_changed and len(info_dict) == len(self.info_dict):
+            return self.info_list
+        self.info_dict = info_dict
+        self.info_list = [info for _, info in info_dict.values()]
+        return self.info_list
@@ -0,0 +1,239 @@
+from collections import deque
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from .geometry import DIRECTIONS
+
+# 與 DIRECTIONS 相同順序的格子位移
+DIRECTION_OFFSETS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+# CompiledMap -> {blocked_img_ids: 地圖原始狀態的 NavigationGrid}
+_navigation_cache = WeakKeyDictionary()
+
+
+class NavigationGrid:
+    """
+    以地圖 tile 為格子的導航資料，坦克與 tile 一樣大，一格即一台坦克的位置
+    可 8 方向移動，斜走時兩側的格子都要是空的（不能切牆角）
+    到某個目標的 BFS 距離與下一步方向第一次查詢時建立，之後每次查詢都是 O(1)
+    牆壁被打掉時以 set_free() 就地更新已建立的距離，不需整張重算
+    """
+
+    def __init__(self, width: int, height: int, tile_width: int, tile_height: int, blocked_cells):
+        """
+        :param blocked_cells: 不能通行的格子 (cell_x, cell_y)
+        """
+        self.width = width
+        self.height = height
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.is_free = [True] * (width * height)
+        for cell_x, cell_y in blocked_cells:
+            self.is_free[cell_y * width + cell_x] = False
+        # index -> ((direction_index, neighbor_index), ...)，只包含地圖內的鄰格
+        self.neighbors = []
+        for index in range(width * height):
+            cell_x, cell_y = index % width, index // width
+            self.neighbors.append(tuple((direction_index, (cell_y + dy) * width + cell_x + dx)
+                                        for direction_index, (dx, dy) in enumerate(DIRECTION_OFFSETS)
+                                        if 0 <= cell_x + dx < width and 0 <= cell_y + dy < height))
+        # target index -> 每格到目標的步數，-1 代表到不了
+        self.distance_fields = {}
+        # target index -> 每格往目標的下一步 DIRECTIONS index，-1 代表沒有
+        self.next_step_tables = {}
+        # index -> 最近的可通行格 index
+        self.nearest_free_table = None
+        # 格子與 base 相同時，新建立的表也存到 base，給之後的 copy() 使用
+        self.base = None
+
+    @classmethod
+    def from_compiled_map(cls, compiled_map, blocked_img_ids: tuple):
+        """
+        同一張地圖只建立一次，回傳的是各自獨立的 copy()，reset 後仍可沿用已算好的距離
+        :param blocked_img_ids: 不能通行的 img_id，例如 (WALL_IMG_NO,)
+        """
+        base_dict = _navigation_cache.setdefault(compiled_map, {})
+        base = base_dict.get(blocked_img_ids)
+        if base is None:
+            blocked_cells = [(cell_x, cell_y)
+                             for cell_y, row in enumerate(compiled_map.tile_grid)
+                             for cell_x, img_id in enumerate(row) if img_id in blocked_img_ids]
+            base = cls(compiled_map.width, compiled_map.height, compiled_map.tile_width, compiled_map.tile_height,
+                       blocked_cells)
+            base_dict[blocked_img_ids] = base
+        return base.copy()
+
+    @classmethod
+    def from_walls_info(cls, walls_info: list, map_width: int, map_height: int, tile_width: int, tile_height: int):
+        """給 AI 使用，由 scene_info["walls_info"] 建立"""
+        blocked_cells = [(wall["x"] // tile_width, wall["y"] // tile_height) for wall in walls_info]
+        return cls(map_width // tile_width, map_height // tile_height, tile_width, tile_height, blocked_cells)
+
+    def copy(self):
+        """共用已經建立的距離資料，之後各自更新"""
+        navigation = NavigationGrid.__new__(NavigationGrid)
+        navigation.__dict__.update(self.__dict__)
+        navigation.is_free = list(self.is_free)
+        navigation.distance_fields = dict(self.distance_fields)
+        navigation.next_step_tables = dict(self.next_step_tables)
+        navigation.base = self
+        return navigation
+
+    def __getstate__(self):
+        """只保存格子狀態，距離表在之後查詢時重新建立"""
+        state = self.__dict__.copy()
+        state.update(distance_fields={}, next_step_tables={}, nearest_free_table=None, base=None)
+        return state
+
+    def get_cell(self, pos: tuple) -> tuple:
+        """pixel 座標轉成格子"""
+        return pos[0] // self.tile_width, pos[1] // self.tile_height
+
+    def _get_index(self, cell: tuple):
+        cell_x, cell_y = cell
+        if 0 <= cell_x < self.width and 0 <= cell_y < self.height:
+            return cell_y * self.width + cell_x
+        return None
+
+    def is_free_cell(self, cell: tuple) -> bool:
+        index = self._get_index(cell)
+        return index is not None and self.is_free[index]
+
+    def _can_move(self, index: int, direction_index: int, neighbor_index: int) -> bool:
+        if not self.is_free[neighbor_index]:
+            return False
+        if direction_index % 2:
+            # 斜走時經過的兩個格子
+            dx, dy = DIRECTION_OFFSETS[direction_index]
+            return self.is_free[index + dx] and self.is_free[index + dy * self.width]
+        return True
+
+    def _get_distance_field(self, target_index: int) -> list:
+        field = self.distance_fields.get(target_index)
+        if field is not None:
+            return field
+        field = [-1] * (self.width * self.height)
+        if self.is_free[target_index]:
+            field[target_index] = 0
+            queue = deque([target_index])
+            while queue:
+                index = queue.popleft()
+                distance = field[index] + 1
+                for direction_index, neighbor_index in self.neighbors[index]:
+                    if field[neighbor_index] == -1 and self._can_move(index, direction_index, neighbor_index):
+                        field[neighbor_index] = distance
+                        queue.append(neighbor_index)
+        self.distance_fields[target_index] = field
+        if self.base is not None:
+            self.base.distance_fields.setdefault(target_index, field)
+        return field
+
+    def _get_next_step_table(self, target_index: int) -> list:
+        table = self.next_step_tables.get(target_index)
+        if table is not None:
+            return table
+        field = self._get_distance_field(target_index)
+        table = [-1] * (self.width * self.height)
+        for index, distance in enumerate(field):
+            if distance <= 0:
+                continue
+            for direction_index, neighbor_index in self.neighbors[index]:
+                if field[neighbor_index] == distance - 1 and self._can_move(index, direction_index, neighbor_index):
+                    table[index] = direction_index
+                    break
+        self.next_step_tables[target_index] = table
+        if self.base is not None:
+            self.base.next_step_tables.setdefault(target_index, table)
+        return table
+
+    def get_distance(self, cell: tuple, target_cell: tuple) -> int:
+        """最少要走幾格，到不了時回傳 -1"""
+        index = self._get_index(cell)
+        target_index = self._get_index(target_cell)
+        if index is None or target_index is None:
+            return -1
+        return self._get_distance_field(target_index)[index]
+
+    def get_distance_field(self, target_cell: tuple) -> np.ndarray:
+        """shape 為 (height, width) 的步數表，-1 代表到不了"""
+        field = self._get_distance_field(self._get_index(target_cell))
+        return np.array(field, dtype=np.int32).reshape(self.height, self.width)
+
+    def get_next_direction(self, cell: tuple, target_cell: tuple):
+        """
+        往目標最短路徑的下一步，為 DIRECTIONS 中的方向名稱
+        已在目標上或到不了時回傳 None
+        """
+        index = self._get_index(cell)
+        target_index = self._get_index(target_cell)
+        if index is None or target_index is None:
+            return None
+        direction_index = self._get_next_step_table(target_index)[index]
+        return DIRECTIONS[direction_index] if direction_index >= 0 else None
+
+    def get_nearest_free_cell(self, cell: tuple):
+        """最近的可通行格子（以 8 方向步數計），整張地圖都不能通行時回傳 None"""
+        index = self._get_index(cell)
+        if index is None:
+            cell_x = min(max(cell[0], 0), self.width - 1)
+            cell_y = min(max(cell[1], 0), self.height - 1)
+            index = cell_y * self.width + cell_x
+        if self.nearest_free_table is None:
+            self.nearest_free_table = self._create_nearest_free_table()
+        nearest_index = self.nearest_free_table[index]
+        if nearest_index < 0:
+            return None
+        return nearest_index % self.width, nearest_index // self.width
+
+    def _create_nearest_free_table(self) -> list:
+        table = [-1] * (self.width * self.height)
+        queue = deque()
+        for index, is_free in enumerate(self.is_free):
+            if is_free:
+                table[index] = index
+                queue.append(index)
+        while queue:
+            index = queue.popleft()
+            for _, neighbor_index in self.neighbors[index]:
+                if table[neighbor_index] == -1:
+                    table[neighbor_index] = table[index]
+                    queue.append(neighbor_index)
+        return table
+
+    def set_free(self, cell: tuple):
+        """
+        牆壁被打掉後呼叫，格子只會由不能通行變成可通行，距離只會變短
+        從這格與周圍的格子開始往外更新已建立的距離表，其他部分維持不變
+        """
+        index = self._get_index(cell)
+        if index is None or self.is_free[index]:
+            return
+        self.is_free[index] = True
+        self.base = None
+        # 這格與周圍的格子之間多了可以走（含斜走）的路線
+        seeds = [index] + [neighbor_index for _, neighbor_index in self.neighbors[index]
+                           if self.is_free[neighbor_index]]
+        for target_index, field in self.distance_fields.items():
+            # 其他 NavigationGrid.copy() 可能共用同一份，更新時另外複製
+            field = list(field)
+            self._relax(field, target_index, seeds)
+            self.distance_fields[target_index] = field
+        self.next_step_tables = {}
+        self.nearest_free_table = None
+
+    def _relax(self, field: list, target_index: int, seeds: list):
+        queue = deque(seeds)
+        while queue:
+            index = queue.popleft()
+            if not self.is_free[index]:
+                continue
+            best = 0 if index == target_index else -1
+            for direction_index, neighbor_index in self.neighbors[index]:
+                distance = field[neighbor_index]
+                if distance >= 0 and (best == -1 or distance + 1 < best) \
+                        and self._can_move(index, direction_index, neighbor_index):
+                    best = distance + 1
+            if best >= 0 and (field[index] == -1 or best < field[index]):
+                field[index] = best
+                queue.extend(neighbor_index for _, neighbor_index in self.neighbors[index])
@@ -0,0 +1,59 @@
+class PositionPool:
+    """
+    可放置物件的空位置集合，加入、移除與隨機取出都是 O(1)
+    取出時把最後一個位置搬到被取出的位置（swap-remove），位置的順序不固定
+    """
+    # 隨機抽到不能用的位置時，最多再抽幾次才改成逐一檢查
+    MAX_RANDOM_TRIES = 8
+
+    def __init__(self, positions=()):
+        self.positions = []
+        # pos -> positions 中的 index
+        self.index_dict = {}
+        for pos in positions:
+            self.add(pos)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def __contains__(self, pos):
+        return pos in self.index_dict
+
+    def add(self, pos: tuple):
+        """已經在集合中的位置不會重複加入"""
+        if pos in self.index_dict:
+            return
+        self.index_dict[pos] = len(self.positions)
+        self.positions.append(pos)
+
+    def remove(self, pos: tuple):
+        self._pop_index(self.index_dict[pos])
+
+    def _pop_index(self, index: int) -> tuple:
+        pos = self.positions[index]
+        last_pos = self.positions.pop()
+        if index < len(self.positions):
+            self.positions[index] = last_pos
+            self.index_dict[last_pos] = index
+        del self.index_dict[pos]
+        return pos
+
+    def pop_random(self, rng, is_blocked=None) -> tuple:
+        """
+        隨機取出一個位置
+        :param rng: random.Random 或 random 模組
+        :param is_blocked: pos -> bool，True 的位置（例如有坦克在上面）不會被選到，全部都不能用時忽略
+        """
+        if is_blocked is None:
+            return self._pop_index(rng.randrange(len(self.positions)))
+        for _ in range(self.MAX_RANDOM_TRIES):
+            index = rng.randrange(len(self.positions))
+            if not is_blocked(self.positions[index]):
+                return self._pop_index(index)
+        candidates = [index for index, pos in enumerate(self.positions) if not is_blocked(pos)]
+        if candidates:
+            return self._pop_index(rng.choice(candidates))
+        return self._pop_index(rng.randrange(len(self.positions)))
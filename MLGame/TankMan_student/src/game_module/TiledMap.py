@@ -1,5 +1,9 @@
+from os import path, stat
+
 import pytmx
 
+from .PositionPool import PositionPool
+
 
 def create_construction(_id: int or str, _no: int, _init_pos: tuple, _init_size: tuple):
     return {
@@ -10,21 +14,113 @@ def create_construction(_id: int or str, _no: int, _init_pos: tuple, _init_size:
     }
 
 
+class CompiledMap:
+    """
+    解析後的地圖快照，只保存 tile 網格與位置表，不持有任何遊戲物件
+    同一份快照可重複用來建立新的 TiledMap，不需再讀檔或經過 pytmx
+    """
+
+    def __init__(self, tile_width: int, tile_height: int, width: int, height: int, tile_list: tuple):
+        """
+        :param tile_list: 依 pytmx 走訪順序排列的 (pos, img_id)，img_id 為 0 代表空格
+        """
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.width = width
+        self.height = height
+        self.map_width = tile_width * width
+        self.map_height = tile_height * height
+        self.tile_list = tile_list
+        grid = [[0] * width for _ in range(height)]
+        for pos, img_id in tile_list:
+            if img_id:
+                grid[pos[1] // tile_height][pos[0] // tile_width] = img_id
+        self.tile_grid = tuple(tuple(row) for row in grid)
+        self.all_pos_list = tuple(pos for pos, _ in tile_list)
+        empty_quadrant_pos_dict = {1: [], 2: [], 3: [], 4: []}
+        for pos, img_id in tile_list:
+            if img_id:
+                continue
+            if pos[0] >= self.map_width // 2 and pos[1] < self.map_height // 2:
+                empty_quadrant_pos_dict[1].append(pos)
+            elif pos[0] < self.map_width // 2 and pos[1] < self.map_height // 2:
+                empty_quadrant_pos_dict[2].append(pos)
+            elif pos[0] < self.map_width // 2 and pos[1] >= self.map_height // 2:
+                empty_quadrant_pos_dict[3].append(pos)
+            else:
+                empty_quadrant_pos_dict[4].append(pos)
+        self.empty_quadrant_pos_dict = {quadrant: tuple(pos_list)
+                                        for quadrant, pos_list in empty_quadrant_pos_dict.items()}
+        self.empty_pos_list = tuple(pos for pos, img_id in tile_list if not img_id)
+
+    @classmethod
+    def from_grid(cls, grid, tile_width: int, tile_height: int):
+        """
+        由 tile 網格建立，不需要 .tmx 檔
+        :param grid: grid[y][x] 為 img_id 的二維 list 或 NumPy 陣列，0 代表空格
+        """
+        rows = grid.tolist() if hasattr(grid, "tolist") else grid
+        # 與 pytmx 相同的走訪順序，逐列由左到右
+        tile_list = tuple(((x * tile_width, y * tile_height), img_id)
+                          for y, row in enumerate(rows) for x, img_id in enumerate(row))
+        return cls(tile_width, tile_height, len(rows[0]), len(rows), tile_list)
+
+
+# 以 (絕對路徑, mtime) 為 key 的地圖快照，整個 process 共用
+_compiled_map_cache = {}
+
+
+def compile_tmx(filepath: str) -> CompiledMap:
+    tm = pytmx.TiledMap(filepath)
+    tile_list = []
+    for layer in tm.visible_layers:
+        if not isinstance(layer, pytmx.TiledTileLayer):
+            continue
+        for x, y, gid, in layer:
+            pos = (x * tm.tilewidth, y * tm.tileheight)
+            tile_list.append((pos, tm.tiledgidmap[gid] if gid else 0))
+    return CompiledMap(tm.tilewidth, tm.tileheight, tm.width, tm.height, tuple(tile_list))
+
+
+def load_compiled_map(filepath: str) -> CompiledMap:
+    filepath = path.abspath(filepath)
+    key = (filepath, stat(filepath).st_mtime_ns)
+    compiled_map = _compiled_map_cache.get(key)
+    if compiled_map is None:
+        compiled_map = compile_tmx(filepath)
+        # 檔案更新後舊的快照不會再被用到
+        for old_key in [old_key for old_key in _compiled_map_cache if old_key[0] == filepath]:
+            del _compiled_map_cache[old_key]
+        _compiled_map_cache[key] = compiled_map
+    return compiled_map
+
+
+def clear_compiled_map_cache():
+    _compiled_map_cache.clear()
+
+
 # Map 讀取地圖資料
 class TiledMap:
-    def __init__(self, filepath: str):
-        tm = pytmx.TiledMap(filepath)
-        self.tile_width = tm.tilewidth
-        self.tile_height = tm.tileheight
-        self.width = tm.width
-        self.height = tm.height
-        self.map_width = self.tile_width * self.width
-        self.map_height = self.tile_height * self.height
-        self.tmx_data = tm
-        self._is_record = False
-        self.all_pos_list = []
-        self.empty_pos_list = []
-        self.empty_quadrant_pos_dict = {1: [], 2: [], 3: [], 4: []}
+    def __init__(self, filepath: str = None, compiled_map: CompiledMap = None):
+        """
+        :param filepath: tmx 檔路徑，會經過快取，同一檔案只解析一次
+        :param compiled_map: 直接使用已解析好的快照，不會碰到檔案系統
+        """
+        if compiled_map is None:
+            compiled_map = load_compiled_map(filepath)
+        self.compiled_map = compiled_map
+        self.tile_width = compiled_map.tile_width
+        self.tile_height = compiled_map.tile_height
+        self.width = compiled_map.width
+        self.height = compiled_map.height
+        self.map_width = compiled_map.map_width
+        self.map_height = compiled_map.map_height
+        self.tile_grid = compiled_map.tile_grid
+        self.all_pos_list = list(compiled_map.all_pos_list)
+        self.empty_pos_list = list(compiled_map.empty_pos_list)
+        # 遊戲中會被修改，每個 TiledMap 各自一份
+        self.empty_quadrant_pos_dict = {quadrant: PositionPool(pos_list)
+                                        for quadrant, pos_list in compiled_map.empty_quadrant_pos_dict.items()}
         self.all_obj_data_dict = {}
         # TODO refactor
         self.all_obj = {}
@@ -39,30 +135,14 @@ class TiledMap:
 
     def create_init_obj_dict(self) -> dict:
         obj_no = 0
-        for layer in self.tmx_data.visible_layers:
-            for x, y, gid, in layer:
-                if isinstance(layer, pytmx.TiledTileLayer):
-                    pos = (x * self.tile_width, y * self.tile_height)
-                    if not self._is_record:
-                        self.all_pos_list.append(pos)
-                    if not self._is_record and not gid:  # 0代表空格，無圖塊
-                        self.empty_pos_list.append(pos)
-                        if pos[0] >= self.map_width // 2 and pos[1] < self.map_height // 2:
-                            self.empty_quadrant_pos_dict[1].append(pos)
-                        elif pos[0] < self.map_width // 2 and pos[1] < self.map_height // 2:
-                            self.empty_quadrant_pos_dict[2].append(pos)
-                        elif pos[0] < self.map_width // 2 and pos[1] >= self.map_height // 2:
-                            self.empty_quadrant_pos_dict[3].append(pos)
-                        else:
-                            self.empty_quadrant_pos_dict[4].append(pos)
-                    elif gid:
-                        img_id = layer.parent.tiledgidmap[gid]
-                        kwargs = self.all_obj_data_dict[img_id]["kwargs"]
-                        obj_no += 1
-                        img_info = {"_id": img_id, "_no": obj_no
-                            , "_init_pos": pos
-                            , "_init_size": (self.tile_width, self.tile_height)
-                                    }
-                        self.all_obj[img_id].append(self.all_obj_data_dict[img_id]["cls"](img_info, **kwargs))
-        self._is_record = True
+        for pos, img_id in self.compiled_map.tile_list:
+            if not img_id:  # 0代表空格，無圖塊
+                continue
+            kwargs = self.all_obj_data_dict[img_id]["kwargs"]
+            obj_no += 1
+            img_info = {"_id": img_id, "_no": obj_no
+                , "_init_pos": pos
+                , "_init_size": (self.tile_width, self.tile_height)
+                        }
+            self.all_obj[img_id].append(self.all_obj_data_dict[img_id]["cls"](img_info, **kwargs))
         return self.all_obj
@@ -0,0 +1,81 @@
+import pygame.sprite
+
+from .fuctions import scaled_rect
+
+
+class WallGrid(pygame.sprite.Group):
+    """
+    以地圖 tile 為格子的牆壁空間索引，用法與 pygame.sprite.Group 相同
+    牆壁加入或被 kill() 時會同步更新格子，碰撞時只檢查矩形覆蓋到的格子
+    """
+
+    def __init__(self, cell_width: int, cell_height: int, *sprites):
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        # (cell_x, cell_y) -> [wall, ...]
+        self.cells = {}
+        # wall -> (縮放後的碰撞矩形, 加入順序)
+        self.hit_rects = {}
+        self._order = 0
+        # 被移除的牆壁，由使用者取出後自行清空
+        self.removed_walls = []
+        super().__init__(*sprites)
+
+    def get_cells(self, rect: pygame.Rect):
+        if rect.width <= 0 or rect.height <= 0:
+            return
+        for cell_y in range(rect.top // self.cell_height, (rect.bottom - 1) // self.cell_height + 1):
+            for cell_x in range(rect.left // self.cell_width, (rect.right - 1) // self.cell_width + 1):
+                yield cell_x, cell_y
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.hit_rects[sprite] = (scaled_rect(sprite.rect), self._order)
+        self._order += 1
+        for cell in self.get_cells(sprite.rect):
+            self.cells.setdefault(cell, []).append(sprite)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.removed_walls.append(sprite)
+        del self.hit_rects[sprite]
+        for cell in self.get_cells(sprite.rect):
+            walls = self.cells[cell]
+            walls.remove(sprite)
+            if not walls:
+                del self.cells[cell]
+
+    def collide_rect(self, rect: pygame.Rect) -> list:
+        """回傳與 rect 碰撞的牆壁，判斷方式與 collide_rect_ratio(0.8) 相同"""
+        hit_rect = scaled_rect(rect)
+        hits = []
+        for cell in self.get_cells(hit_rect):
+            for wall in self.cells.get(cell, ()):
+                if wall not in hits and hit_rect.colliderect(self.hit_rects[wall][0]):
+                    hits.append(wall)
+        if len(hits) > 1:
+            hits.sort(key=lambda wall: self.hit_rects[wall][1])
+        return hits
+
+    def collide_sprites(self, sprites) -> dict:
+        """
+        key 為 sprite，value 為碰撞到的牆壁 list，只包含有碰撞的 sprite
+        結果與 pygame.sprite.groupcollide(sprites, walls, ...) 相同
+        """
+        hits = {}
+        for sprite in sprites:
+            walls = self.collide_rect(sprite.rect)
+            if walls:
+                hits[sprite] = walls
+        return hits
+
+    def collide_walls(self, sprites) -> dict:
+        """
+        key 為牆壁，value 為碰撞到的 sprite list
+        結果與 pygame.sprite.groupcollide(walls, sprites, ...) 相同
+        """
+        hits = {}
+        for sprite, walls in self.collide_sprites(sprites).items():
+            for wall in walls:
+                hits.setdefault(wall, []).append(sprite)
+        return dict(sorted(hits.items(), key=lambda item: self.hit_rects[item[0]][1]))
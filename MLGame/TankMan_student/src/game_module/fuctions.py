@@ -1,4 +1,8 @@
 import pygame.sprite
+from mlgame.view.view_model import create_rect_view_data
+
+# 與 pygame.sprite.collide_rect_ratio(0.8) 相同的縮放比例
+COLLIDE_RATIO = 0.8
 
 
 def get_size(sprite: pygame.sprite.Sprite):
@@ -24,3 +28,34 @@ def get_sprites_progress_data(sprites: pygame.sprite.Group):
         if data:
             data_list.append(data)
     return data_list
+
+
+def scaled_rect(rect: pygame.Rect, ratio: float = COLLIDE_RATIO) -> pygame.Rect:
+    """與 pygame.sprite.collide_rect_ratio 內部相同的縮放方式"""
+    return rect.inflate(rect.width * ratio - rect.width, rect.height * ratio - rect.height)
+
+
+def create_bar_data(name: str, segments: list, x: float, rows_y: tuple, row_units: int, unit_width: float,
+                    unit_pitch: float, height: int) -> list:
+    """
+    把一格一格的長條合併成每一列每一段一個矩形，資料數量只與列數和段數有關，與格數無關
+    :param segments: [(格數, 顏色), ...]，依序接在一起
+    :param rows_y: 每一列的 y，填滿一列後換到下一列，超過最後一列的格數不畫出
+    :param row_units: 一列的格數
+    :param unit_width: 一格的寬度
+    :param unit_pitch: 相鄰兩格左邊的距離
+    """
+    data = []
+    row = 0
+    unit = 0
+    for count, color in segments:
+        while count > 0 and row < len(rows_y):
+            num = min(count, row_units - unit)
+            data.append(create_rect_view_data(name, x + unit * unit_pitch, rows_y[row],
+                                              unit_pitch * (num - 1) + unit_width, height, color))
+            count -= num
+            unit += num
+            if unit == row_units:
+                row += 1
+                unit = 0
+    return data
@@ -0,0 +1,57 @@
+import pygame
+
+Vec = pygame.math.Vector2
+
+SQRT2 = 1.414
+# 以 (rot % 360) // 45 為 index，rot 為 0 時往左
+DIRECTIONS = ("left", "left_down", "down", "right_down", "right", "right_up", "up", "left_up")
+
+# size -> 8 個方向旋轉後的外框大小
+_rotated_size_table = {}
+
+
+def get_direction(rot: int) -> str:
+    """坦克前進或子彈飛行時，rot 對應到的移動方向"""
+    return DIRECTIONS[rot % 360 // 45]
+
+
+def get_opposite_direction(rot: int) -> str:
+    return DIRECTIONS[(rot + 180) % 360 // 45]
+
+
+def create_move_dict(speed: float) -> dict:
+    diagonal = speed / SQRT2
+    return {"left_up": Vec(-diagonal, -diagonal),
+            "right_up": Vec(diagonal, -diagonal),
+            "left_down": Vec(-diagonal, diagonal),
+            "right_down": Vec(diagonal, diagonal),
+            "left": Vec(-speed, 0), "right": Vec(speed, 0), "up": Vec(0, -speed),
+            "down": Vec(0, speed)}
+
+
+def create_bullet_move_dict(speed: float) -> dict:
+    """子彈每個 frame 的位移，保留原本 right_down 的數值，x 方向多除了一次 sqrt2"""
+    move_dict = create_move_dict(speed)
+    move_dict["right_down"] = Vec(speed / SQRT2, speed) / SQRT2
+    return move_dict
+
+
+def get_rotated_size(size: tuple, rot: int) -> tuple:
+    """
+    與 pygame.transform.rotate(pygame.Surface(size), rot).get_size() 相同
+    每個 size 只在第一次用到時建立 8 個角度的表，之後不再產生 Surface
+    """
+    if rot % 45:
+        return pygame.transform.rotate(pygame.Surface(size), rot).get_size()
+    table = _rotated_size_table.get(size)
+    if table is None:
+        surface = pygame.Surface(size)
+        table = tuple(pygame.transform.rotate(surface, index * 45).get_size() for index in range(8))
+        _rotated_size_table[size] = table
+    return table[rot % 360 // 45]
+
+
+def get_rotated_rect(size: tuple, rot: int, center: tuple) -> pygame.Rect:
+    rect = pygame.Rect((0, 0), get_rotated_size(size, rot))
+    rect.center = center
+    return rect
@@ -0,0 +1,101 @@
+import numpy as np
+import pygame
+
+from .env import BULLET_SIZE, BULLET_SPEED, BULLET_TRAVEL_DISTANCE
+from .game_module.fuctions import scaled_rect
+from .game_module.geometry import DIRECTIONS, create_bullet_move_dict
+
+# cast_firing_lanes 中 hit_index 的特殊值
+NO_HIT = -1
+WALL_HIT = -2
+
+
+def get_hit_rect_array(rects) -> np.ndarray:
+    """rect list 轉成 shape 為 (n, 4) 的 left, top, right, bottom 陣列，使用碰撞用的縮放矩形"""
+    hit_rects = [scaled_rect(rect) for rect in rects]
+    return np.array([(rect.left, rect.top, rect.right, rect.bottom) for rect in hit_rects],
+                    dtype=np.int64).reshape(-1, 4)
+
+
+def cast_firing_lanes(origins, shooter_nos, wall_mask: np.ndarray, tile_size: tuple, target_rects: np.ndarray,
+                      target_nos, play_rect_area: pygame.Rect, bullet_size: tuple = BULLET_SIZE,
+                      bullet_speed: int = BULLET_SPEED, bullet_travel_distance: int = BULLET_TRAVEL_DISTANCE) -> tuple:
+    """
+    模擬每個射擊點往 8 個方向各射出一顆子彈，一次算出所有方向最先打到的東西
+    子彈逐 frame 的位置與碰撞判斷和 Bullet 相同，但不考慮坦克在子彈飛行中的移動
+    :param origins: shape 為 (P, 2) 的子彈起點，即坦克的 rect.center
+    :param shooter_nos: 每個射擊點的玩家編號，子彈不會打到自己
+    :param wall_mask: shape 為 (地圖高, 地圖寬) 的 bool 陣列，True 代表該 tile 有牆
+    :param tile_size: (tile 寬, tile 高)
+    :param target_rects: get_hit_rect_array 產生的目標矩形，越前面的目標在同一個 frame 越先被打到
+    :param target_nos: 每個目標的玩家編號，不是玩家時為 0
+    :return: (hit_index, frame, position)，shape 分別為 (P, 8)、(P, 8)、(P, 8, 2)
+             方向的順序與 DIRECTIONS 相同，hit_index 為目標的 index、WALL_HIT 或 NO_HIT
+             frame 為子彈第幾個 frame 打到，沒打到時為 0
+    """
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+    shooter_nos = np.asarray(shooter_nos, dtype=np.int64).reshape(-1)
+    target_nos = np.asarray(target_nos, dtype=np.int64).reshape(-1)
+    lane_num = len(origins)
+    move_dict = create_bullet_move_dict(bullet_speed)
+    move_table = np.array([tuple(move_dict[direction]) for direction in DIRECTIONS], dtype=np.float64)
+    max_travel_distance = (bullet_travel_distance // bullet_speed + 1) * bullet_speed
+    bullet_hit_rect = scaled_rect(pygame.Rect((0, 0), bullet_size))
+    half_width, half_height = bullet_size[0] // 2, bullet_size[1] // 2
+    tile_width, tile_height = tile_size
+    wall_hit_rect = scaled_rect(pygame.Rect((0, 0), tile_size))
+    map_height, map_width = wall_mask.shape
+    # 子彈不會打到發射的玩家
+    can_hit = target_nos[None, :] != shooter_nos[:, None]
+
+    # 每個 frame 移動後的位置，shape 為 (frame 數, P, 8)，位置要逐 frame 四捨五入
+    frame_num = (max_travel_distance - 1) // bullet_speed
+    x = np.repeat(origins[:, 0:1], len(DIRECTIONS), axis=1)
+    y = np.repeat(origins[:, 1:2], len(DIRECTIONS), axis=1)
+    x_list, y_list, is_in_list = [], [], []
+    for _ in range(frame_num):
+        # 出界的子彈在下一次移動時消失
+        is_in_list.append((play_rect_area.top < y) & (y < play_rect_area.bottom)
+                          & (play_rect_area.left < x) & (x < play_rect_area.right))
+        x = np.floor(x + move_table[:, 0] + 0.5)
+        y = np.floor(y + move_table[:, 1] + 0.5)
+        x_list.append(x)
+        y_list.append(y)
+    x = np.array(x_list, dtype=np.int64)
+    y = np.array(y_list, dtype=np.int64)
+    is_flying = np.logical_and.accumulate(np.array(is_in_list), axis=0)
+    left = x - half_width + bullet_hit_rect.x
+    top = y - half_height + bullet_hit_rect.y
+    right = left + bullet_hit_rect.width
+    bottom = top + bullet_hit_rect.height
+
+    # 玩家與補給站
+    is_target_hit = (left[..., None] < target_rects[:, 2]) & (right[..., None] > target_rects[:, 0]) \
+        & (top[..., None] < target_rects[:, 3]) & (bottom[..., None] > target_rects[:, 1]) & can_hit[:, None, :]
+    has_target_hit = is_target_hit.any(axis=3)
+
+    # 牆壁，子彈的碰撞矩形比 tile 小，最多跨 2 x 2 個 tile
+    is_wall_hit = np.zeros_like(is_flying)
+    for cell_x in (left // tile_width, left // tile_width + 1):
+        for cell_y in (top // tile_height, top // tile_height + 1):
+            is_in_map = (0 <= cell_x) & (cell_x < map_width) & (0 <= cell_y) & (cell_y < map_height)
+            has_wall = np.zeros_like(is_in_map)
+            has_wall[is_in_map] = wall_mask[cell_y[is_in_map], cell_x[is_in_map]]
+            wall_left = cell_x * tile_width + wall_hit_rect.x
+            wall_top = cell_y * tile_height + wall_hit_rect.y
+            is_wall_hit |= has_wall & (left < wall_left + wall_hit_rect.width) & (right > wall_left) \
+                & (top < wall_top + wall_hit_rect.height) & (bottom > wall_top)
+
+    # 每條射線第一個打到東西的 frame，同一個 frame 中先判斷玩家與補給站，再判斷牆壁
+    is_hit = is_flying & (has_target_hit | is_wall_hit)
+    has_hit = is_hit.any(axis=0)
+    first_frame = is_hit.argmax(axis=0)
+    lane_index = np.arange(lane_num)[:, None]
+    direction_index = np.arange(len(DIRECTIONS))[None, :]
+    first_target = is_target_hit[first_frame, lane_index, direction_index].argmax(axis=-1)
+    is_target_first = has_target_hit[first_frame, lane_index, direction_index]
+    hit_index = np.where(has_hit, np.where(is_target_first, first_target, WALL_HIT), NO_HIT)
+    hit_frame = np.where(has_hit, first_frame + 1, 0)
+    hit_position = np.stack([x[first_frame, lane_index, direction_index],
+                             y[first_frame, lane_index, direction_index]], axis=-1)
+    return hit_index, hit_frame, hit_position
@@ -0,0 +1,29 @@
+import random
+
+import pygame
+from mlgame.game.paia_game import GameStatus
+from mlgame.utils.enum import get_ai_name
+
+from src.TeamBattleMode import TeamBattleMode
+
+
+def create_mode(green_team_num=1, blue_team_num=1, frame_limit=100, **kwargs):
+    return TeamBattleMode(green_team_num, blue_team_num, False, frame_limit, "", pygame.Rect(0, 0, 1000, 600), **kwargs)
+
+
+def play_random_game(mode: TeamBattleMode, seed: int, on_update=None) -> list:
+    """
+    以固定的亂數指令玩完一場，回傳每個 frame 給玩家的資料
+    :param on_update: 每次 update 之後呼叫 on_update(mode, commands)，commands 為該 frame 的指令
+    """
+    rng = random.Random(seed)
+    commands = ["NONE", "FORWARD", "BACKWARD", "TURN_LEFT", "TURN_RIGHT", "AIM_LEFT", "AIM_RIGHT", "SHOOT"]
+    history = []
+    while mode.status == GameStatus.GAME_ALIVE:
+        history.append(mode.get_ai_data_to_player())
+        frame_commands = {get_ai_name(i): [rng.choice(commands)]
+                          for i in range(mode.green_team_num + mode.blue_team_num)}
+        mode.update(frame_commands)
+        if on_update:
+            on_update(mode, frame_commands)
+    return history
@@ -0,0 +1,43 @@
+from src.action import ACTION_NONE, AIM_LEFT_ACTION, FORWARD_ACTION, NO_COMMAND, SHOOT_ACTION, decode_action, \
+    encode_command_dict, encode_commands
+from test.conftest import create_mode, play_random_game
+
+
+class TestAction(object):
+    def test_encode_commands(self):
+        # 只有最後一個指令有效，不認得的指令與 NONE 效果相同
+        assert encode_commands(["FORWARD", "SHOOT"]) == SHOOT_ACTION
+        assert encode_commands(["AIM_LEFT"]) == AIM_LEFT_ACTION
+        assert encode_commands(["RESET"]) == ACTION_NONE
+        assert encode_commands([["SHOOT"]]) == ACTION_NONE
+        assert encode_commands([]) == NO_COMMAND
+        assert encode_commands(None) == NO_COMMAND
+        assert encode_command_dict({"1P": ["FORWARD"], "3P": ["SHOOT"]}, 3) == [FORWARD_ACTION, NO_COMMAND,
+                                                                               SHOOT_ACTION]
+
+    def test_decode_action(self):
+        for command in ("NONE", "FORWARD", "BACKWARD", "TURN_LEFT", "TURN_RIGHT", "AIM_LEFT", "AIM_RIGHT", "SHOOT"):
+            assert decode_action(encode_commands([command])) == [command]
+        assert decode_action(NO_COMMAND) == []
+        assert decode_action(FORWARD_ACTION | AIM_LEFT_ACTION | SHOOT_ACTION) == ["FORWARD", "AIM_LEFT", "SHOOT"]
+
+    def test_actions_same_as_commands(self):
+        frame_commands = []
+        command_history = play_random_game(create_mode(3, 3, 300, headless=True, seed=4), 6,
+                                           lambda mode, commands: frame_commands.append(commands))
+        # 同樣的指令先轉成 action 再傳入
+        mode = create_mode(3, 3, 300, headless=True, seed=4)
+        action_history = []
+        for commands in frame_commands:
+            action_history.append(mode.get_ai_data_to_player())
+            mode.update(tuple(encode_command_dict(commands, 6)))
+        assert action_history == command_history
+
+    def test_multiple_lanes_in_one_frame(self):
+        mode = create_mode(1, 1, 100, headless=True, seed=2)
+        player = next(iter(mode.players_a))
+        x, y, power, gun_rot = player.rect.x, player.rect.y, player.power, player.gun.rot
+        mode.update([FORWARD_ACTION | AIM_LEFT_ACTION | SHOOT_ACTION, ACTION_NONE])
+        assert player.power == power - 1
+        assert player.gun.rot != gun_rot
+        assert (player.rect.x, player.rect.y) != (x, y)
@@ -0,0 +1,42 @@
+from mlgame.utils.enum import get_ai_name
+
+from src.Game import Game
+from src.game_module.FrameProfiler import FrameProfiler
+from test.conftest import create_mode, play_random_game
+
+UPDATE_PHASES = {"check_collisions", "walls.update", "create_bullet", "bullets.update", "stations.update",
+                 "all_players.update"}
+
+
+class TestFrameProfiler(object):
+    def test_rolling_histogram(self):
+        profiler = FrameProfiler(window=3)
+        for ms in (0.005, 0.3, 3, 30):
+            profiler.add("phase", ms / 1000)
+        histogram = profiler.get_histogram("phase")
+        # 總數包含所有紀錄，直方圖只包含最近 window 筆
+        assert histogram["count"] == 4
+        assert histogram["window"] == 3 and sum(histogram["counts"]) == 3
+        assert histogram["counts"][0] == 0
+        assert histogram["max_ms"] == 30
+
+    def test_game_phases(self):
+        profiler = FrameProfiler()
+        game = Game(2, 1, 1, "", 50, "off", headless=True, profiler=profiler)
+        frame_num = 0
+        while game.is_running():
+            game.get_data_from_game_to_player()
+            game.update({get_ai_name(i): ["SHOOT"] for i in range(2)})
+            frame_num += 1
+        histograms = profiler.export()
+        assert UPDATE_PHASES | {"get_ai_data_to_player", "game_mode.update"} == set(histograms)
+        assert all(histogram["count"] == frame_num for histogram in histograms.values())
+        # reset 後繼續記錄
+        game.reset()
+        game.update({get_ai_name(i): ["SHOOT"] for i in range(2)})
+        assert profiler.get_histogram("check_collisions")["count"] == frame_num + 1
+
+    def test_same_game_with_profiler(self):
+        history = play_random_game(create_mode(3, 3, 200, headless=True, seed=1), 2)
+        profiled_history = play_random_game(create_mode(3, 3, 200, headless=True, seed=1, profiler=FrameProfiler()), 2)
+        assert history == profiled_history
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from mlgame.game.paia_game import GameStatus
+from mlgame.utils.enum import get_ai_name
+
+from src.Game import Game
+from src.GenerateMap import MapGenerator
+from src.game_module.TiledMap import compile_tmx
+import src.GenerateMap as generate_map_module
+
+
+class TestMapGenerator(object):
+    def test_batch_maps_are_valid_and_symmetric(self):
+        generator = MapGenerator(3, 2, 20, 12)
+        grids = generator.generate_map_grids(500, seed=1)
+        assert grids.shape == (500, 12, 20)
+        for grid in grids:
+            counts = {img_no: int((grid == img_no).sum()) for img_no in range(6)}
+            assert counts[1] == 3 and counts[2] == 2 and counts[4] == 4 and counts[5] == 4
+            # 綠隊在右半邊，藍隊在左半邊
+            assert (np.nonzero(grid == 1)[1] >= 10).all()
+            assert (np.nonzero(grid == 2)[1] < 10).all()
+            # 牆壁與補給站左右上下對稱
+            for img_no in (3, 4, 5):
+                assert ((grid == img_no) == (grid == img_no)[::-1, ::-1]).all()
+        # 相同的 seed 產生相同的地圖
+        assert (generator.generate_map_grids(500, seed=1) == grids).all()
+
+    def test_same_map_as_tmx_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(generate_map_module, "MAP_DIR", str(tmp_path))
+        generator = MapGenerator(1, 1, 20, 12)
+        grid = generator.generate_map_grid(seed=3)
+        monkeypatch.setattr(generator, "generate_map_str", lambda: MapGenerator.generate_map_str(generator, grid))
+        generator.generate_map()
+        compiled_map = compile_tmx(str(tmp_path / "map_1_v_1.tmx"))
+        assert vars(compiled_map) == vars(generator.to_compiled_map(grid))
+
+    def test_random_pos_is_bounded(self):
+        generator = MapGenerator(1, 1, 6, 4)
+        grid = generator.create_base_grid()
+        x, y = generator.random_pos(grid)
+        assert grid[y][x] == 0 and grid[4 - y - 1][6 - x - 1] == 0
+        grid[1:-1, 1:-1] = 3
+        with pytest.raises(ValueError):
+            generator.random_pos(grid)
+
+    def test_game_on_generated_maps(self):
+        generator = MapGenerator(3, 3, 20, 12)
+        first_map, second_map = generator.generate_compiled_maps(2, seed=4)
+        game = Game(6, 3, 3, "", 100, "off", headless=True, compiled_map=first_map)
+        assert game.game_mode.map.compiled_map is first_map
+        while game.is_running():
+            game.update({get_ai_name(i): ["SHOOT"] for i in range(6)})
+        game.reset(compiled_map=second_map)
+        assert game.game_mode.status == GameStatus.GAME_ALIVE
+        walls = {(wall.rect.x // 50, wall.rect.y // 50) for wall in game.game_mode.walls}
+        assert walls == {(x, y) for y, row in enumerate(second_map.tile_grid) for x, img_id in enumerate(row)
+                         if img_id == 3}
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from gymnasium.spaces import Box
+
+from ml.inference_broker import InferenceBroker
+
+
+class LinearModel(object):
+    """與 stable-baselines3 predict 介面相同的線性模型，記錄每次 forward 的 batch 大小"""
+
+    def __init__(self, seed):
+        self.weight = np.random.default_rng(seed).normal(size=(2, 4))
+        self.observation_space = Box(low=0, high=1, shape=(2,))
+        self.batch_sizes = []
+
+    def predict(self, observation, state=None, episode_start=None, deterministic=False):
+        observation = np.asarray(observation, dtype=np.float32)
+        is_single = observation.shape == self.observation_space.shape
+        batch = observation.reshape(-1, 2)
+        self.batch_sizes.append(len(batch))
+        actions = np.argmax(batch @ self.weight, axis=1)
+        return (actions.squeeze(axis=0) if is_single else actions), None
+
+
+class Bot(object):
+    def __init__(self, model_aim, model_chase, no):
+        self.model_aim = model_aim
+        self.model_chase = model_chase
+        self.no = no
+
+    def update(self, frame):
+        obs = np.array([frame % 7 / 7, self.no / 6], dtype=np.float32)
+        aim, _ = self.model_aim.predict(obs, deterministic=True)
+        chase, _ = self.model_chase.predict(obs[::-1], deterministic=True)
+        return [int(aim), int(chase)]
+
+
+class TestInferenceBroker(object):
+    def test_same_actions_with_one_forward_pass_per_model(self):
+        model_aim, model_chase = LinearModel(1), LinearModel(2)
+        serial_bots = [Bot(model_aim, model_chase, no) for no in range(6)]
+        expected = [[bot.update(frame) for bot in serial_bots] for frame in range(20)]
+
+        model_aim.batch_sizes.clear()
+        model_chase.batch_sizes.clear()
+        broker = InferenceBroker()
+        bots = [Bot(broker.wrap(model_aim), broker.wrap(model_chase), no) for no in range(6)]
+        try:
+            actual = [broker.run_frame([lambda bot=bot: bot.update(frame) for bot in bots]) for frame in range(20)]
+        finally:
+            broker.close()
+        assert actual == expected
+        assert model_aim.batch_sizes == [6] * 20
+        assert model_chase.batch_sizes == [6] * 20
+
+    def test_bot_error_is_raised_in_frame_loop(self):
+        broker = InferenceBroker()
+
+        def fail():
+            raise ValueError("bot error")
+
+        with pytest.raises(ValueError):
+            broker.run_frame([lambda: 1, fail])
+        assert broker.run_frame([lambda: 1, lambda: 2]) == [1, 2]
+        broker.close()
@@ -0,0 +1,72 @@
+import pytest
+
+from ml import model_registry
+from ml.model_registry import share_loaded_models, clear_model_cache, load_model
+
+
+class FakePolicy(object):
+    def set_training_mode(self, mode):
+        self.training = mode
+
+
+class FakeAlgorithm(object):
+    """與 stable-baselines3 相同的 load 介面，用來計算實際讀檔次數"""
+    load_num = 0
+
+    @classmethod
+    def load(cls, path, env=None, device="auto"):
+        FakeAlgorithm.load_num += 1
+        model = cls()
+        model.policy = FakePolicy()
+        model.env = env
+        return model
+
+
+@pytest.fixture(autouse=True)
+def restore_registry(monkeypatch):
+    """測試結束後還原 FakeAlgorithm.load 與 model_registry 的全域狀態"""
+    monkeypatch.setattr(FakeAlgorithm, "load", FakeAlgorithm.__dict__["load"])
+    monkeypatch.setattr(model_registry, "_original_loads", {})
+    monkeypatch.setattr(model_registry, "_broker", None)
+    clear_model_cache()
+    yield
+    clear_model_cache()
+
+
+class TestModelRegistry(object):
+    def test_same_file_is_loaded_once(self, tmp_path):
+        model_path = tmp_path / "aim.zip"
+        model_path.write_bytes(b"model")
+        share_loaded_models(FakeAlgorithm)
+        load_num = FakeAlgorithm.load_num
+        model = FakeAlgorithm.load(model_path)
+        assert FakeAlgorithm.load(str(tmp_path / "aim")) is model
+        assert FakeAlgorithm.load_num == load_num + 1
+        assert not model.policy.training
+        # 不同的讀取選項或綁定 env 時不共用
+        assert FakeAlgorithm.load(model_path, device="cpu") is not model
+        assert FakeAlgorithm.load(model_path, env="env").env == "env"
+        assert FakeAlgorithm.load_num == load_num + 3
+
+    def test_changed_file_is_loaded_again(self, tmp_path):
+        model_path = tmp_path / "chase.zip"
+        model_path.write_bytes(b"old")
+        share_loaded_models(FakeAlgorithm)
+        model = FakeAlgorithm.load(model_path)
+        model_path.write_bytes(b"new model")
+        assert FakeAlgorithm.load(model_path) is not model
+
+    def test_positional_arguments(self, tmp_path):
+        model_path = tmp_path / "aim.zip"
+        model_path.write_bytes(b"model")
+        share_loaded_models(FakeAlgorithm)
+        load_num = FakeAlgorithm.load_num
+        model = FakeAlgorithm.load(model_path)
+        # 與 stable-baselines3 相同可以用位置參數傳入 env 與 device，預設值與不傳相同
+        assert FakeAlgorithm.load(model_path, None, "auto") is model
+        assert load_model(model_path, FakeAlgorithm) is model
+        assert FakeAlgorithm.load(model_path, None, "cpu") is FakeAlgorithm.load(model_path, device="cpu")
+        assert FakeAlgorithm.load(model_path, "env").env == "env"
+        assert FakeAlgorithm.load_num == load_num + 3
+        with pytest.raises(TypeError):
+            FakeAlgorithm.load(model_path, None, "cpu", "extra")
@@ -0,0 +1,68 @@
+import random
+
+from src.env import WALL_IMG_NO
+from src.game_module.NavigationGrid import NavigationGrid, DIRECTION_OFFSETS
+from src.game_module.geometry import DIRECTIONS
+from test.conftest import create_mode, play_random_game
+
+
+def create_random_grid(seed, width=12, height=8):
+    rng = random.Random(seed)
+    blocked_cells = {(rng.randrange(width), rng.randrange(height)) for _ in range(width * height // 3)}
+    return NavigationGrid(width, height, 50, 50, blocked_cells), blocked_cells
+
+
+class TestNavigationGrid(object):
+    def test_next_direction_follows_shortest_path(self):
+        navigation, _ = create_random_grid(1)
+        target = next((x, y) for y in range(8) for x in range(12) if navigation.is_free_cell((x, y)))
+        for y in range(8):
+            for x in range(12):
+                distance = navigation.get_distance((x, y), target)
+                direction = navigation.get_next_direction((x, y), target)
+                if distance <= 0:
+                    assert direction is None
+                    continue
+                dx, dy = DIRECTION_OFFSETS[DIRECTIONS.index(direction)]
+                assert navigation.get_distance((x + dx, y + dy), target) == distance - 1
+
+    def test_set_free_matches_full_rebuild(self):
+        for seed in range(5):
+            navigation, blocked_cells = create_random_grid(seed)
+            targets = [(x, y) for x in range(0, 12, 3) for y in range(0, 8, 3)]
+            for target in targets:
+                navigation.get_distance((0, 0), target)
+            rng = random.Random(seed)
+            for cell in rng.sample(sorted(blocked_cells), 10):
+                navigation.set_free(cell)
+                blocked_cells.discard(cell)
+            rebuilt = NavigationGrid(12, 8, 50, 50, blocked_cells)
+            for target in targets:
+                assert (navigation.get_distance_field(target) == rebuilt.get_distance_field(target)).all()
+            for cell in [(x, y) for x in range(12) for y in range(8)]:
+                assert navigation.get_nearest_free_cell(cell) == rebuilt.get_nearest_free_cell(cell)
+
+    def test_nearest_free_cell(self):
+        navigation = NavigationGrid(3, 3, 50, 50, [(0, 0), (1, 0), (0, 1)])
+        assert navigation.get_nearest_free_cell((2, 2)) == (2, 2)
+        assert navigation.get_nearest_free_cell((0, 0)) == (1, 1)
+        assert navigation.get_nearest_free_cell((-5, 1)) == (1, 1)
+
+    def test_game_keeps_navigation_in_sync_with_walls(self):
+        mode = create_mode(3, 3, 600, headless=True)
+        wall_num = len(mode.walls)
+        target = (0, 0)
+        mode.navigation.get_distance((5, 5), target)
+        for wall in random.Random(2).sample(sorted(mode.walls, key=lambda wall: wall.rect.topleft), 20):
+            wall.lives = 0
+        play_random_game(mode, 2)
+        assert len(mode.walls) <= wall_num - 20
+        wall_cells = {mode.navigation.get_cell(wall.rect.center) for wall in mode.walls}
+        rebuilt = NavigationGrid(mode.navigation.width, mode.navigation.height, 25, 25, wall_cells)
+        new_game = NavigationGrid.from_compiled_map(mode.map.compiled_map, (WALL_IMG_NO,))
+        for y in range(mode.navigation.height):
+            for x in range(mode.navigation.width):
+                assert mode.navigation.is_free_cell((x, y)) == ((x, y) not in wall_cells)
+                assert mode.navigation.get_distance((x, y), target) == rebuilt.get_distance((x, y), target)
+                # 同一張地圖的新遊戲不受上一場打掉的牆影響
+                assert new_game.is_free_cell((x, y)) == (mode.map.compiled_map.tile_grid[y][x] != WALL_IMG_NO)
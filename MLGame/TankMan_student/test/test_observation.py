@@ -0,0 +1,73 @@
+import numpy as np
+from mlgame.utils.enum import get_ai_name
+
+from src.ObservationBuilder import angle_to_index
+from test.conftest import create_mode, play_random_game
+
+PLAYER_KEYS = ("x", "y", "speed", "score", "power", "oil", "lives", "angle", "gun_angle", "cooldown")
+
+
+def assert_same_as_scene_info(obs, scene_info: dict):
+    """NumPy 資料與 dict 給玩家的資料一致"""
+    for index, (ai_name, data) in enumerate(scene_info.items()):
+        record = obs[index]
+        assert ai_name == get_ai_name(index)
+        assert record["used_frame"] == data["used_frame"]
+        for key in PLAYER_KEYS:
+            assert abs(record["self"][key] - data[key]) < 1e-3
+        teammates = [info for info in data["teammate_info"] if info["id"] != data["id"]]
+        assert record["teammates"]["valid"].sum() == len(teammates)
+        assert record["competitors"]["valid"].sum() == len(data["competitor_info"])
+        for obs_players, infos in ((record["teammates"], teammates), (record["competitors"], data["competitor_info"])):
+            for player, info in zip(obs_players, infos):
+                assert f"{int(player['no'])}P" == info["id"]
+                assert (player["x"], player["y"]) == (info["x"], info["y"])
+                assert (player["dx"], player["dy"]) == (info["x"] - data["x"], info["y"] - data["y"])
+        bullets = record["bullets"][record["bullets"]["valid"] > 0]
+        assert [(f"{int(bullet['no'])}P_bullet", bullet["x"], bullet["y"], bullet["rot"]) for bullet in bullets] \
+            == [(info["id"], info["x"], info["y"], info["rot"]) for info in data["bullets_info"]]
+        for key in ("bullet_stations", "oil_stations"):
+            assert [(station["x"], station["y"], station["power"]) for station in record[key]] \
+                == [(info["x"], info["y"], info["power"]) for info in data[f"{key}_info"]]
+
+
+def play_and_compare(mode, seed: int) -> int:
+    """玩完一場，每個 frame 都比對 NumPy 資料與給玩家的資料，回傳有子彈的 frame 數"""
+    bullet_frames = []
+
+    def compare(mode, commands):
+        obs = mode.get_observation()
+        assert_same_as_scene_info(obs, mode.get_ai_data_to_player())
+        bullet_frames.append(bool(obs["bullets"]["valid"].any()))
+
+    compare(mode, None)
+    play_random_game(mode, seed, compare)
+    return sum(bullet_frames)
+
+
+class TestObservation(object):
+    def test_same_as_scene_info(self):
+        assert play_and_compare(create_mode(3, 3, 300, headless=True, seed=1), 2)
+
+    def test_same_as_scene_info_with_vectorized_bullets(self):
+        assert play_and_compare(create_mode(2, 3, 300, headless=True, seed=3, vectorized_bullets=True), 4)
+
+    def test_padded_layout(self):
+        mode = create_mode(1, 2, 100, headless=True, seed=5)
+        obs = mode.get_observation()
+        # 每隊人數上限為 2，玩家 1P 沒有隊友，對手補齊到 2 個位置
+        assert obs.shape == (3,)
+        assert obs["teammates"].shape == (3, 1)
+        assert obs["competitors"].shape == (3, 2)
+        assert obs["teammates"]["valid"].tolist() == [[0], [1], [1]]
+        assert obs["competitors"]["valid"].tolist() == [[1, 1], [1, 0], [1, 0]]
+        assert not obs["teammates"][0]["x"].any()
+        # 所有欄位都是 float32，可以直接當成模型的輸入
+        assert obs.view(np.float32).reshape(3, -1).shape == (3, obs.dtype.itemsize // 4)
+        # 同一個 frame 內沿用同一份，update() 之後重新產生
+        assert mode.get_observation() is obs
+        mode.update({"1P": ["SHOOT"], "2P": ["NONE"], "3P": ["NONE"]})
+        assert mode.get_observation() is not obs
+
+    def test_angle_to_index(self):
+        assert [angle_to_index(angle) for angle in (0, 45, 90, 180, 315, -45, 350, 360)] == [0, 1, 2, 4, 7, 7, 0, 0]
@@ -0,0 +1,51 @@
+import numpy as np
+from pettingzoo.test import parallel_api_test
+
+from ml.gym_env.tankman.parallel_env import ACTIONS, TankManParallelEnv
+from src.action import SHOOT_ACTION
+
+
+class TestParallelEnv(object):
+    def test_parallel_api(self):
+        parallel_api_test(TankManParallelEnv(frame_limit=150, win_reward=1), num_cycles=400)
+
+    def test_arrays_same_as_dicts(self):
+        array_env = TankManParallelEnv(2, 3, frame_limit=120)
+        dict_env = TankManParallelEnv(2, 3, frame_limit=120)
+        obs = array_env.reset_arrays(seed=7)
+        obs_dict, _ = dict_env.reset(seed=7)
+        assert obs.shape == (5, array_env.observation_space("1P").shape[0])
+        assert np.array_equal(obs, np.stack([obs_dict[agent] for agent in dict_env.possible_agents]))
+        # 每一列就是 Game.get_observation() 中該玩家的資料
+        assert np.array_equal(obs, array_env.game.get_observation().view(np.float32).reshape(5, -1))
+        rng = np.random.default_rng(1)
+        while dict_env.agents:
+            actions = rng.integers(len(ACTIONS), size=5)
+            obs, rewards, terminations, truncations = array_env.step_arrays(actions)
+            obs_dict, reward_dict, termination_dict, truncation_dict, _ = dict_env.step(
+                {agent: actions[i] for i, agent in enumerate(dict_env.possible_agents) if agent in dict_env.agents})
+            for i, agent in enumerate(dict_env.possible_agents):
+                if agent in obs_dict:
+                    assert np.array_equal(obs[i], obs_dict[agent])
+                    assert rewards[i] == reward_dict[agent]
+                    assert (terminations[i], truncations[i]) == (termination_dict[agent], truncation_dict[agent])
+        # 所有玩家都結束後遊戲也結束了
+        assert (terminations | truncations).all()
+        assert not array_env.game.is_running()
+
+    def test_reward_and_done(self):
+        env = TankManParallelEnv(1, 1, frame_limit=30, win_reward=5)
+        env.reset_arrays(seed=3)
+        shoot = list(ACTIONS).index(SHOOT_ACTION)
+        total = np.zeros(2)
+        for _ in range(30):
+            obs, rewards, terminations, truncations = env.step_arrays([shoot, 0])
+            total += rewards
+        # 到達 frame 上限時是 truncation，勝隊拿到 win_reward，敗隊扣掉
+        assert truncations.all() and not terminations.any()
+        scores = env.game.get_observation()["self"]["score"]
+        is_green_win = env.game.game_mode.status == "GREEN_TEAM_WIN"
+        assert total.tolist() == [scores[0] + (5 if is_green_win else -5), scores[1] + (-5 if is_green_win else 5)]
+        # 結束後再 step，結束的玩家不再有 reward
+        obs, rewards, terminations, truncations = env.step_arrays([shoot, shoot])
+        assert not rewards.any() and truncations.all()
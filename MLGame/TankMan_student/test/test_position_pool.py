@@ -0,0 +1,46 @@
+import random
+
+from src.game_module.PositionPool import PositionPool
+from test.conftest import create_mode
+
+
+class TestPositionPool(object):
+    def test_swap_remove_keeps_index(self):
+        pool = PositionPool([(x, 0) for x in range(10)])
+        rng = random.Random(0)
+        popped = [pool.pop_random(rng) for _ in range(4)]
+        pool.remove(pool.positions[0])
+        assert len(pool) == 5
+        assert len(set(popped)) == 4 and not set(popped) & set(pool)
+        for index, pos in enumerate(pool.positions):
+            assert pool.index_dict[pos] == index
+        # 重複加入只算一次
+        pool.add(popped[0])
+        pool.add(popped[0])
+        assert len(pool) == 6
+
+    def test_blocked_positions_are_not_chosen(self):
+        pool = PositionPool([(x, 0) for x in range(100)])
+        allowed = {(3, 0), (50, 0), (97, 0)}
+        rng = random.Random(1)
+        # 大部分位置都不能用時改為逐一檢查
+        assert {pool.pop_random(rng, lambda pos: pos not in allowed) for _ in range(3)} == allowed
+        # 全部都不能用時仍然會取出一個
+        assert PositionPool([(0, 0)]).pop_random(rng, lambda pos: True) == (0, 0)
+
+
+class TestStationRelocation(object):
+    def test_station_never_lands_on_a_tank(self):
+        mode = create_mode(3, 3, headless=True, seed=2)
+        players = list(mode.all_players)
+        stations = [*mode.bullet_stations, *mode.oil_stations]
+        rng = random.Random(3)
+        for _ in range(200):
+            # 把坦克放到隨機的空位上，再移動所有補給站
+            for player in players:
+                player.rect.topleft = rng.choice(mode.map.empty_pos_list)
+            mode.change_obj_pos(stations)
+            for station in stations:
+                assert station.rect.collidelist([player.rect for player in players]) == -1
+        # 補給站之間也不會重疊
+        assert len({station.rect.topleft for station in stations}) == len(stations)
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from src.Game import Game
+from src.ProgressDelta import ProgressDeltaDecoder, ProgressDeltaEncoder
+from test.conftest import play_random_game
+
+
+def play_and_decode(game: Game, seed: int, decoder: ProgressDeltaDecoder) -> list:
+    """玩完一場，每個 frame 比對解碼後的畫面，回傳每則訊息 JSON 的長度"""
+    sizes = []
+
+    # 與 mlgame 相同，update() 之後才取得畫面
+    def decode(mode, commands):
+        message = json.loads(json.dumps(game.get_scene_progress_delta()))
+        assert decoder.decode(message) == game.get_scene_progress_data()
+        sizes.append(len(json.dumps(message)))
+
+    play_random_game(game.game_mode, seed, decode)
+    return sizes
+
+
+class TestProgressDelta(object):
+    def test_decoded_frames_are_the_same(self):
+        game = Game(6, 3, 3, "", 400, "off", seed=3, vectorized_bullets=True)
+        # 除錯模式多了碰撞框
+        game.is_debug = True
+        game.game_mode.debugging(True)
+        decoder = ProgressDeltaDecoder()
+        sizes = play_and_decode(game, 1, decoder)
+        game.reset()
+        game.game_mode.debugging(True)
+        play_and_decode(game, 2, decoder)
+        full_size = len(json.dumps(game.get_scene_progress_data()))
+        # 第一則為完整資料，之後只有變動的部分
+        assert sizes[0] > full_size / 2
+        assert sum(sizes[1:]) / len(sizes[1:]) < full_size / 3
+
+    def test_decoding_starts_from_a_keyframe(self):
+        game = Game(2, 1, 1, "", 100, "off", seed=1)
+        game.progress_encoder = ProgressDeltaEncoder(keyframe_interval=10)
+        messages = []
+        for _ in range(25):
+            game.update({"1P": ["FORWARD"], "2P": ["SHOOT"]})
+            messages.append(game.get_scene_progress_delta())
+        assert [message["frame"] for message in messages if message["keyframe"]] == [0, 10, 20]
+        decoder = ProgressDeltaDecoder()
+        with pytest.raises(ValueError):
+            decoder.decode(messages[5])
+        for message in messages[10:]:
+            decoded = decoder.decode(message)
+        assert decoded == game.get_scene_progress_data()
+
+    def test_explicit_order(self):
+        encoder = ProgressDeltaEncoder()
+        decoder = ProgressDeltaDecoder()
+        for pairs in ([[1, "a"], [2, "b"]], [[2, "b"], [1, "a"]], [[1, "a"], [2, "b"]]):
+            decoded = decoder.decode(encoder.encode({"object_list": pairs}, {}))
+            assert decoded["object_list"] == [item for _, item in pairs]
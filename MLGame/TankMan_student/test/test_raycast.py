@@ -0,0 +1,60 @@
+import random
+
+import pygame
+from mlgame.utils.enum import get_ai_name
+
+from src.Bullet import Bullet
+from src.Player import Player
+from src.env import BULLET_SIZE, BULLET_SPEED, BULLET_TRAVEL_DISTANCE, BULLET_STATION_IMG_NO
+from src.game_module.TiledMap import create_construction
+from test.conftest import create_mode
+
+
+def shoot_with_bullet_sprite(mode, player, rot: int) -> tuple:
+    """以 Bullet sprite 與 collide_rect_ratio(0.8) 逐 frame 模擬一顆子彈，其他物件不動"""
+    bullet = Bullet(create_construction(player.id, player.no, player.rect.center, BULLET_SIZE), rot=rot,
+                    bullet_speed=BULLET_SPEED, bullet_travel_distance=BULLET_TRAVEL_DISTANCE,
+                    play_rect_area=mode.play_rect_area)
+    bullets = pygame.sprite.Group(bullet)
+    players = [target for target in mode.all_players if isinstance(target, Player) and target.lives > 0]
+    targets = [(f"{target.no}P", target) for target in players if target.no != player.no]
+    targets += [("bullet_station" if station.id == BULLET_STATION_IMG_NO else "oil_station", station)
+                for station in [*mode.bullet_stations, *mode.oil_stations]]
+    collide = pygame.sprite.collide_rect_ratio(0.8)
+    frame = 0
+    while True:
+        bullets.update()
+        frame += 1
+        if not bullets:
+            return None, None
+        for name, target in targets:
+            if collide(bullet, target):
+                return name, frame
+        for wall in mode.walls:
+            if collide(bullet, wall):
+                return "wall", frame
+
+
+class TestFiringLanes(object):
+    def test_same_hit_as_bullet_sprite(self):
+        for green_team_num, blue_team_num in [(1, 1), (3, 3)]:
+            mode = create_mode(green_team_num, blue_team_num, 300, headless=True, firing_lanes=True)
+            rng = random.Random(green_team_num)
+            commands = ["FORWARD", "BACKWARD", "TURN_LEFT", "TURN_RIGHT", "SHOOT"]
+            for frame in range(120):
+                mode.update({get_ai_name(i): [rng.choice(commands)] for i in range(green_team_num + blue_team_num)})
+                if frame % 20:
+                    continue
+                firing_lanes = mode.get_firing_lanes()
+                assert firing_lanes
+                for player, lanes in firing_lanes.items():
+                    for lane in lanes:
+                        hit, hit_frame = shoot_with_bullet_sprite(mode, player, lane["angle"])
+                        assert (lane["hit"], lane["frame"]) == (hit, hit_frame)
+
+    def test_firing_lanes_in_ai_data(self):
+        mode = create_mode(headless=True, firing_lanes=True)
+        mode.update({"1P": ["NONE"], "2P": ["NONE"]})
+        lanes = mode.get_ai_data_to_player()["1P"]["firing_lanes"]
+        assert [lane["angle"] for lane in lanes] == list(range(0, 360, 45))
+        assert "firing_lanes" not in create_mode(headless=True).get_ai_data_to_player()["1P"]
@@ -0,0 +1,71 @@
+import copy
+import os
+import struct
+
+import pytest
+
+from src.Replay import Replay
+from src.ReplayLog import KEYFRAME_SUFFIX, REPLAY_VERSION, ReplayLog
+from test.conftest import create_mode, play_random_game
+
+
+def record_random_game(path: str, frame_limit: int, **kwargs) -> tuple:
+    """回傳錄影的遊戲與第 0 ~ 最後一次 update() 前每個 frame 給玩家的資料"""
+    mode = create_mode(3, 3, frame_limit, headless=True, record_path=path, **kwargs)
+    return mode, [copy.deepcopy(data) for data in play_random_game(mode, 4)]
+
+
+class TestReplayLog(object):
+    def test_unsupported_version(self, tmp_path):
+        path = str(tmp_path / "game.tmr")
+        record_random_game(path, 30, seed=3)
+        with open(path, "r+b") as f:
+            f.seek(4)
+            f.write(struct.pack("<H", REPLAY_VERSION + 1))
+        with pytest.raises(ValueError):
+            ReplayLog(path)
+
+    def test_fixed_width_records(self, tmp_path):
+        path = str(tmp_path / "game.tmr")
+        mode, history = record_random_game(path, 120, seed=3)
+        log = ReplayLog(path)
+        assert log.seed == 3
+        assert log.frame_num == mode.used_frame == len(history)
+        assert os.path.getsize(path) == log.record_start + log.frame_num * 6
+        assert set(log.get_commands(1)) == {f"{no}P" for no in range(1, 7)}
+        log.close()
+
+
+class TestReplay(object):
+    def test_every_frame_is_the_same_as_the_game(self, tmp_path):
+        path = str(tmp_path / "game.tmr")
+        mode, history = record_random_game(path, 1200, seed=5)
+        assert ReplayLog(path, load_keyframes=True).keyframe_index
+        replay = Replay(path, load_keyframes=True)
+        # 先跳到後面再往回跳
+        assert replay.get_ai_data_to_player(len(history) - 1) == history[-1]
+        for frame in range(0, len(history), 7):
+            assert replay.get_ai_data_to_player(frame) == history[frame]
+        assert replay.seek(replay.frame_num).status == mode.status
+
+    def test_keyframes_are_not_loaded_by_default(self, tmp_path):
+        path = str(tmp_path / "game.tmr")
+        mode, history = record_random_game(path, 1200, seed=5)
+        # .keys 是 pickle，沒有指定 load_keyframes 時不讀取，錄影檔本身也不含 pickle
+        assert not ReplayLog(path).keyframe_index
+        replay = Replay(path)
+        assert list(replay.keyframes) == [0]
+        assert replay.log.compiled_map.tile_grid == mode.map.compiled_map.tile_grid
+        assert replay.get_ai_data_to_player(len(history) - 1) == history[-1]
+
+    def test_replay_without_keyframes(self, tmp_path):
+        path = str(tmp_path / "game.tmr")
+        mode, history = record_random_game(path, 200, seed=7, vectorized_bullets=True)
+        os.remove(path + KEYFRAME_SUFFIX)
+        replay = Replay(path, keyframe_interval=0)
+        assert replay.get_ai_data_to_player(150) == history[150]
+
+    def test_same_seed_same_game(self):
+        first = play_random_game(create_mode(3, 3, 200, headless=True, seed=9), 1)
+        second = play_random_game(create_mode(3, 3, 200, headless=True, seed=9), 1)
+        assert first == second
@@ -0,0 +1,164 @@
+import copy
+import random
+
+import pygame
+from mlgame.game.paia_game import GameStatus
+from mlgame.utils.enum import get_ai_name
+
+from src.Game import Game
+from src.env import DARKGREEN, ORANGE
+from src.game_module.geometry import get_rotated_size
+from test.conftest import create_mode, play_random_game
+
+
+class TestHeadless(object):
+    def test_headless_mode_keeps_only_simulation_state(self):
+        mode = create_mode(headless=True)
+        assert mode.sound_controller is None
+        assert mode.background == []
+        assert mode.get_toggle_progress_data() == []
+        assert mode.get_toggle_with_bias_data() == []
+
+    def test_headless_game_plays_to_the_end(self):
+        game = Game(2, 1, 1, "", 60, "on", headless=True)
+        assert not game.is_sound
+        while game.is_running():
+            game.update({"1P": ["SHOOT"], "2P": ["FORWARD"]})
+        assert game.game_mode.used_frame == 60
+        assert game.get_game_result()["state"] == "FINISH"
+
+
+class TestVectorizedBullets(object):
+    def test_same_result_as_bullet_sprites(self):
+        random.seed(3)
+        sprite_history = play_random_game(create_mode(3, 3, 300), 5)
+        random.seed(3)
+        store_history = play_random_game(create_mode(3, 3, 300, vectorized_bullets=True), 5)
+        assert sprite_history == store_history
+        assert any(frame["1P"]["bullets_info"] for frame in store_history)
+
+    def test_bullets_expire_after_travel_distance(self):
+        mode = create_mode(headless=True, vectorized_bullets=True)
+        mode.bullets.add(1, 1, (500, 300), 90)
+        for _ in range(20):
+            mode.bullets.update()
+        assert len(mode.bullets) == 0
+
+
+class TestRotation(object):
+    def test_rotated_size_table_matches_pygame(self):
+        for size in [(50, 50), (25, 25), (13, 16), (70, 40)]:
+            surface = pygame.Surface(size)
+            for rot in range(-45, 406, 45):
+                assert get_rotated_size(size, rot) == pygame.transform.rotate(surface, rot).get_size()
+
+    def test_no_surface_rotation_per_frame(self, monkeypatch):
+        mode = create_mode(3, 3, headless=True)
+        mode.update({get_ai_name(i): ["TURN_LEFT"] for i in range(6)})
+
+        def fail(*args):
+            raise AssertionError("pygame.transform.rotate called in update")
+
+        monkeypatch.setattr(pygame.transform, "rotate", fail)
+        for _ in range(30):
+            mode.update({get_ai_name(i): ["TURN_LEFT"] if i % 2 else ["AIM_RIGHT"] for i in range(6)})
+
+
+class TestAiData(object):
+    def test_same_data_within_a_frame(self):
+        mode = create_mode(headless=True)
+        mode.update({"1P": ["NONE"], "2P": ["NONE"]})
+        data = mode.get_ai_data_to_player()
+        assert mode.get_ai_data_to_player() is data
+        mode.update({"1P": ["NONE"], "2P": ["NONE"]})
+        next_data = mode.get_ai_data_to_player()
+        assert next_data is not data
+        # 牆壁沒有變動時沿用同一份 list
+        assert next_data["1P"]["walls_info"] is data["1P"]["walls_info"]
+
+    def test_walls_info_follows_wall_lives(self):
+        mode = create_mode(headless=True)
+        mode.update({"1P": ["NONE"], "2P": ["NONE"]})
+        walls_info = mode.get_ai_data_to_player()["1P"]["walls_info"]
+        wall = next(iter(mode.walls))
+        wall.lives = 0
+        wall.kill()
+        mode.is_walls_changed = True
+        mode.update({"1P": ["NONE"], "2P": ["NONE"]})
+        new_walls_info = mode.get_ai_data_to_player()["1P"]["walls_info"]
+        assert len(new_walls_info) == len(walls_info) - 1
+        assert new_walls_info == [wall.get_data_from_obj_to_game() for wall in mode.walls]
+
+    def test_previous_frame_data_is_not_modified(self):
+        mode = create_mode(1, 1, 200, headless=True)
+        mode.update({"1P": ["NONE"], "2P": ["NONE"]})
+        snapshots = []
+        rng = random.Random(3)
+        while mode.status == GameStatus.GAME_ALIVE:
+            data = mode.get_ai_data_to_player()
+            snapshots.append((data, copy.deepcopy(data)))
+            mode.update({"1P": [rng.choice(["SHOOT", "FORWARD", "TURN_LEFT"])], "2P": ["SHOOT"]})
+        assert all(data == copied for data, copied in snapshots)
+
+    def test_commands_are_not_consumed(self):
+        mode = create_mode(headless=True)
+        commands = {"1P": ["FORWARD", "SHOOT"], "2P": ["AIM_LEFT"]}
+        mode.update(commands)
+        assert commands == {"1P": ["FORWARD", "SHOOT"], "2P": ["AIM_LEFT"]}
+
+
+class TestSeed(object):
+    def test_same_seed_with_or_without_view(self):
+        random.seed(1)
+        headless_history = play_random_game(create_mode(3, 3, 300, headless=True, seed=8), 2)
+        random.seed(2)
+        view_history = play_random_game(create_mode(3, 3, 300, seed=8), 2)
+        assert headless_history == view_history
+
+    def test_reset_with_seed(self):
+        game = Game(6, 3, 3, "", 100, "off", headless=True, seed=4)
+        first = game.get_data_from_game_to_player()
+        game.update({get_ai_name(i): ["SHOOT"] for i in range(6)})
+        game.reset(seed=4)
+        assert game.get_data_from_game_to_player() == first
+        # 沒有指定 seed 時由上一場的亂數產生，仍可重現
+        game.reset()
+        other = Game(6, 3, 3, "", 100, "off", headless=True, seed=4)
+        other.update({get_ai_name(i): ["SHOOT"] for i in range(6)})
+        other.reset()
+        assert game.get_data_from_game_to_player() == other.get_data_from_game_to_player()
+
+    def test_same_result_with_same_seed(self):
+        results = []
+        for _ in range(2):
+            game = Game(6, 3, 3, "", 200, "off", headless=True, seed=6)
+            play_random_game(game.game_mode, 3)
+            results.append(game.get_game_result())
+        assert results[0] == results[1]
+
+
+class TestSceneData(object):
+    def test_floor_is_only_in_init_data(self):
+        game = Game(2, 1, 1, "", 100, "off", seed=2)
+        background = game.get_scene_init_data()["background"]
+        # 20 x 12 格地板加上邊框
+        assert len(background) == 20 * 12 + 1
+        assert {data["image_id"] for data in background} <= {"floor_0", "floor_1", "floor_2", "border"}
+        game.update({"1P": ["FORWARD"], "2P": ["SHOOT"]})
+        object_list = game.get_scene_progress_data()["object_list"]
+        assert not any(data.get("image_id", "").startswith(("floor_", "border")) for data in object_list)
+        assert any(data.get("image_id") == "1P" for data in object_list)
+
+    def test_hud_bars_do_not_grow_with_score(self):
+        mode = create_mode(3, 3, 3000, seed=2)
+        mode.team_green_score = 400
+        mode.team_blue_score = 30
+        score_bars = [data for data in mode.get_toggle_progress_data() if data.get("name") == "score"]
+        # 30 格橘色與 370 格綠色，第一列放得下 318 格，綠色分成兩列
+        assert [(bar["x"], bar["y"], bar["color"]) for bar in score_bars] \
+            == [(24, 20, ORANGE), (24 + 30 * 1.5, 20, DARKGREEN), (24, 32, DARKGREEN)]
+        assert sum((bar["width"] + 0.5) / 1.5 for bar in score_bars) == 400
+        frame_bars = [data for data in mode.get_toggle_progress_data() if data.get("name") == "frame"]
+        assert len(frame_bars) == 1 and frame_bars[0]["width"] == 50 * 3.5 - 0.5
+        power_bars = [data for data in mode.get_toggle_with_bias_data() if data.get("name", "").endswith("_power")]
+        assert len(power_bars) == 6 and all(bar["width"] == 9 * 5 + 3 for bar in power_bars)
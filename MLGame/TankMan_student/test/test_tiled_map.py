@@ -0,0 +1,38 @@
+from os import path
+
+import pygame
+
+from src.TeamBattleMode import TeamBattleMode
+from src.env import MAP_DIR
+from src.game_module import TiledMap as tiled_map_module
+from src.game_module.TiledMap import TiledMap, load_compiled_map
+
+
+class TestCompiledMapCache(object):
+    map_path = path.join(MAP_DIR, "map_1_v_1.tmx")
+
+    def test_same_file_is_parsed_once(self, monkeypatch):
+        tiled_map_module.clear_compiled_map_cache()
+        calls = []
+        compile_tmx = tiled_map_module.compile_tmx
+        monkeypatch.setattr(tiled_map_module, "compile_tmx", lambda filepath: calls.append(filepath) or compile_tmx(filepath))
+        first = load_compiled_map(self.map_path)
+        second = load_compiled_map(self.map_path)
+        assert first is second
+        assert len(calls) == 1
+
+    def test_position_tables_are_not_shared(self):
+        map_a = TiledMap(self.map_path)
+        map_b = TiledMap(self.map_path)
+        map_a.empty_quadrant_pos_dict[1].remove(next(iter(map_a.empty_quadrant_pos_dict[1])))
+        assert len(map_b.empty_quadrant_pos_dict[1]) == len(map_a.empty_quadrant_pos_dict[1]) + 1
+        assert map_a.tile_grid is map_b.tile_grid
+
+    def test_reset_does_not_read_map_file(self, monkeypatch):
+        mode = TeamBattleMode(1, 1, False, 100, "", pygame.Rect(0, 0, 1000, 600))
+        wall_count = len(mode.walls)
+        monkeypatch.setattr(tiled_map_module, "load_compiled_map", None)
+        monkeypatch.setattr(tiled_map_module.pytmx, "TiledMap", None)
+        mode.reset()
+        assert len(mode.walls) == wall_count
+        assert mode.used_frame == 0
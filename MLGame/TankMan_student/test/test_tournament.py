@@ -0,0 +1,129 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+from os import path
+
+import pytest
+
+from tournament import Series, get_game_seed, load_ledger, play_job, run_tournament
+
+ROOT_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+STUB_PLAYER = """import random
+
+
+class MLPlay:
+    def __init__(self, ai_name, game_params):
+        self.ai_name = ai_name
+
+    def update(self, scene_info, keyboard=[]):
+        return [random.choice(["FORWARD", "BACKWARD", "TURN_LEFT", "TURN_RIGHT", "AIM_LEFT", "SHOOT"])]
+
+    def reset(self):
+        pass
+"""
+PLAYER_MODULE = "stub_bots.Group_{group}.ml_play_{player}"
+
+
+@pytest.fixture
+def stub_bots(tmp_path, monkeypatch):
+    """Two groups of random bots, importable as stub_bots.Group_A and stub_bots.Group_B"""
+    for group in ("A", "B"):
+        group_dir = tmp_path / "stub_bots" / f"Group_{group}"
+        group_dir.mkdir(parents=True)
+        (group_dir / "__init__.py").write_text("")
+        for player in range(1, 4):
+            (group_dir / f"ml_play_{player}.py").write_text(STUB_PLAYER)
+    (tmp_path / "stub_bots" / "__init__.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return tmp_path
+
+
+def run_tournament_in_process(bots_dir, ledger_path: str, kill_after_rows: int = None) -> None:
+    """Run a tiny tournament with one worker in another process, optionally killing it mid-run"""
+    code = (f"from tournament import run_tournament; "
+            f"run_tournament(['A', 'B'], 3, 200, seed=1, workers=1, ledger_path={ledger_path!r}, "
+            f"player_module={PLAYER_MODULE!r})")
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(bots_dir), ROOT_DIR])}
+    process = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT_DIR, env=env, start_new_session=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if kill_after_rows is None:
+        assert process.wait(timeout=120) == 0
+        return
+    deadline = time.monotonic() + 120
+    while len(load_ledger(ledger_path)) < kill_after_rows and process.poll() is None \
+            and time.monotonic() < deadline:
+        time.sleep(0.005)
+    # the runner and its worker are in their own process group
+    os.killpg(process.pid, signal.SIGKILL)
+    process.wait()
+
+
+class TestSeries(object):
+    def test_stops_when_series_is_decided(self):
+        series = Series("A", "B", 5)
+        assert series.get_jobs_to_start(0) == [0, 1, 2]
+        for game_index in [0, 1, 2]:
+            series.results[game_index] = "GREEN_TEAM_WIN"
+        assert series.is_decided()
+        assert series.get_jobs_to_start(0) == []
+        assert series.get_score() == (3, 0)
+
+    def test_only_leading_games_are_counted(self):
+        series = Series("A", "B", 5)
+        series.get_jobs_to_start(0)
+        series.results[1] = "BLUE_TEAM_WIN"
+        series.results[2] = "BLUE_TEAM_WIN"
+        assert series.get_score() == (0, 0)
+        # game 0 is still running, no more game can change the series before it finishes
+        assert series.get_jobs_to_start(1) == []
+        series.results[0] = "GREEN_TEAM_WIN"
+        assert series.get_score() == (1, 2)
+        assert series.get_jobs_to_start(0) == [3]
+
+    def test_game_seed_is_stable(self):
+        assert get_game_seed(0, "A", "B", 1) == get_game_seed(0, "A", "B", 1)
+        assert get_game_seed(0, "A", "B", 1) != get_game_seed(0, "B", "A", 1)
+
+    def test_game_seed_is_the_same_in_every_run(self):
+        # crc32 does not depend on the hash randomization of the process
+        assert get_game_seed(0, "A", "B", 1) == 1837281334
+        assert get_game_seed(7, "11", "9", 4) == 91215417
+
+
+class TestTournament(object):
+    def test_play_job_is_deterministic(self, stub_bots):
+        job = {"home": "A", "away": "B", "game": 0, "seed": get_game_seed(1, "A", "B", 0), "frame": 100,
+               "sound": "off", "player_module": PLAYER_MODULE, "home_folder": "A", "away_folder": "B",
+               "replay_path": None, "profile": False, "batch_inference": False}
+        row = play_job(job)
+        assert row["status"] in ("GREEN_TEAM_WIN", "BLUE_TEAM_WIN")
+        assert {key: row[key] for key in job} == job
+        assert play_job(dict(job)) == row
+
+    def test_resume_from_ledger(self, stub_bots):
+        full_ledger = str(stub_bots / "full.jsonl")
+        run_tournament_in_process(stub_bots, full_ledger)
+        full_rows = load_ledger(full_ledger)
+
+        ledger = str(stub_bots / "resumed.jsonl")
+        run_tournament_in_process(stub_bots, ledger, kill_after_rows=2)
+        killed_rows = load_ledger(ledger)
+        assert 2 <= len(killed_rows) < len(full_rows)
+        # a row cut off by the kill is dropped and its game is played again
+        with open(ledger, "a") as f:
+            f.write('{"home": "A", "aw')
+
+        result = run_tournament(["A", "B"], 3, 200, seed=1, workers=1, ledger_path=ledger,
+                                player_module=PLAYER_MODULE)
+        rows = load_ledger(ledger)
+        keys = [(row["home"], row["away"], row["game"]) for row in rows]
+        # finished games are not played again, and every game has the same result as without the kill
+        assert rows[:len(killed_rows)] == killed_rows
+        assert len(set(keys)) == len(keys)
+        full_status = {(row["home"], row["away"], row["game"]): row["status"] for row in full_rows}
+        assert all(full_status.get(key, row["status"]) == row["status"] for key, row in zip(keys, rows))
+        full_result = run_tournament(["A", "B"], 3, 200, seed=1, workers=1, ledger_path=full_ledger,
+                                     player_module=PLAYER_MODULE)
+        assert result == full_result
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("stable_baselines3")
+
+from ml.gym_env.tankman.resupply_env import ResupplyEnv
+from ml.gym_env.tankman.vec_env import ResupplyVecEnv
+
+
+class TestResupplyVecEnv(object):
+    def test_same_as_resupply_env(self):
+        env = ResupplyVecEnv(4, 2, 2, 200, randomize=True, seed=1)
+        reference = ResupplyEnv(2, 2, 200, randomize=True)
+        env.reset()
+        rng = np.random.default_rng(2)
+        for _ in range(60):
+            scene_infos = [game.get_data_from_game_to_player() for game in env.games]
+            players = env.players
+            actions = rng.integers(env.action_space.n, size=env.num_envs)
+            obs, rewards, dones, _ = env.step(actions)
+            # 沒有結束的遊戲，與 ResupplyEnv 對同一個畫面與目標算出的 observation、reward 相同
+            for i in np.flatnonzero(~dones):
+                expected = reference.get_obs(players[i], env.targets[i, 0], env.targets[i, 1], scene_infos[i])
+                assert obs[i].tolist() == expected.tolist()
+                assert rewards[i] == reference.get_reward(expected, actions[i])
+
+    def test_auto_reset(self):
+        env = ResupplyVecEnv(3, 1, 1, 30, player="1P", supply_type="oil_stations")
+        env.seed(5)
+        obs = env.reset()
+        assert obs.shape == (3, 2)
+        for _ in range(30):
+            obs, rewards, dones, infos = env.step(np.ones(3, dtype=int))
+            assert not dones.any()
+        # 第 30 次 update 後遊戲結束，下一次 step 回報結束並自動開始新的一場
+        last_obs = env._get_obs(env.env_index, env._get_players(env.env_index))
+        obs, rewards, dones, infos = env.step(np.zeros(3, dtype=int))
+        assert dones.all()
+        for i, info in enumerate(infos):
+            assert info["TimeLimit.truncated"] is False
+            assert info["terminal_observation"][0] == last_obs[i, 0]
+            assert env.games[i].is_running()
+            assert env.games[i].game_mode.used_frame == 0
+        # 新的一場中 1P 回到初始的方向
+        assert obs[:, 0].tolist() == [0, 0, 0]
+        obs, rewards, dones, infos = env.step(np.zeros(3, dtype=int))
+        assert not dones.any()
+        assert all("terminal_observation" not in info for info in infos)
+
+    def test_attributes_by_index(self):
+        env = ResupplyVecEnv(3, 1, 1, 30, player="1P", supply_type="oil_stations")
+        env.reset()
+        assert env.get_attr("render_mode") == [None, None, None]
+        assert env.get_attr("players", [0, 2]) == ["1P", "1P"]
+        assert env.get_attr("games", 1) == [env.games[1]]
+        # 每個環境各自的狀態只改指定的環境
+        env.set_attr("supply_types", "bullet_stations", [1])
+        assert env.supply_types.tolist() == ["oil_stations", "bullet_stations", "oil_stations"]
+        env.set_attr("targets", [100, 200], 2)
+        assert env.get_attr("targets", 2)[0].tolist() == [100, 200]
+        assert env.targets[0].tolist() != [100, 200]
+        # 所有環境共用的屬性只能一起設定
+        env.set_attr("normalize", True)
+        assert env.normalize
+        with pytest.raises(AttributeError):
+            env.set_attr("normalize", False, [0])
+        with pytest.raises(AttributeError):
+            env.set_attr("players", "2P", [0])
+        with pytest.raises(AttributeError):
+            env.env_method("reset", indices=[0])
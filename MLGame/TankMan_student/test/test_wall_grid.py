@@ -0,0 +1,42 @@
+import random
+
+import pygame
+
+from src.Wall import Wall
+from src.game_module.TiledMap import create_construction
+from src.game_module.WallGrid import WallGrid
+
+
+def create_walls(tile_size: int, count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    cells = rng.sample([(x, y) for x in range(20) for y in range(12)], count)
+    return [Wall(create_construction(3, 0, (x * tile_size, y * tile_size), (tile_size, tile_size)))
+            for x, y in cells]
+
+
+class TestWallGrid(object):
+    def test_same_hits_as_groupcollide(self):
+        walls = create_walls(50, 80, 1)
+        grid = WallGrid(50, 50, *walls)
+        group = pygame.sprite.Group(*walls)
+        rng = random.Random(2)
+        sprites = pygame.sprite.Group()
+        for _ in range(200):
+            sprite = pygame.sprite.Sprite()
+            sprite.rect = pygame.Rect(rng.randrange(-50, 1000), rng.randrange(-50, 600),
+                                      rng.choice([13, 50, 70]), rng.choice([16, 50, 70]))
+            sprites.add(sprite)
+        expected = pygame.sprite.groupcollide(sprites, group, False, False, pygame.sprite.collide_rect_ratio(0.8))
+        assert grid.collide_sprites(sprites) == expected
+        expected = pygame.sprite.groupcollide(group, sprites, False, False, pygame.sprite.collide_rect_ratio(0.8))
+        assert grid.collide_walls(sprites) == expected
+
+    def test_killed_wall_leaves_the_index(self):
+        walls = create_walls(25, 10, 3)
+        grid = WallGrid(25, 25, *walls)
+        wall = walls[0]
+        assert grid.collide_rect(wall.rect) == [wall]
+        wall.kill()
+        assert grid.collide_rect(wall.rect) == []
+        assert wall not in grid
+        assert sum(len(cell) for cell in grid.cells.values()) == 9
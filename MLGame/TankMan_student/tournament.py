@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import random
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from contest import import_player, play_game
+from ml.inference_broker import InferenceBroker
+from ml.model_registry import share_loaded_models
+from src.game_module.FrameProfiler import FrameProfiler
+
+PLAYERS_PER_GROUP = 3
+# one broker per worker process, created by the first game it plays
+_broker = None
+# the process that created _broker, a forked process does not have the broker's bot threads
+_broker_pid = None
+
+
+def get_game_seed(seed: int, home: str, away: str, game_index: int) -> int:
+    """Every (pairing, game index) gets the same seed no matter which worker plays it."""
+    return zlib.crc32(f"{seed}:{home}:{away}:{game_index}".encode())
+
+
+def play_job(job: dict) -> dict:
+    """
+    Play one game of a pairing in a worker process.
+
+    Parameters
+    ----------
+    job : dict
+        home, away, game, seed, frame, sound, player_module, replay_path, profile, batch_inference
+        and the group folders.
+
+    Returns
+    -------
+    dict
+        The job with the game status, and the phase histograms if ``profile`` is set, added.
+        Written to the ledger as is.
+    """
+    random.seed(job["seed"])
+    np.random.seed(job["seed"])
+    global _broker, _broker_pid
+    broker = None
+    if job["batch_inference"]:
+        if _broker is None or _broker_pid != os.getpid():
+            _broker = InferenceBroker()
+            _broker_pid = os.getpid()
+        # the predictions of the six players in a frame are batched by the broker
+        broker = _broker
+    # each worker loads a model zip once and reuses it for every later game
+    share_loaded_models(broker=broker)
+    players = [import_player(job["home_folder"], k, job["player_module"])(f"{k}P", {"sound": job["sound"]})
+               for k in range(1, PLAYERS_PER_GROUP + 1)]
+    players += [import_player(job["away_folder"], k, job["player_module"])(f"{k + PLAYERS_PER_GROUP}P",
+                                                                           {"sound": job["sound"]})
+                for k in range(1, PLAYERS_PER_GROUP + 1)]
+    profiler = FrameProfiler(window=job["frame"]) if job["profile"] else None
+    game_result = play_game(players, job["frame"], job["sound"], False, headless=True, broker=broker,
+                            seed=job["seed"], record_path=job["replay_path"], profiler=profiler)
+    row = {**job, "status": game_result["attachment"][0]["status"]}
+    if profiler:
+        row["profile"] = profiler.export()
+    return row
+
+
+class Series():
+    """
+    A best-of-N series between a home (green) and an away (blue) group.
+
+    Only the leading games with consecutive indexes are counted, so the
+    result does not depend on the order in which parallel games finish.
+    """
+    def __init__(self, home: str, away: str, total_game: int):
+        self.home = home
+        self.away = away
+        self.total_game = total_game
+        self.win_num = total_game // 2 + 1
+        # game index -> "GREEN_TEAM_WIN" / "BLUE_TEAM_WIN" / ...
+        self.results = {}
+        self.next_game = 0
+
+    def get_score(self) -> tuple:
+        green_team_win = blue_team_win = 0
+        for game_index in range(self.total_game):
+            if game_index not in self.results:
+                break
+            if max(green_team_win, blue_team_win) >= self.win_num:
+                break
+            if self.results[game_index] == "GREEN_TEAM_WIN":
+                green_team_win += 1
+            else:
+                blue_team_win += 1
+        return green_team_win, blue_team_win
+
+    def is_decided(self) -> bool:
+        green_team_win, blue_team_win = self.get_score()
+        return max(green_team_win, blue_team_win) >= self.win_num \
+            or green_team_win + blue_team_win == self.total_game
+
+    def get_jobs_to_start(self, running_num: int) -> list:
+        """Start only as many games as can still matter for the series."""
+        green_team_win, blue_team_win = self.get_score()
+        counted = green_team_win + blue_team_win
+        # already played or running games that are not counted yet
+        pending = running_num + len([i for i in self.results if i >= counted])
+        games = []
+        while not self.is_decided() and self.next_game < self.total_game \
+                and pending + len(games) < self.win_num - max(green_team_win, blue_team_win):
+            if self.next_game not in self.results:
+                games.append(self.next_game)
+            self.next_game += 1
+        return games
+
+
+def load_ledger(ledger_path: str) -> list:
+    if not ledger_path or not os.path.exists(ledger_path):
+        return []
+    rows = []
+    with open(ledger_path) as f:
+        for line in f:
+            if not line.endswith("\n"):
+                # the runner was killed while writing this row, the game is played again
+                break
+            if line.strip():
+                rows.append(json.loads(line))
+    return rows
+
+
+def open_ledger(ledger_path: str):
+    """Open the ledger for appending, after dropping a row that was only partly written."""
+    with open(ledger_path, "a+b") as f:
+        f.seek(0)
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+    return open(ledger_path, "a")
+
+
+def run_tournament(groups: list, total_game: int, frame: int, seed: int = 0, workers: int = None,
+                   ledger_path: str = None, player_module: str = "ml.Group_{group}.ml_play_{player}",
+                   sound: str = "off", group_folders: dict = None, replay_dir: str = None,
+                   profile: bool = False, batch_inference: bool = False) -> dict:
+    """
+    Play a round robin where every ordered (home, away) pair plays a best-of-``total_game`` series.
+
+    Parameters
+    ----------
+    groups : list
+        Group names, e.g. ["7", "9", "11"].
+    workers : int
+        Number of worker processes, defaults to the CPU count.
+    ledger_path : str
+        JSONL file that records every finished game; games already in it are not played again.
+    group_folders : dict
+        Group name -> the folder number used in ``player_module``, defaults to the group name itself.
+    replay_dir : str
+        Record every game to ``<home>_<away>_<game>.tmr`` in this folder.
+    profile : bool
+        Time every game phase and player update and write the histograms to the ledger.
+    batch_inference : bool
+        Batch the players' predictions per frame with an InferenceBroker. Bots that use the global
+        random module or other state shared between bots may then act differently from a serial game.
+
+    Returns
+    -------
+    dict
+        ``{"record": {group: series wins}, "series": [...]}``.
+    """
+    group_folders = group_folders or {}
+    if replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+    series_list = [Series(home, away, total_game) for home in groups for away in groups if home != away]
+    series_dict = {(series.home, series.away): series for series in series_list}
+    for row in load_ledger(ledger_path):
+        series = series_dict.get((row["home"], row["away"]))
+        # only reuse games played with the same settings
+        if series is not None and row["frame"] == frame \
+                and row.get("batch_inference", False) == batch_inference \
+                and row["seed"] == get_game_seed(seed, row["home"], row["away"], row["game"]):
+            series.results[row["game"]] = row["status"]
+
+    ledger = open_ledger(ledger_path) if ledger_path else None
+    running = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            def submit_jobs():
+                for series in series_list:
+                    running_num = sum(1 for key in running.values() if key == (series.home, series.away))
+                    for game_index in series.get_jobs_to_start(running_num):
+                        job = {"home": series.home, "away": series.away, "game": game_index,
+                               "seed": get_game_seed(seed, series.home, series.away, game_index),
+                               "frame": frame, "sound": sound, "player_module": player_module,
+                               "home_folder": group_folders.get(series.home, series.home),
+                               "away_folder": group_folders.get(series.away, series.away),
+                               "replay_path": os.path.join(replay_dir, f"{series.home}_{series.away}_{game_index}.tmr")
+                               if replay_dir else None,
+                               "profile": profile, "batch_inference": batch_inference}
+                        running[executor.submit(play_job, job)] = (series.home, series.away)
+
+            submit_jobs()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    row = future.result()
+                    series_dict[(row["home"], row["away"])].results[row["game"]] = row["status"]
+                    if ledger:
+                        ledger.write(json.dumps(row) + "\n")
+                        ledger.flush()
+                submit_jobs()
+    finally:
+        if ledger:
+            ledger.close()
+
+    record = {group: 0 for group in groups}
+    result_list = []
+    for series in series_list:
+        green_team_win, blue_team_win = series.get_score()
+        winner = series.home if green_team_win > blue_team_win else series.away
+        record[winner] += 1
+        result_list.append({"home": series.home, "away": series.away,
+                            "green_team_win": green_team_win, "blue_team_win": blue_team_win})
+    return {"record": record, "series": result_list}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--groups", type=str, nargs="+", required=True, help="The folders of the groups, e.g. 7 9 11")
+    parser.add_argument("--total_game", type=int, default=9, help="Best of how many games per pairing")
+    parser.add_argument("--frame", type=int, default=2500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Defaults to the number of CPUs")
+    parser.add_argument("--ledger", type=str, default="tournament.jsonl",
+                        help="Finished games are appended here, rerun with the same file to resume")
+    parser.add_argument("--replay_dir", type=str, default=None, help="Record every game to this folder")
+    parser.add_argument("--profile", action="store_true", help="Write per-phase timings of every game to the ledger")
+    parser.add_argument("--batch_inference", action="store_true",
+                        help="Batch every player's model prediction per frame, faster but bots using the global "
+                             "random module may act differently from a serial game")
+    args = parser.parse_args()
+
+    result = run_tournament(args.groups, args.total_game, args.frame, args.seed, args.workers, args.ledger,
+                            replay_dir=args.replay_dir, profile=args.profile,
+                            batch_inference=args.batch_inference)
+    for series in result["series"]:
+        print("home:", "Group_" + series["home"], series["green_team_win"], "VS", series["blue_team_win"],
+              "away", "Group_" + series["away"])
+    print(result["record"])